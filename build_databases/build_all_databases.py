@@ -0,0 +1,340 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+build_all_databases.py
+Run every build_database_*.py script and then build_global_power_plant_database.py.
+- Builders are run as separate processes, up to --jobs at a time
+- A builder starts as soon as the source databases it reads have been built
+- The global build starts as soon as the builders of its inputs have finished
+- Output of all processes is streamed, prefixed by builder name, to BUILD_LOG_FILE
+- Builders depending on a failed builder are skipped
+- Builders whose build stamp is unchanged are skipped, reusing their database
+  (use --force to rebuild anyway, --dry-run to only report what would rebuild)
+"""
+
+import argparse
+import glob
+import multiprocessing
+import subprocess
+import threading
+import time
+import Queue
+import sys, os
+
+sys.path.insert(0, os.pardir)
+import powerplant_database as pw
+
+### PARAMETERS ###
+BUILD_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+BUILDER_PATTERN = "build_database_*.py"
+BUILDER_TEMPLATE = "build_database_template.py"
+GLOBAL_BUILDER = "GLOBAL"
+GLOBAL_BUILD_SCRIPT = "build_global_power_plant_database.py"
+GLOBAL_BUILD_OUTPUT = pw.make_file_path(fileType="output", filename="global_power_plant_database.csv")
+BUILD_LOG_FILE = pw.make_file_path(fileType="output", filename="build_all_databases_log.txt")
+
+# Source databases read by each builder, beyond its raw and resource files.
+DEPENDENCIES = {
+	u"IND": [u"WRI"],
+	u"USA": [u"WRI"],
+}
+# Source databases read by the global build besides those of automated countries.
+GLOBAL_DEPENDENCIES = [u"WRI", u"GEODB", u"CARMA"]
+
+
+def find_builders(directory=BUILD_DIRECTORY):
+	"""
+	Find the source database builders.
+
+	Returns
+	-------
+	builders : dict
+		Dict of {save code: script path}, e.g. {'USA': '.../build_database_USA.py'}.
+	"""
+	builders = {}
+	for script in glob.glob(os.path.join(directory, BUILDER_PATTERN)):
+		if os.path.basename(script) == BUILDER_TEMPLATE:
+			continue
+		code = os.path.splitext(os.path.basename(script))[0][len(BUILDER_PATTERN) - 4:]
+		builders[code] = script
+	return builders
+
+
+def make_build_graph(builders, country_dictionary, directory=BUILD_DIRECTORY):
+	"""
+	Make the dependency graph of the builders and the global build.
+
+	Parameters
+	----------
+	builders : dict
+		Dict of {save code: script path} as returned by `find_builders()`.
+	country_dictionary : dict
+		Dict of {country name: CountryObject}, used to find automated countries.
+
+	Returns
+	-------
+	scripts : dict
+		Dict of {builder name: script path}, including the global build.
+	dependencies : dict
+		Dict of {builder name: set of builder names that must finish first}.
+	outputs : dict
+		Dict of {builder name: filepath of the output carrying its build stamp}.
+	"""
+	scripts = dict(builders)
+	dependencies = {}
+	outputs = {}
+	for code in builders:
+		dependencies[code] = set(dep for dep in DEPENDENCIES.get(code, []) if dep in builders)
+		outputs[code] = os.path.join(pw.SOURCE_DB_BIN_DIR, u"{0}-Database.bin".format(code))
+	global_inputs = set(GLOBAL_DEPENDENCIES)
+	for country in country_dictionary.values():
+		if country.automated == 1:
+			global_inputs.add(country.iso_code)
+	scripts[GLOBAL_BUILDER] = os.path.join(directory, GLOBAL_BUILD_SCRIPT)
+	dependencies[GLOBAL_BUILDER] = global_inputs.intersection(builders)
+	outputs[GLOBAL_BUILDER] = GLOBAL_BUILD_OUTPUT
+	return scripts, dependencies, outputs
+
+
+def restrict_build_graph(dependencies, targets):
+	"""Return the names in `targets` together with everything they depend on, directly or not."""
+	selected = set()
+	stack = list(targets)
+	while stack:
+		name = stack.pop()
+		if name not in dependencies:
+			raise ValueError(u"Unknown builder <{0}>; choose from {1}.".format(name, u", ".join(sorted(dependencies))))
+		if name not in selected:
+			selected.add(name)
+			stack.extend(dependencies[name])
+	return selected
+
+
+def _count_dependents(dependencies):
+	"""Return {builder name: number of builders that depend on it, directly or not}."""
+	dependents = {name: set() for name in dependencies}
+	for name in dependencies:
+		for dep in restrict_build_graph(dependencies, [name]) - set([name]):
+			dependents[dep].add(name)
+	return {name: len(names) for name, names in dependents.iteritems()}
+
+
+def _stream_builder(name, command, cwd, events):
+	"""Run one builder, putting ('line', name, text) events and a final ('exit', name, returncode) on `events`."""
+	env = dict(os.environ)
+	# python 2 block-buffers and ascii-encodes output to a pipe; stream it as utf-8 lines instead
+	env['PYTHONUNBUFFERED'] = '1'
+	env.setdefault('PYTHONIOENCODING', 'utf-8')
+	try:
+		process = subprocess.Popen(command, cwd=cwd, env=env,
+			stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+	except OSError as e:
+		events.put(('line', name, u"Could not start builder: {0}\n".format(e).encode('utf-8')))
+		events.put(('exit', name, -1))
+		return
+	for line in iter(process.stdout.readline, b''):
+		events.put(('line', name, line))
+	process.stdout.close()
+	events.put(('exit', name, process.wait()))
+
+
+def _build_order(scripts, dependencies):
+	"""Names in `scripts`, each after all of its dependencies."""
+	order = []
+	remaining = set(scripts)
+	while remaining:
+		ready = sorted(name for name in remaining if not dependencies[name].intersection(remaining))
+		if not ready:
+			raise ValueError(u"Circular builder dependencies among {0}.".format(u", ".join(sorted(remaining))))
+		order.extend(ready)
+		remaining.difference_update(ready)
+	return order
+
+
+def plan_build(scripts, dependencies, changes):
+	"""
+	Report which builders would run, without running any.
+
+	Parameters
+	----------
+	scripts : dict
+		Dict of {builder name: script path}.
+	dependencies : dict
+		Dict of {builder name: set of builder names}.
+	changes : function
+		Function of a builder name returning the reasons to rebuild it (empty if up to date).
+
+	Returns
+	-------
+	plan : list
+		List of (builder name, reasons) in build order; reasons are empty for
+		builders whose existing database would be reused.
+	"""
+	plan = []
+	rebuilt = set()
+	for name in _build_order(scripts, dependencies):
+		reasons = list(changes(name))
+		if not reasons:
+			# a rebuilt dependency may or may not produce a different database
+			reasons = [u"if the {0} database changes".format(dep) for dep in sorted(dependencies[name] & rebuilt)]
+		if reasons:
+			rebuilt.add(name)
+		plan.append((name, reasons))
+	return plan
+
+
+def run_build_graph(scripts, dependencies, options, jobs, f_log, changes=None):
+	"""
+	Run builders concurrently, each as soon as all of its dependencies have succeeded.
+
+	Parameters
+	----------
+	scripts : dict
+		Dict of {builder name: script path}.
+	dependencies : dict
+		Dict of {builder name: set of builder names}; only the names in `scripts` are run.
+	options : dict
+		Dict of {builder name: list of extra command-line arguments}.
+	jobs : int
+		Maximum number of builders running at once.
+	f_log : file
+		Open build log; receives every output line, prefixed with the builder name.
+	changes : function, optional
+		Function of a builder name returning the reasons to rebuild it; builders
+		without any, checked once their dependencies are done, aren't run.
+		By default every builder is run.
+
+	Returns
+	-------
+	results : dict
+		Dict of {builder name: returncode}; None for builders skipped after a failed dependency.
+	reused : set
+		Names of the builders not run because their database was up to date.
+	"""
+	def log(name, text):
+		line = u"[{0}] {1}".format(name, text.rstrip(u"\r\n"))
+		print(line)
+		f_log.write(line.encode('utf-8') + b'\n')
+		f_log.flush()
+
+	# among ready builders, start those at the head of the longest chains first
+	dependent_counts = _count_dependents(dependencies)
+	events = Queue.Queue()
+	waiting = set(scripts)
+	started = {}
+	results = {}
+	reused = set()
+	running = []
+	while True:
+		# skip builders after a failed dependency, reuse up-to-date ones and start those
+		# whose dependencies (among those being run) have all succeeded, until none is left
+		progress = True
+		while progress:
+			progress = False
+			for name in sorted(waiting, key=lambda name: (-dependent_counts[name], name)):
+				prerequisites = dependencies[name].intersection(scripts)
+				failed = [dep for dep in prerequisites if dep in results and results[dep] != 0]
+				if failed:
+					waiting.remove(name)
+					results[name] = None
+					progress = True
+					log(name, u"Skipped; failed dependencies: {0}.".format(u", ".join(sorted(failed))))
+				elif len(running) < jobs and all(results.get(dep) == 0 for dep in prerequisites):
+					waiting.remove(name)
+					progress = True
+					if changes:
+						reasons = changes(name)
+						if not reasons:
+							results[name] = 0
+							reused.add(name)
+							log(name, u"Up to date; reusing the existing database.")
+							continue
+						log(name, u"Rebuilding: {0}.".format(u"; ".join(reasons)))
+					running.append(name)
+					started[name] = time.time()
+					command = [sys.executable, scripts[name]] + options.get(name, [])
+					log(name, u"Started at {0}.".format(time.ctime()))
+					thread = threading.Thread(target=_stream_builder,
+						args=(name, command, os.path.dirname(scripts[name]), events))
+					thread.daemon = True
+					thread.start()
+		if not running:
+			if waiting:
+				raise ValueError(u"Circular builder dependencies among {0}.".format(u", ".join(sorted(waiting))))
+			break
+		event, name, value = events.get()
+		if event == 'line':
+			log(name, value.decode('utf-8', 'replace'))
+		else:
+			results[name] = value
+			running.remove(name)
+			status = u"Finished" if value == 0 else u"FAILED (exit code {0})".format(value)
+			log(name, u"{0} in {1:.1f} s.".format(status, time.time() - started[name]))
+	return results, reused
+
+
+### MAIN ###
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description="Build all source databases and the global database.")
+	parser.add_argument("builders", nargs="*", metavar="BUILDER",
+		help="only run these builders (e.g. USA GLOBAL) and the builders they depend on")
+	parser.add_argument("-j", "--jobs", type=int, default=multiprocessing.cpu_count(),
+		help="maximum number of builders running at once")
+	parser.add_argument("--download", help="download raw files", action="store_true")
+	parser.add_argument("--dump", help="dump all the data in the global build", action="store_true")
+	parser.add_argument("--shards", nargs="+", choices=sorted(pw.SHARD_FORMATS),
+		help="also write per-country shards in these formats in the global build")
+	parser.add_argument("--force", help="rebuild even the databases whose build stamps are unchanged",
+		action="store_true")
+	parser.add_argument("--dry-run", help="only report which databases would be rebuilt, and why",
+		action="store_true")
+	args = parser.parse_args()
+
+	builders = find_builders()
+	scripts, dependencies, outputs = make_build_graph(builders, pw.make_country_dictionary())
+	if args.builders:
+		selected = restrict_build_graph(dependencies, args.builders)
+		scripts = {name: script for name, script in scripts.iteritems() if name in selected}
+
+	options = {}
+	for name in scripts:
+		options[name] = ["--download"] if args.download and name != GLOBAL_BUILDER else []
+	if GLOBAL_BUILDER in scripts:
+		if args.dump:
+			options[GLOBAL_BUILDER].append("--dump")
+		if args.shards:
+			options[GLOBAL_BUILDER].extend(["--shards"] + args.shards)
+
+	def changes(name):
+		if args.force:
+			return [u"forced"]
+		# raw files can only be compared with the recorded ones after downloading them
+		if "--download" in options[name]:
+			return [u"downloading raw files"]
+		return pw.build_stamp_changes(outputs[name], options[name] if name == GLOBAL_BUILDER else None)
+
+	if args.dry_run:
+		plan = plan_build(scripts, dependencies, changes)
+		for name, reasons in plan:
+			if reasons:
+				print(u"{0}: rebuild ({1})".format(name, u"; ".join(reasons)))
+			else:
+				print(u"{0}: up to date".format(name))
+		print(u"{0} of {1} databases would be rebuilt.".format(len([p for p in plan if p[1]]), len(plan)))
+		sys.exit(0)
+
+	start_time = time.time()
+	with open(BUILD_LOG_FILE, 'a') as f_log:
+		f_log.write('Starting build of {0} databases with {1} jobs at {2}.\n'.format(
+			len(scripts), args.jobs, time.ctime()))
+		results, reused = run_build_graph(scripts, dependencies, options, max(1, args.jobs), f_log, changes)
+		failed = sorted(name for name, returncode in results.iteritems() if returncode != 0)
+		summary = u"Built {0} and reused {1} of {2} databases in {3:.1f} s.".format(
+			len(results) - len(failed) - len(reused), len(reused), len(scripts), time.time() - start_time)
+		if failed:
+			summary += u" Failed or skipped: {0}.".format(u", ".join(failed))
+		print(summary)
+		f_log.write(summary.encode('utf-8') + b'\n')
+
+	if failed:
+		sys.exit(1)
@@ -24,36 +24,43 @@ SAVE_DIRECTORY = pw.make_file_path(fileType="src_bin")
 YEAR_UPDATED = 2009
 COLNAMES = ['plant.id', 'plant', 'lat', 'lon', 'iso3']
 
-# optional raw file(s) download
-# note: API documentation says to specify "limit=0" to download entire dataset. 
-# this doesn't work; it only downloads 2000 plants. 
-# full dataset has about 51k plants, so specify 60k for limit to be safe.
-#URL = "http://carma.org/javascript/ajax-lister.php?type=plant&sort=carbon_present%20DESC&page=1&time=present&m1=world&m2=plant&m3=&m4=&export=make"
-#URL = "http://carma.org/api/1.1/searchPlants?raw=1&limit=20000"
-#FILES = {RAW_FILE_NAME: URL}
-#DOWNLOAD_FILES = pw.download(SOURCE_NAME, FILES)
-print("Download disabled; using local raw database file.")
-
-# set up country name thesaurus
-country_thesaurus = pw.make_country_names_thesaurus()
-
-# create dictionary for power plant objects
-plants_dictionary = {}
-
-print(u"Reading in plants...")
-coord_skip_count = 0
-# read file line-by-line
-with open(RAW_FILE_NAME, 'rU') as f:
-    datareader = csv.reader(f)
-    headers = [x.lower() for x in datareader.next()]
-    id_col = headers.index(COLNAMES[0])
-    name_col = headers.index(COLNAMES[1])
-    latitude_col = headers.index(COLNAMES[2])
-    longitude_col = headers.index(COLNAMES[3])
-    country_col = headers.index(COLNAMES[4])
- 
-    for row in datareader:
+def build(resources, options):
+    """Read the CARMA power plants into a dict of {gppd_idnr: PowerPlant}."""
+    # optional raw file(s) download
+    # note: API documentation says to specify "limit=0" to download entire dataset. 
+    # this doesn't work; it only downloads 2000 plants. 
+    # full dataset has about 51k plants, so specify 60k for limit to be safe.
+    #URL = "http://carma.org/javascript/ajax-lister.php?type=plant&sort=carbon_present%20DESC&page=1&time=present&m1=world&m2=plant&m3=&m4=&export=make"
+    #URL = "http://carma.org/api/1.1/searchPlants?raw=1&limit=20000"
+    #FILES = {RAW_FILE_NAME: URL}
+    #DOWNLOAD_FILES = pw.download(SOURCE_NAME, FILES)
+    print("Download disabled; using local raw database file.")
 
+    # set up country name index
+    country_index = resources.country_index
+
+    # create dictionary for power plant objects
+    plants_dictionary = {}
+
+    print(u"Reading in plants...")
+    coord_skip_count = 0
+    # read file line-by-line
+    with open(RAW_FILE_NAME, 'rU') as f:
+        datareader = csv.reader(f)
+        headers = [x.lower() for x in datareader.next()]
+        id_col = headers.index(COLNAMES[0])
+        name_col = headers.index(COLNAMES[1])
+        latitude_col = headers.index(COLNAMES[2])
+        longitude_col = headers.index(COLNAMES[3])
+        country_col = headers.index(COLNAMES[4])
+        rows = list(datareader)
+
+    # countries are given as ISO3 codes; resolve the whole column at once
+    countries, _ = country_index.resolve_all(row[country_col] for row in rows)
+    for iso3, count in sorted(country_index.pop_misses().iteritems()):
+        print(u"-Error: Couldn't identify country {0} ({1} plants).".format(iso3, count))
+
+    for row, country in zip(rows, countries):
         idval = int(row[id_col])
         name = pw.format_string(row[name_col])
         try:
@@ -62,7 +69,6 @@ with open(RAW_FILE_NAME, 'rU') as f:
         except:
             coord_skip_count += 1
             continue
-        country = row[country_col]     # note: this is the ISO3 code so no need to convert
 
         # assign ID number
         idnr = pw.make_id(SAVE_CODE, idval)
@@ -73,13 +79,20 @@ with open(RAW_FILE_NAME, 'rU') as f:
         plants_dictionary[idnr] = new_plant
 
 
-# report on plants read from file
-print(u"...read {0} plants.".format(len(plants_dictionary)))
-print("Skipped {0} plants because of missing lat/long coordinates.".format(coord_skip_count))
+    # report on plants read from file
+    print(u"...read {0} plants.".format(len(plants_dictionary)))
+    print("Skipped {0} plants because of missing lat/long coordinates.".format(coord_skip_count))
+
+    return plants_dictionary
+
+
+### MAIN ###
+if __name__ == '__main__':
+    plants_dictionary = build(pw.BuildResources(), pw.build_arg_parser())
 
-# write database to csv format
-pw.write_csv_file(plants_dictionary, CSV_FILE_NAME)
-#
-# save database
-pw.save_database(plants_dictionary, SAVE_CODE, SAVE_DIRECTORY)
-print(u"Pickled database to {0}".format(SAVE_DIRECTORY))
+    # write database to csv format
+    pw.write_csv_file(plants_dictionary, CSV_FILE_NAME)
+    #
+    # save database
+    pw.save_database(plants_dictionary, SAVE_CODE, SAVE_DIRECTORY)
+    print(u"Pickled database to {0}".format(SAVE_DIRECTORY))
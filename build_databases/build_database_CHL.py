@@ -59,128 +59,139 @@ for dataset in DATASETS:
      RAW_FILE_NAME_this = RAW_FILE_NAME.replace("FILENAME", dataset["filename"])
      URL = URL_BASE.replace("NUMBER", dataset["number"])
      FILES[RAW_FILE_NAME_this] = URL
-DOWNLOAD_FILES = pw.download("Chile power plant data", FILES)
-
-# set up fuel type thesaurus
-fuel_thesaurus = pw.make_fuel_thesaurus()
-
-# set up country name thesaurus
-country_thesaurus = pw.make_country_names_thesaurus()
-
-# create dictionary for power plant objects
-plants_dictionary = {}
-
-# extract powerplant information from file(s)
-print(u"Reading in plants...")
-
-# read static location file [fuel,id,name,latitude,longitude]
-plant_locations = {"Thermal": {}, "Hydro": {}, "Wind": {}, "Solar": {}, "Biomass": {}, "Unknown": {}}
-with open(LOCATION_FILE_NAME, 'rbu') as f:
-    datareader = csv.reader(f)
-    headers = [x.lower() for x in datareader.next()]
-    for row in datareader:
-        fuel_type = row[0]
-        idval = int(row[1])
-        name = row[2]
-        latitude = float(row[3])
-        longitude = float(row[4])
-        plant_locations[fuel_type][idval] = [latitude, longitude, name]
-
-# read plant files
-for dataset in DATASETS:
-    dataset_filename = pw.make_file_path(fileType="raw", subFolder=SAVE_CODE, filename=dataset["filename"])
 
-    with open(dataset_filename, "rbU") as f:
-        datareader = csv.DictReader(f)
+def build(resources, options):
+    """Read the Chile (CNE) power plants into a dict of {gppd_idnr: PowerPlant}."""
+    DOWNLOAD_FILES = pw.download("Chile power plant data", FILES, force=options.download)
+
+    # set up fuel type thesaurus
+    fuel_thesaurus = resources.fuel_thesaurus
+
+    # set up country name thesaurus
+    country_thesaurus = resources.country_thesaurus
+
+    # create dictionary for power plant objects
+    plants_dictionary = {}
+
+    # extract powerplant information from file(s)
+    print(u"Reading in plants...")
+
+    # read static location file [fuel,id,name,latitude,longitude]
+    plant_locations = {"Thermal": {}, "Hydro": {}, "Wind": {}, "Solar": {}, "Biomass": {}, "Unknown": {}}
+    with open(LOCATION_FILE_NAME, 'rbu') as f:
+        datareader = csv.reader(f)
+        headers = [x.lower() for x in datareader.next()]
         for row in datareader:
+            fuel_type = row[0]
+            idval = int(row[1])
+            name = row[2]
+            latitude = float(row[3])
+            longitude = float(row[4])
+            plant_locations[fuel_type][idval] = [latitude, longitude, name]
 
-            try:
-                idval = int(row["gid"])
-            except:
-                print("-Error: Can't read ID for line {0}, skipping.".format(count))
-                continue
-
-            try:
-                name = pw.format_string(row.get("nombre", row.get("comuna", pw.NO_DATA_UNICODE)))
-            except:
-                print(u"-Error: Can't read name for ID {0}, skipping.".format(idval))
-                continue              
-
-            try:
-                fuel_string = row.get("Tipo", row.get("Tipo ", row.get("Combustible", pw.NO_DATA_UNICODE)))
-                fuels = pw.standardize_fuel(fuel_string, fuel_thesaurus, as_set=True)
-            except:
-                print(u"-Error: Can't read fuel for plant {0}.".format(name))
-                primary_fuel = pw.NO_DATA_UNICODE
-                other_fuels = pw.NO_DATA_SET.copy()
-            else:
-                if len(fuels) == 1:
-                    primary_fuel = fuels.pop()
-                    other_fuels = pw.NO_DATA_SET.copy()
-                elif len(fuels) == 2:
-                    primary, secondary = fuel_string.split(' / ')
-                    primary_fuel = pw.standardize_fuel(primary, fuel_thesaurus, as_set=False)
-                    other_fuels = pw.standardize_fuel(secondary, fuel_thesaurus, as_set=True)
-                else:
-                    print(u"-Error: Bad number of fuels for plant {0}.".format(name))
-                    primary_fuel = pw.NO_DATA_UNICODE
-                    other_fuels = pw.NO_DATA_SET.copy()
+    # read plant files
+    for dataset in DATASETS:
+        dataset_filename = pw.make_file_path(fileType="raw", subFolder=SAVE_CODE, filename=dataset["filename"])
 
+        with open(dataset_filename, "rbU") as f:
+            datareader = csv.DictReader(f)
+            for row in datareader:
 
-            # special treament of name for biomass plants (not included in data file)
-            if primary_fuel == "Biomass":
                 try:
-                    name = pw.format_string(plant_locations["Biomass"][idval][2])
+                    idval = int(row["gid"])
                 except:
-                    print("-Error: Can't read name for ID {0} (Biomass).".format(idval))
+                    print("-Error: Can't read ID for line {0}, skipping.".format(count))
                     continue
 
-            try:
-                latitude,longitude = lookup_location(primary_fuel, idval, plant_locations)
-                geolocation_source = SOURCE_NAME
-            except:
-                print(u"-Error: Can't find location for plant {0}.".format(name))
-                latitude,longitude = pw.NO_DATA_NUMERIC, pw.NO_DATA_NUMERIC
-                geolocation_source = pw.NO_DATA_UNICODE
-
-            try:
-                capacity = float(row.get("Potencia MW", pw.NO_DATA_NUMERIC))
-            except:
                 try:
-                    capacity_string = row.get("Potencia MW", pw.NO_DATA_NUMERIC)
-                    capacity = float(capacity_string.replace(",", "."))
+                    name = pw.format_string(row.get("nombre", row.get("comuna", pw.NO_DATA_UNICODE)))
+                except:
+                    print(u"-Error: Can't read name for ID {0}, skipping.".format(idval))
+                    continue              
+
+                try:
+                    fuel_string = row.get("Tipo", row.get("Tipo ", row.get("Combustible", pw.NO_DATA_UNICODE)))
+                    fuels = pw.standardize_fuel(fuel_string, fuel_thesaurus, as_set=True)
+                except:
+                    print(u"-Error: Can't read fuel for plant {0}.".format(name))
+                    primary_fuel = pw.NO_DATA_UNICODE
+                    other_fuels = pw.NO_DATA_SET.copy()
+                else:
+                    if len(fuels) == 1:
+                        primary_fuel = fuels.pop()
+                        other_fuels = pw.NO_DATA_SET.copy()
+                    elif len(fuels) == 2:
+                        primary, secondary = fuel_string.split(' / ')
+                        primary_fuel = pw.standardize_fuel(primary, fuel_thesaurus, as_set=False)
+                        other_fuels = pw.standardize_fuel(secondary, fuel_thesaurus, as_set=True)
+                    else:
+                        print(u"-Error: Bad number of fuels for plant {0}.".format(name))
+                        primary_fuel = pw.NO_DATA_UNICODE
+                        other_fuels = pw.NO_DATA_SET.copy()
+
+
+                # special treament of name for biomass plants (not included in data file)
+                if primary_fuel == "Biomass":
+                    try:
+                        name = pw.format_string(plant_locations["Biomass"][idval][2])
+                    except:
+                        print("-Error: Can't read name for ID {0} (Biomass).".format(idval))
+                        continue
+
+                try:
+                    latitude,longitude = lookup_location(primary_fuel, idval, plant_locations)
+                    geolocation_source = SOURCE_NAME
+                except:
+                    print(u"-Error: Can't find location for plant {0}.".format(name))
+                    latitude,longitude = pw.NO_DATA_NUMERIC, pw.NO_DATA_NUMERIC
+                    geolocation_source = pw.NO_DATA_UNICODE
+
+                try:
+                    capacity = float(row.get("Potencia MW", pw.NO_DATA_NUMERIC))
                 except:
-                    print(u"-Error: Can't read capacity for plant {0}.".format(name))
-                    capacity = pw.NO_DATA_NUMERIC
+                    try:
+                        capacity_string = row.get("Potencia MW", pw.NO_DATA_NUMERIC)
+                        capacity = float(capacity_string.replace(",", "."))
+                    except:
+                        print(u"-Error: Can't read capacity for plant {0}.".format(name))
+                        capacity = pw.NO_DATA_NUMERIC
 
-            try:
-                owner_string = row.get("Propietario",row.get("Propiedad", pw.NO_DATA_UNICODE))
-                if not owner_string:
-                    print("-Error: No owner string for plant {0}".format(name))
+                try:
+                    owner_string = row.get("Propietario",row.get("Propiedad", pw.NO_DATA_UNICODE))
+                    if not owner_string:
+                        print("-Error: No owner string for plant {0}".format(name))
+                        owner = pw.NO_DATA_UNICODE
+                    owner = pw.format_string(owner_string)
+                except:
+                    print(u"-Error: Can't read owner for plant {0}.".format(name))
                     owner = pw.NO_DATA_UNICODE
-                owner = pw.format_string(owner_string)
-            except:
-                print(u"-Error: Can't read owner for plant {0}.".format(name))
-                owner = pw.NO_DATA_UNICODE
-
-            # assign ID number, make PowerPlant object, add to dictionary
-            idnr = pw.make_id(SAVE_CODE,dataset["idstart"] + idval)
-            new_location = pw.LocationObject(pw.NO_DATA_UNICODE, latitude, longitude)
-            new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=COUNTRY_NAME,
-                plant_owner=owner,
-                plant_location=new_location, plant_coord_source=geolocation_source,
-                plant_primary_fuel=primary_fuel, plant_other_fuel=other_fuels,
-                plant_capacity=capacity, plant_cap_year=YEAR_POSTED,
-                plant_source=SOURCE_NAME, plant_source_url=SOURCE_URL)
-            plants_dictionary[idnr] = new_plant
-
-
-# report on plants read from file
-print(u"...read {0} plants.".format(len(plants_dictionary)))
-
-# write database to csv format
-pw.write_csv_file(plants_dictionary, CSV_FILE_NAME)
-
-# save database
-pw.save_database(plants_dictionary, SAVE_CODE, SAVE_DIRECTORY)
-print(u"Pickled database to {0}".format(SAVE_DIRECTORY))
+
+                # assign ID number, make PowerPlant object, add to dictionary
+                idnr = pw.make_id(SAVE_CODE,dataset["idstart"] + idval)
+                new_location = pw.LocationObject(pw.NO_DATA_UNICODE, latitude, longitude)
+                new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=COUNTRY_NAME,
+                    plant_owner=owner,
+                    plant_location=new_location, plant_coord_source=geolocation_source,
+                    plant_primary_fuel=primary_fuel, plant_other_fuel=other_fuels,
+                    plant_capacity=capacity, plant_cap_year=YEAR_POSTED,
+                    plant_source=SOURCE_NAME, plant_source_url=SOURCE_URL)
+                plants_dictionary[idnr] = new_plant
+
+
+    # report on plants read from file
+    print(u"...read {0} plants.".format(len(plants_dictionary)))
+    pw.report_unidentified_fuels(fuel_thesaurus)
+
+    return plants_dictionary
+
+
+### MAIN ###
+if __name__ == '__main__':
+    plants_dictionary = build(pw.BuildResources(), pw.build_arg_parser())
+
+    # write database to csv format
+    pw.write_csv_file(plants_dictionary, CSV_FILE_NAME)
+
+    # save database
+    pw.save_database(plants_dictionary, SAVE_CODE, SAVE_DIRECTORY)
+    print(u"Pickled database to {0}".format(SAVE_DIRECTORY))
@@ -36,89 +36,101 @@ DATA_ENCODING = "Windows-1252"
 # optional raw file(s) download
 URL = "http://prtr.ec.europa.eu/"
 FILES = {RAW_FILE_NAME: URL}
-DOWNLOAD_FILES = pw.download(SOURCE_NAME, FILES)
-
-# set up fuel type thesaurus
-fuel_thesaurus = pw.make_fuel_thesaurus()
-
-# set up country name thesaurus
-country_thesaurus = pw.make_country_names_thesaurus()
-
-# create dictionary for power plant objects
-plants_dictionary = {}
-
-# extract powerplant information from file(s)
-print(u"Reading in plants...")
-
-# specify column names used in raw file
-COLNAMES = ["facilityname", "countryname", "facilityreportid", 
-    "parentcompanyname", "lat", "long"]
-
-# read file line-by-line
-with open(RAW_FILE_NAME,'rU') as f:
-    datareader = csv.reader(f)
-    # warning = datareader.next()
-    headers = [x.lower() for x in datareader.next()]
-    name_col = headers.index(COLNAMES[0])
-    country_col = headers.index(COLNAMES[1])
-    plant_id_col = headers.index(COLNAMES[2])
-    company_col = headers.index(COLNAMES[3])
-    latitude_col = headers.index(COLNAMES[4])
-    longitude_col = headers.index(COLNAMES[5])
-
-    # read each row in the file
-    count = 1
-    capacity = pw.NO_DATA_NUMERIC           # no capacity data in EPTR
-    fuel = pw.NO_DATA_SET                   # no fuel data in EPTR
-
-    for row in datareader:
-
-        try:
-            name = pw.format_string(row[name_col], encoding=DATA_ENCODING)
-        except:
-            print(u"Error: Can't read plant name.")
-            continue                       # must have plant name - don't read plant if not
-        try:
-        	idnr = int(row[plant_id_col])
-        except:
-        	print(u"Error: Can't read ID for plant {0}.".format(name))
-        	continue
-        try:
-            latitude = float(row[latitude_col])
-            longitude = float(row[longitude_col])
-        except:
-            latitude, longitude = 0.0, 0.0
-        try:
-        	owner = pw.format_string(row[company_col])
-        except:
-        	print(u"Error: Can't read owner for plant {0}.".format(name))
-        	owner = u"Unknown"
-        try:
-        	country = pw.standardize_country(row[country_col], country_thesaurus)
-        except:
-        	print("Error: Can't read country for plant {0}.".format(name))
-        	country = u"Unknown"
-        # try:
-        #     generation_GWh = float(row[generation_col]) / 1000
-        # except:
-        #     print("Error: Can't read generation for plant {0}".format(name))
-        #     generation_GWh = 0.0
-
-        # assign ID number
-        idnr = pw.make_id(SAVE_CODE, idnr)
-        new_location = pw.LocationObject("", latitude, longitude)
-        new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=country,
-            plant_location=new_location, plant_source=SOURCE_NAME, plant_source_url=SOURCE_URL,
-            plant_owner=owner)
-        plants_dictionary[idnr] = new_plant
-        count += 1
-
-# report on plants read from file
-print(u"...read {0} plants.".format(len(plants_dictionary)))
-
-# write database to csv format
-pw.write_csv_file(plants_dictionary, CSV_FILE_NAME)
-#
-# save database
-pw.save_database(plants_dictionary, SAVE_CODE, SAVE_DIRECTORY)
-print(u"Pickled database to {0}".format(SAVE_DIRECTORY))
+
+def build(resources, options):
+    """Read the E-PRTR power plants into a dict of {gppd_idnr: PowerPlant}."""
+    DOWNLOAD_FILES = pw.download(SOURCE_NAME, FILES, force=options.download)
+
+    # set up fuel type thesaurus
+    fuel_thesaurus = resources.fuel_thesaurus
+
+    # set up country name index
+    country_thesaurus = resources.country_index
+
+    # create dictionary for power plant objects
+    plants_dictionary = {}
+
+    # extract powerplant information from file(s)
+    print(u"Reading in plants...")
+
+    # specify column names used in raw file
+    COLNAMES = ["facilityname", "countryname", "facilityreportid", 
+        "parentcompanyname", "lat", "long"]
+
+    # read file line-by-line
+    with open(RAW_FILE_NAME,'rU') as f:
+        datareader = csv.reader(f)
+        # warning = datareader.next()
+        headers = [x.lower() for x in datareader.next()]
+        name_col = headers.index(COLNAMES[0])
+        country_col = headers.index(COLNAMES[1])
+        plant_id_col = headers.index(COLNAMES[2])
+        company_col = headers.index(COLNAMES[3])
+        latitude_col = headers.index(COLNAMES[4])
+        longitude_col = headers.index(COLNAMES[5])
+
+        # read each row in the file
+        count = 1
+        capacity = pw.NO_DATA_NUMERIC           # no capacity data in EPTR
+        fuel = pw.NO_DATA_SET                   # no fuel data in EPTR
+
+        for row in datareader:
+
+            try:
+                name = pw.format_string(row[name_col], encoding=DATA_ENCODING)
+            except:
+                print(u"Error: Can't read plant name.")
+                continue                       # must have plant name - don't read plant if not
+            try:
+            	idnr = int(row[plant_id_col])
+            except:
+            	print(u"Error: Can't read ID for plant {0}.".format(name))
+            	continue
+            try:
+                latitude = float(row[latitude_col])
+                longitude = float(row[longitude_col])
+            except:
+                latitude, longitude = 0.0, 0.0
+            try:
+            	owner = pw.format_string(row[company_col])
+            except:
+            	print(u"Error: Can't read owner for plant {0}.".format(name))
+            	owner = u"Unknown"
+            try:
+            	country = pw.standardize_country(row[country_col], country_thesaurus)
+            except:
+            	print("Error: Can't read country for plant {0}.".format(name))
+            	country = u"Unknown"
+            # try:
+            #     generation_GWh = float(row[generation_col]) / 1000
+            # except:
+            #     print("Error: Can't read generation for plant {0}".format(name))
+            #     generation_GWh = 0.0
+
+            # assign ID number
+            idnr = pw.make_id(SAVE_CODE, idnr)
+            new_location = pw.LocationObject("", latitude, longitude)
+            new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=country,
+                plant_location=new_location, plant_source=SOURCE_NAME, plant_source_url=SOURCE_URL,
+                plant_owner=owner)
+            plants_dictionary[idnr] = new_plant
+            count += 1
+
+    # report on plants read from file
+    print(u"...read {0} plants.".format(len(plants_dictionary)))
+    for country, count in sorted(country_thesaurus.pop_misses().iteritems()):
+        print(u"-Error: Couldn't identify country {0} ({1} plants).".format(country, count))
+
+    return plants_dictionary
+
+
+### MAIN ###
+if __name__ == '__main__':
+    plants_dictionary = build(pw.BuildResources(), pw.build_arg_parser())
+
+    # write database to csv format
+    pw.write_csv_file(plants_dictionary, CSV_FILE_NAME)
+    #
+    # save database
+    pw.save_database(plants_dictionary, SAVE_CODE, SAVE_DIRECTORY)
+    print(u"Pickled database to {0}".format(SAVE_DIRECTORY))
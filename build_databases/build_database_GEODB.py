@@ -36,11 +36,6 @@ URL_BASE = "https://morph.io/coroa/global_energy_observatory_power_plants"
 URL_END = "/data.sqlite?key=RopNCJ6LtIx9%2Bdp1r%2BQV"
 YEAR = 2017
 
-# optional raw file(s) download
-URL = URL_BASE + URL_END
-FILES = {RAW_FILE_NAME: URL}
-DOWNLOAD_FILES = pw.download(SOURCE_NAME, FILES)
-
 # possible values for operational status meaning "not operational"
 NON_OPERATIONAL_STATUSES = [
     "Built and In Test Stage",
@@ -54,115 +49,133 @@ NON_OPERATIONAL_STATUSES = [
     "Under Construction",
 ]
 
-# set up fuel type thesaurus
-fuel_thesaurus = pw.make_fuel_thesaurus()
-
-# set up country name thesaurus
-country_thesaurus = pw.make_country_names_thesaurus()
-
-# create dictionary for power plant objects
-plants_dictionary = {}
-
-# extract powerplant information from database
-conn = sqlite3.connect(RAW_FILE_NAME)
-conn.text_factory = str
-c = conn.cursor()
-c.execute("SELECT * FROM powerplants")
-colnames = list(map(lambda x: x[0].lower(), c.description))
-
-# extract powerplant information from file(s)
-print(u"Reading in plants...")
-
-# find columns for variables
-name_col        = colnames.index("name")
-fuel_col        = colnames.index("type")
-country_col     = colnames.index("country")
-id_col          = colnames.index("geo_assigned_identification_number")
-capacity_col    = colnames.index("design_capacity_mwe_nbr")
-owner_col       = colnames.index("owners1")
-latitude_col    = colnames.index("latitude_start")
-longitude_col   = colnames.index("longitude_start")
-location_col    = colnames.index("location")
-owner_col       = colnames.index("owners1")
-generation_col  = colnames.index("expected_annual_generation_gwh_nbr")
-generation_col2 = colnames.index("average_annual_generation_rng1_nbr_gwh")
-status_col      = colnames.index("status_of_plant_itf")
-
-# extract data
-rows = c.fetchall()
-conn.close()
-
-for row in rows:
-    try:
-        name = pw.format_string(row[name_col])
-    except:
-        print(u"-Error: Can't read plant name.")
-        continue                       # must have plant name - don't read plant if not
-    try:
-        idnr = int(row[id_col])
-    except:
-        print(u"-Error: Can't read plant ID: {0}".format(row[id_col]))
-        continue                        # must have ID number
-
-    # skip non operational statuses
-    if row[status_col] in NON_OPERATIONAL_STATUSES:
-        continue
-
-    try:
-        capacity = float(row[capacity_col])
-    except:
-        capacity = pw.NO_DATA_NUMERIC
-    try:
-        fuel = pw.standardize_fuel(row[fuel_col], fuel_thesaurus, as_set=False)
-    except:
-        print(u"-Error: Can't read fuel type for plant {0}.".format(name))
-        fuel = pw.NO_DATA_UNICODE
-    try:
-        latitude = float(row[latitude_col])
-        longitude = float(row[longitude_col])
-        geolocation_source = SAVE_CODE
-    except:
-        latitude, longitude = pw.NO_DATA_NUMERIC, pw.NO_DATA_NUMERIC
-        geolocation_source = pw.NO_DATA_UNICODE
-    try:
-        owner = pw.format_string(row[owner_col])
-    except:
-        print(u"-Error: Can't read owner for plant {0}.".format(name))
-        owner = pw.NO_DATA_UNICODE
-    try:
-        gen_gwh = float(row[generation_col])
-        generation = pw.PlantGenerationObject.create(gen_gwh, YEAR)
-    except:
+# optional raw file(s) download
+URL = URL_BASE + URL_END
+FILES = {RAW_FILE_NAME: URL}
+
+def build(resources, options):
+    """Read the GEODB power plants into a dict of {gppd_idnr: PowerPlant}."""
+    DOWNLOAD_FILES = pw.download(SOURCE_NAME, FILES, force=options.download)
+
+    # set up fuel type thesaurus
+    fuel_thesaurus = resources.fuel_thesaurus
+
+    # set up country name index
+    country_thesaurus = resources.country_index
+
+    # create dictionary for power plant objects
+    plants_dictionary = {}
+
+    # extract powerplant information from database
+    conn = sqlite3.connect(RAW_FILE_NAME)
+    conn.text_factory = str
+    c = conn.cursor()
+    c.execute("SELECT * FROM powerplants")
+    colnames = list(map(lambda x: x[0].lower(), c.description))
+
+    # extract powerplant information from file(s)
+    print(u"Reading in plants...")
+
+    # find columns for variables
+    name_col        = colnames.index("name")
+    fuel_col        = colnames.index("type")
+    country_col     = colnames.index("country")
+    id_col          = colnames.index("geo_assigned_identification_number")
+    capacity_col    = colnames.index("design_capacity_mwe_nbr")
+    owner_col       = colnames.index("owners1")
+    latitude_col    = colnames.index("latitude_start")
+    longitude_col   = colnames.index("longitude_start")
+    location_col    = colnames.index("location")
+    owner_col       = colnames.index("owners1")
+    generation_col  = colnames.index("expected_annual_generation_gwh_nbr")
+    generation_col2 = colnames.index("average_annual_generation_rng1_nbr_gwh")
+    status_col      = colnames.index("status_of_plant_itf")
+
+    # extract data
+    rows = c.fetchall()
+    conn.close()
+
+    for row in rows:
+        try:
+            name = pw.format_string(row[name_col])
+        except:
+            print(u"-Error: Can't read plant name.")
+            continue                       # must have plant name - don't read plant if not
+        try:
+            idnr = int(row[id_col])
+        except:
+            print(u"-Error: Can't read plant ID: {0}".format(row[id_col]))
+            continue                        # must have ID number
+
+        # skip non operational statuses
+        if row[status_col] in NON_OPERATIONAL_STATUSES:
+            continue
+
+        try:
+            capacity = float(row[capacity_col])
+        except:
+            capacity = pw.NO_DATA_NUMERIC
         try:
-            gen_gwh = float(row[generation_col2])
-            generation = pw.PlantGenerationObject.create(gen_gwh, YEAR, source=SOURCE_URL)
+            fuel = pw.standardize_fuel(row[fuel_col], fuel_thesaurus, as_set=False)
         except:
-            generation = pw.NO_DATA_OTHER
-    try:
-        country = pw.standardize_country(row[country_col], country_thesaurus)
-    except:
-        print(u"-Error: Can't read country for plant {0}.".format(name))
-        country = pw.NO_DATA_UNICODE
-
-    owner = pw.format_string(row[owner_col])
-    location = pw.format_string(row[location_col])
-
-    # assign ID number
-    idnr = pw.make_id(SAVE_CODE, idnr)
-    new_location = pw.LocationObject(location, latitude, longitude)
-    new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=country,
-        plant_location=new_location, plant_coord_source=geolocation_source,
-        plant_primary_fuel=fuel, plant_capacity=capacity,
-        plant_source=SAVE_CODE, plant_source_url=SOURCE_URL,
-        plant_generation=generation, plant_cap_year=2017)
-    plants_dictionary[idnr] = new_plant
-
-# report on plants read from file
-print(u"...read {0} plants.".format(len(plants_dictionary)))
-
-# write database to csv format
-pw.write_csv_file(plants_dictionary, CSV_FILE_NAME)
-
-# save database
-pw.save_database(plants_dictionary, SAVE_CODE, SAVE_DIRECTORY)
-print(u"Pickled database to {0}".format(SAVE_DIRECTORY))
+            print(u"-Error: Can't read fuel type for plant {0}.".format(name))
+            fuel = pw.NO_DATA_UNICODE
+        try:
+            latitude = float(row[latitude_col])
+            longitude = float(row[longitude_col])
+            geolocation_source = SAVE_CODE
+        except:
+            latitude, longitude = pw.NO_DATA_NUMERIC, pw.NO_DATA_NUMERIC
+            geolocation_source = pw.NO_DATA_UNICODE
+        try:
+            owner = pw.format_string(row[owner_col])
+        except:
+            print(u"-Error: Can't read owner for plant {0}.".format(name))
+            owner = pw.NO_DATA_UNICODE
+        try:
+            gen_gwh = float(row[generation_col])
+            generation = pw.PlantGenerationObject.create(gen_gwh, YEAR)
+        except:
+            try:
+                gen_gwh = float(row[generation_col2])
+                generation = pw.PlantGenerationObject.create(gen_gwh, YEAR, source=SOURCE_URL)
+            except:
+                generation = pw.NO_DATA_OTHER
+        try:
+            country = pw.standardize_country(row[country_col], country_thesaurus)
+        except:
+            print(u"-Error: Can't read country for plant {0}.".format(name))
+            country = pw.NO_DATA_UNICODE
+
+        owner = pw.format_string(row[owner_col])
+        location = pw.format_string(row[location_col])
+
+        # assign ID number
+        idnr = pw.make_id(SAVE_CODE, idnr)
+        new_location = pw.LocationObject(location, latitude, longitude)
+        new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=country,
+            plant_location=new_location, plant_coord_source=geolocation_source,
+            plant_primary_fuel=fuel, plant_capacity=capacity,
+            plant_source=SAVE_CODE, plant_source_url=SOURCE_URL,
+            plant_generation=generation, plant_cap_year=2017)
+        plants_dictionary[idnr] = new_plant
+
+    # report on plants read from file
+    print(u"...read {0} plants.".format(len(plants_dictionary)))
+    for country, count in sorted(country_thesaurus.pop_misses().iteritems()):
+        print(u"-Error: Couldn't identify country {0} ({1} plants).".format(country, count))
+    pw.report_unidentified_fuels(fuel_thesaurus)
+
+    return plants_dictionary
+
+
+### MAIN ###
+if __name__ == '__main__':
+    plants_dictionary = build(pw.BuildResources(), pw.build_arg_parser())
+
+    # write database to csv format
+    pw.write_csv_file(plants_dictionary, CSV_FILE_NAME)
+
+    # save database
+    pw.save_database(plants_dictionary, SAVE_CODE, SAVE_DIRECTORY)
+    print(u"Pickled database to {0}".format(SAVE_DIRECTORY))
@@ -50,334 +50,345 @@ ENCODING = 'UTF-8'
 FILES = {RAW_FILE_NAME_1: SOURCE_URL_1,
         RAW_FILE_NAME_2: SOURCE_URL_2,
         RAW_FILE_NAME_3: SOURCE_URL_3} # dictionary of saving directories and corresponding urls
-DOWNLOAD_FILES = pw.download("NACEI and CRE data", FILES)
 
-# set up fuel type thesaurus
-fuel_thesaurus = pw.make_fuel_thesaurus()
+def build(resources, options):
+    """Read the Mexico (NACEI and CRE) power plants into a dict of {gppd_idnr: PowerPlant}."""
+    DOWNLOAD_FILES = pw.download("NACEI and CRE data", FILES, force=options.download)
 
-# set up country name thesaurus
-country_thesaurus = pw.make_country_names_thesaurus()
+    # set up fuel type thesaurus
+    fuel_thesaurus = resources.fuel_thesaurus
 
-# create dictionary for power plant objects
-plants_dictionary = {}
+    # set up country name thesaurus
+    country_thesaurus = resources.country_thesaurus
 
-# extract powerplant information from file(s)
-print(u"Reading in plants...")
+    # create dictionary for power plant objects
+    plants_dictionary = {}
 
-# specify column names and tabs used in raw file
-COLNAMES_1 = [u"Country", u"Facility Name", u"Owner Name (Company)", u"Latitude", u"Longitude", u"Total Capacity (MW)",
-                u"Primary Energy Source", u"Source Agency", u"Reference Period"]
-TAB_NAME_1 = u"PowerPlantsAllGE100MW"
+    # extract powerplant information from file(s)
+    print(u"Reading in plants...")
 
-COLNAMES_2 = [u"Country", u"Facility Name", u"Owner Name (Company)", u"Latitude", u"Longitude", u"Total Capacity (MW)",
-              u"Primary Energy Source", u"Source Agency", u"Reference Period"]
-TAB_NAME_2 = u"PowerPlantsRenewGE1MW"
+    # specify column names and tabs used in raw file
+    COLNAMES_1 = [u"Country", u"Facility Name", u"Owner Name (Company)", u"Latitude", u"Longitude", u"Total Capacity (MW)",
+                    u"Primary Energy Source", u"Source Agency", u"Reference Period"]
+    TAB_NAME_1 = u"PowerPlantsAllGE100MW"
 
-COLNAMES_3 = [u"Núm.", u"PERMISIONARIO", u"CENTRAL", u"MODALIDAD", u"CAP. AUTORIZADA (MW)", u"FECHA DE ENTRADA EN OPERACIÓN", 
-              u"ENERGETICO PRIMARIO", u"ESTADO ACTUAL", u"UBICACION DE LA PLANTA"]
-TAB_NAME_3 = u"Permisos administrados"
+    COLNAMES_2 = [u"Country", u"Facility Name", u"Owner Name (Company)", u"Latitude", u"Longitude", u"Total Capacity (MW)",
+                  u"Primary Energy Source", u"Source Agency", u"Reference Period"]
+    TAB_NAME_2 = u"PowerPlantsRenewGE1MW"
 
-# 1: read in NACEI conventional plants
-book = xlrd.open_workbook(RAW_FILE_NAME_1, encoding_override=ENCODING)
-sheet = book.sheet_by_name(TAB_NAME_1)
+    COLNAMES_3 = [u"Núm.", u"PERMISIONARIO", u"CENTRAL", u"MODALIDAD", u"CAP. AUTORIZADA (MW)", u"FECHA DE ENTRADA EN OPERACIÓN", 
+                  u"ENERGETICO PRIMARIO", u"ESTADO ACTUAL", u"UBICACION DE LA PLANTA"]
+    TAB_NAME_3 = u"Permisos administrados"
 
-rv = sheet.row_values(0)
-country_col = rv.index(COLNAMES_1[0])
-name_col = rv.index(COLNAMES_1[1])
-owner_col = rv.index(COLNAMES_1[2])
-latitude_col = rv.index(COLNAMES_1[3])
-longitude_col = rv.index(COLNAMES_1[4])
-capacity_col = rv.index(COLNAMES_1[5])
-fuel_col = rv.index(COLNAMES_1[6])
-source_col = rv.index(COLNAMES_1[7])
-date_col = rv.index(COLNAMES_1[8])
+    # 1: read in NACEI conventional plants
+    book = xlrd.open_workbook(RAW_FILE_NAME_1, encoding_override=ENCODING)
+    sheet = book.sheet_by_name(TAB_NAME_1)
 
-print(u"Reading file 1...")
+    rv = sheet.row_values(0)
+    country_col = rv.index(COLNAMES_1[0])
+    name_col = rv.index(COLNAMES_1[1])
+    owner_col = rv.index(COLNAMES_1[2])
+    latitude_col = rv.index(COLNAMES_1[3])
+    longitude_col = rv.index(COLNAMES_1[4])
+    capacity_col = rv.index(COLNAMES_1[5])
+    fuel_col = rv.index(COLNAMES_1[6])
+    source_col = rv.index(COLNAMES_1[7])
+    date_col = rv.index(COLNAMES_1[8])
 
-for i in xrange(1, sheet.nrows):
+    print(u"Reading file 1...")
 
-    # read in row
-    row = sheet.row_values(i)
+    for i in xrange(1, sheet.nrows):
 
-    if pw.format_string(row[country_col]) != COUNTRY_NAME:
-        continue
+        # read in row
+        row = sheet.row_values(i)
 
-    try:
-        name = pw.format_string(row[name_col], None)     # already in unicode
-        if not name:
-            print(u"-Error: No name on row {0}".format(i+1))
+        if pw.format_string(row[country_col]) != COUNTRY_NAME:
             continue
-    except:
-        print(u"-Error: Can't read name of plant on row {0}".format(i + 1))
-        name = pw.NO_DATA_UNICODE    # without this, next pass thru loop uses old name
-        continue
-
-    try:
-        owner = pw.format_string(row[owner_col], None)
-    except:
-        print(u"-Error: Can't read owner of plant with name {0}".format(name))
-        owner = pw.NO_DATA_UNICODE
-
-    try:
-        primary_fuel = pw.standardize_fuel(row[fuel_col], fuel_thesaurus, as_set=False)
-    except:
-        print(u"-Error: Can't read fuel for plant with name {0}".format(name))
-        primary_fuel = pw.NO_DATA_UNICODE
-
-    try:
-        capacity = float(row[capacity_col])
-    except:
-        print(u"-Error: Can't read capacity for plant with name {0}".format(name))
-        capacity = pw.NO_DATA_NUMERIC
-
-    try:
-        latitude = float(row[latitude_col])
-        longitude = float(row[longitude_col])
-        geolocation_source = SOURCE_NAME
-    except:
-        print(u"-Error: Can't read lat/long for plant with name {0}".format(name))
-        latitude = pw.NO_DATA_NUMERIC
-        longitude = pw.NO_DATA_NUMERIC
-        geolocation_source = pw.NO_DATA_UNICODE
-
-    try:
-        source = pw.format_string(row[source_col], None)
-    except:
-        print(u"-Error: Can't read data source for plant with name {0}".format(name))
-        source = pw.NO_DATA_UNICODE
-
-    try:
-        data_date = (int(str(row[date_col])[0:4]))
-    except:
-        print(u"-Error:Can't read reference date for plant with name {0}".format(name))
-        data_date = pw.NO_DATA_NUMERIC
-
-    # assign ID number
-    idnr = pw.make_id(SAVE_CODE, i)
-    new_location = pw.LocationObject(pw.NO_DATA_UNICODE, latitude, longitude)
-    new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=COUNTRY_NAME,
-        plant_owner=owner, plant_cap_year=data_date,
-        plant_location=new_location, plant_coord_source=geolocation_source,
-        plant_primary_fuel=primary_fuel,
-        plant_capacity=capacity,
-        plant_source=source, plant_source_url=SOURCE_URL_1)
-    plants_dictionary[idnr] = new_plant
-
-# use this for id incrementing in next file
-max_id = i
-
-# 2: read in NACEI renewable plants
-book = xlrd.open_workbook(RAW_FILE_NAME_2, encoding_override=ENCODING)
-sheet = book.sheet_by_name(TAB_NAME_2)
-
-rv = sheet.row_values(0)
-country_col = rv.index(COLNAMES_2[0])
-name_col = rv.index(COLNAMES_2[1])
-owner_col = rv.index(COLNAMES_2[2])
-latitude_col = rv.index(COLNAMES_2[3])
-longitude_col = rv.index(COLNAMES_2[4])
-capacity_col = rv.index(COLNAMES_2[5])
-fuel_col = rv.index(COLNAMES_2[6])
-source_col = rv.index(COLNAMES_2[7])
-date_col = rv.index(COLNAMES_2[8])
-
-print(u"Reading file 2...")
-
-for i in xrange(1, sheet.nrows):
-
-    # read in row
-    row = sheet.row_values(i)
-
-    if pw.format_string(row[country_col]) != COUNTRY_NAME:
-        continue
-
-    try:
-        capacity = float(row[capacity_col])
-        if capacity >= 100:
-            continue                # already read in all plants >= 100 MW in 1st file
-    except:
-        print(u"-Error: Can't read capacity for plant with name {0}".format(name))
-        capacity = pw.NO_DATA_NUMERIC
-
-    try:
-        name = pw.format_string(row[name_col], None)     # already in unicode
-        if not name:
-            print(u"-Error: No name on row {0}".format(i + 1))
+
+        try:
+            name = pw.format_string(row[name_col], None)     # already in unicode
+            if not name:
+                print(u"-Error: No name on row {0}".format(i+1))
+                continue
+        except:
+            print(u"-Error: Can't read name of plant on row {0}".format(i + 1))
+            name = pw.NO_DATA_UNICODE    # without this, next pass thru loop uses old name
             continue
-    except:
-        print(u"-Error: Can't read name of plant on row {0}".format(i + 1))
-        name = pw.NO_DATA_UNICODE    # without this, next pass thru loop uses old name
-        continue
-
-    try:
-        owner = pw.format_string(row[owner_col], None)
-    except:
-        print(u"-Error: Can't read owner of plant with name {0}".format(name))
-        owner = pw.NO_DATA_UNICODE
-
-    try:
-        primary_fuel = pw.standardize_fuel(row[fuel_col], fuel_thesaurus, as_set=False)
-    except:
-        print(u"-Error: Can't read fuel for plant with name {0}".format(name))
-        primary_fuel = pw.NO_DATA_UNICODE
-
-    try:
-        latitude = float(row[latitude_col])
-        longitude = float(row[longitude_col])
-        geolocation_source = SOURCE_NAME
-    except:
-        print(u"-Error: Can't read lat/long for plant with name {0}".format(name))
-        latitude = pw.NO_DATA_NUMERIC
-        longitude = pw.NO_DATA_NUMERIC
-        geolocation_source = pw.NO_DATA_UNICODE
-
-    try:
-        source = pw.format_string(row[source_col], None)
-    except:
-        print(u"-Error: Can't read data source for plant with name {0}".format(name))
-        source = pw.NO_DATA_UNICODE
-
-    try:
-        data_date = (int(str(row[date_col])[0:4]))
-    except:
-        print(u"-Error:Can't read reference date for plant with name {0}".format(name))
-        data_date = pw.NO_DATA_NUMERIC
-
-    # assign ID number
-    idnr = pw.make_id(SAVE_CODE, i + max_id)
-    new_location = pw.LocationObject(pw.NO_DATA_UNICODE, latitude, longitude)
-    new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=COUNTRY_NAME,
-        plant_owner=owner, plant_cap_year=data_date,
-        plant_location=new_location, plant_coord_source=geolocation_source,
-        plant_primary_fuel=primary_fuel, plant_capacity=capacity,
-        plant_source=source, plant_source_url=SOURCE_URL_2)
-    plants_dictionary[idnr] = new_plant
-
-# use this id for incrementing in the next file
-max_id = max_id + i
-
-# 3: read in conventional plants under 100MW from CRE permit data
-modalities = [u"GEN.", u"COG.", u"P.P.", u"P.I.E."]
-
-book = xlrd.open_workbook(RAW_FILE_NAME_3, encoding_override=ENCODING)
-sheet = book.sheet_by_name(TAB_NAME_3)
-
-rv = sheet.row_values(1)
-idval_col = rv.index(COLNAMES_3[0])
-owner_col = rv.index(COLNAMES_3[1])
-name_col = rv.index(COLNAMES_3[2])
-mode_col = rv.index(COLNAMES_3[3])
-capacity_col = rv.index(COLNAMES_3[4])
-commissioning_col = rv.index(COLNAMES_3[5])
-fuel_col = rv.index(COLNAMES_3[6])
-status_col = rv.index(COLNAMES_3[7])
-location_col = rv.index(COLNAMES_3[8])
-
-print(u"Reading file 3...")
-
-for i in xrange(2, sheet.nrows):
-
-    # read in row
-    row = sheet.row_values(i)
-
-    try:
-        idval = int(row[idval_col])
-    except:
-        #print(u"-Error: Can't read ID val on row {0}".format(i+1))
-        continue
-
-    try:
-        mode = pw.format_string(row[mode_col], None)
-        if mode not in modalities:
+
+        try:
+            owner = pw.format_string(row[owner_col], None)
+        except:
+            print(u"-Error: Can't read owner of plant with name {0}".format(name))
+            owner = pw.NO_DATA_UNICODE
+
+        try:
+            primary_fuel = pw.standardize_fuel(row[fuel_col], fuel_thesaurus, as_set=False)
+        except:
+            print(u"-Error: Can't read fuel for plant with name {0}".format(name))
+            primary_fuel = pw.NO_DATA_UNICODE
+
+        try:
+            capacity = float(row[capacity_col])
+        except:
+            print(u"-Error: Can't read capacity for plant with name {0}".format(name))
+            capacity = pw.NO_DATA_NUMERIC
+
+        try:
+            latitude = float(row[latitude_col])
+            longitude = float(row[longitude_col])
+            geolocation_source = SOURCE_NAME
+        except:
+            print(u"-Error: Can't read lat/long for plant with name {0}".format(name))
+            latitude = pw.NO_DATA_NUMERIC
+            longitude = pw.NO_DATA_NUMERIC
+            geolocation_source = pw.NO_DATA_UNICODE
+
+        try:
+            source = pw.format_string(row[source_col], None)
+        except:
+            print(u"-Error: Can't read data source for plant with name {0}".format(name))
+            source = pw.NO_DATA_UNICODE
+
+        try:
+            data_date = (int(str(row[date_col])[0:4]))
+        except:
+            print(u"-Error:Can't read reference date for plant with name {0}".format(name))
+            data_date = pw.NO_DATA_NUMERIC
+
+        # assign ID number
+        idnr = pw.make_id(SAVE_CODE, i)
+        new_location = pw.LocationObject(pw.NO_DATA_UNICODE, latitude, longitude)
+        new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=COUNTRY_NAME,
+            plant_owner=owner, plant_cap_year=data_date,
+            plant_location=new_location, plant_coord_source=geolocation_source,
+            plant_primary_fuel=primary_fuel,
+            plant_capacity=capacity,
+            plant_source=source, plant_source_url=SOURCE_URL_1)
+        plants_dictionary[idnr] = new_plant
+
+    # use this for id incrementing in next file
+    max_id = i
+
+    # 2: read in NACEI renewable plants
+    book = xlrd.open_workbook(RAW_FILE_NAME_2, encoding_override=ENCODING)
+    sheet = book.sheet_by_name(TAB_NAME_2)
+
+    rv = sheet.row_values(0)
+    country_col = rv.index(COLNAMES_2[0])
+    name_col = rv.index(COLNAMES_2[1])
+    owner_col = rv.index(COLNAMES_2[2])
+    latitude_col = rv.index(COLNAMES_2[3])
+    longitude_col = rv.index(COLNAMES_2[4])
+    capacity_col = rv.index(COLNAMES_2[5])
+    fuel_col = rv.index(COLNAMES_2[6])
+    source_col = rv.index(COLNAMES_2[7])
+    date_col = rv.index(COLNAMES_2[8])
+
+    print(u"Reading file 2...")
+
+    for i in xrange(1, sheet.nrows):
+
+        # read in row
+        row = sheet.row_values(i)
+
+        if pw.format_string(row[country_col]) != COUNTRY_NAME:
             continue
-    except:
-        print(u"-Error: Can't read mode for plant with ID val {0}".format(idval))
-        continue
-
-    try:
-        capacity = float(row[capacity_col])
-        if capacity >= 100:
-            continue            # read all data on 100MW+ plants in previous files
-    except:
-        print(u"-Error: Can't read capacity for plant with name {0}".format(name))
-        capacity = pw.NO_DATA_NUMERIC
-
-    try:
-        name = pw.format_string(row[name_col], None)     # already in unicode
-        if not name:
-            #print(u"-Error: No name on row {0}".format(i+1))
+
+        try:
+            capacity = float(row[capacity_col])
+            if capacity >= 100:
+                continue                # already read in all plants >= 100 MW in 1st file
+        except:
+            print(u"-Error: Can't read capacity for plant with name {0}".format(name))
+            capacity = pw.NO_DATA_NUMERIC
+
+        try:
+            name = pw.format_string(row[name_col], None)     # already in unicode
+            if not name:
+                print(u"-Error: No name on row {0}".format(i + 1))
+                continue
+        except:
+            print(u"-Error: Can't read name of plant on row {0}".format(i + 1))
+            name = pw.NO_DATA_UNICODE    # without this, next pass thru loop uses old name
             continue
-    except:
-        print(u"-Error: Can't read name of plant on row {0}".format(i + 1))
-        name = pw.NO_DATA_UNICODE    # without this, next pass thru loop uses old name
-        continue
-
-    try:
-        owner = pw.format_string(row[owner_col], None)
-    except:
-        print(u"-Error: Can't read owner of plant with name {0}".format(name))
-        owner = pw.NO_DATA_UNICODE
-
-    try:  # (A) try to read a single fuel
-        primary_fuel = pw.standardize_fuel(row[fuel_col], fuel_thesaurus, as_set=False)
-    except:  # if (A) fails mabye due to two separate fuels:
-        # (B) split phrase & try to get a fuel from each value
-        fuel_string_list = row[fuel_col].split(' y ')
-        if len(fuel_string_list) == 1:  # if (B) doesn't result in more potential fuels
-            print(u"-Error: Can't read fuel <{0}> for plant with name {1}".format(row[fuel_col], name))
-            # assign no data
+
+        try:
+            owner = pw.format_string(row[owner_col], None)
+        except:
+            print(u"-Error: Can't read owner of plant with name {0}".format(name))
+            owner = pw.NO_DATA_UNICODE
+
+        try:
+            primary_fuel = pw.standardize_fuel(row[fuel_col], fuel_thesaurus, as_set=False)
+        except:
+            print(u"-Error: Can't read fuel for plant with name {0}".format(name))
             primary_fuel = pw.NO_DATA_UNICODE
-            other_fuel = pw.NO_DATA_SET.copy()
-        else:  # if (B) results in more strings:
-            try:  # (C) try to assign primary fuel to first value
-                primary_fuel = pw.standardize_fuel(fuel_string_list[0], fuel_thesaurus, as_set=False)
-            except:  # if (C) fails, ignore the rest of the values and give nodata
-                print(u"-Error: Can't read fuel <{0}> for plant with name {1}".format(fuel_string_list[0], name))
+
+        try:
+            latitude = float(row[latitude_col])
+            longitude = float(row[longitude_col])
+            geolocation_source = SOURCE_NAME
+        except:
+            print(u"-Error: Can't read lat/long for plant with name {0}".format(name))
+            latitude = pw.NO_DATA_NUMERIC
+            longitude = pw.NO_DATA_NUMERIC
+            geolocation_source = pw.NO_DATA_UNICODE
+
+        try:
+            source = pw.format_string(row[source_col], None)
+        except:
+            print(u"-Error: Can't read data source for plant with name {0}".format(name))
+            source = pw.NO_DATA_UNICODE
+
+        try:
+            data_date = (int(str(row[date_col])[0:4]))
+        except:
+            print(u"-Error:Can't read reference date for plant with name {0}".format(name))
+            data_date = pw.NO_DATA_NUMERIC
+
+        # assign ID number
+        idnr = pw.make_id(SAVE_CODE, i + max_id)
+        new_location = pw.LocationObject(pw.NO_DATA_UNICODE, latitude, longitude)
+        new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=COUNTRY_NAME,
+            plant_owner=owner, plant_cap_year=data_date,
+            plant_location=new_location, plant_coord_source=geolocation_source,
+            plant_primary_fuel=primary_fuel, plant_capacity=capacity,
+            plant_source=source, plant_source_url=SOURCE_URL_2)
+        plants_dictionary[idnr] = new_plant
+
+    # use this id for incrementing in the next file
+    max_id = max_id + i
+
+    # 3: read in conventional plants under 100MW from CRE permit data
+    modalities = [u"GEN.", u"COG.", u"P.P.", u"P.I.E."]
+
+    book = xlrd.open_workbook(RAW_FILE_NAME_3, encoding_override=ENCODING)
+    sheet = book.sheet_by_name(TAB_NAME_3)
+
+    rv = sheet.row_values(1)
+    idval_col = rv.index(COLNAMES_3[0])
+    owner_col = rv.index(COLNAMES_3[1])
+    name_col = rv.index(COLNAMES_3[2])
+    mode_col = rv.index(COLNAMES_3[3])
+    capacity_col = rv.index(COLNAMES_3[4])
+    commissioning_col = rv.index(COLNAMES_3[5])
+    fuel_col = rv.index(COLNAMES_3[6])
+    status_col = rv.index(COLNAMES_3[7])
+    location_col = rv.index(COLNAMES_3[8])
+
+    print(u"Reading file 3...")
+
+    for i in xrange(2, sheet.nrows):
+
+        # read in row
+        row = sheet.row_values(i)
+
+        try:
+            idval = int(row[idval_col])
+        except:
+            #print(u"-Error: Can't read ID val on row {0}".format(i+1))
+            continue
+
+        try:
+            mode = pw.format_string(row[mode_col], None)
+            if mode not in modalities:
+                continue
+        except:
+            print(u"-Error: Can't read mode for plant with ID val {0}".format(idval))
+            continue
+
+        try:
+            capacity = float(row[capacity_col])
+            if capacity >= 100:
+                continue            # read all data on 100MW+ plants in previous files
+        except:
+            print(u"-Error: Can't read capacity for plant with name {0}".format(name))
+            capacity = pw.NO_DATA_NUMERIC
+
+        try:
+            name = pw.format_string(row[name_col], None)     # already in unicode
+            if not name:
+                #print(u"-Error: No name on row {0}".format(i+1))
+                continue
+        except:
+            print(u"-Error: Can't read name of plant on row {0}".format(i + 1))
+            name = pw.NO_DATA_UNICODE    # without this, next pass thru loop uses old name
+            continue
+
+        try:
+            owner = pw.format_string(row[owner_col], None)
+        except:
+            print(u"-Error: Can't read owner of plant with name {0}".format(name))
+            owner = pw.NO_DATA_UNICODE
+
+        try:  # (A) try to read a single fuel
+            primary_fuel = pw.standardize_fuel(row[fuel_col], fuel_thesaurus, as_set=False)
+        except:  # if (A) fails mabye due to two separate fuels:
+            # (B) split phrase & try to get a fuel from each value
+            fuel_string_list = row[fuel_col].split(' y ')
+            if len(fuel_string_list) == 1:  # if (B) doesn't result in more potential fuels
+                print(u"-Error: Can't read fuel <{0}> for plant with name {1}".format(row[fuel_col], name))
+                # assign no data
                 primary_fuel = pw.NO_DATA_UNICODE
                 other_fuel = pw.NO_DATA_SET.copy()
-            else:  # if (C) succeeds:
-                try:  # (D) try to assign the remaining values to other fuels
-                    fuel_set = pw.standardize_fuel('/'.join(fuel_string_list[1:]), fuel_thesaurus, as_set=True)
-                except:  # if (D) fails, give an empty value for the other fuels
-                    print(u"-Error: Can't read other fuels for plant with name {0}".format(name))
+            else:  # if (B) results in more strings:
+                try:  # (C) try to assign primary fuel to first value
+                    primary_fuel = pw.standardize_fuel(fuel_string_list[0], fuel_thesaurus, as_set=False)
+                except:  # if (C) fails, ignore the rest of the values and give nodata
+                    print(u"-Error: Can't read fuel <{0}> for plant with name {1}".format(fuel_string_list[0], name))
+                    primary_fuel = pw.NO_DATA_UNICODE
                     other_fuel = pw.NO_DATA_SET.copy()
-    else:  # if (A) succeeds, give an empty value for the other fuels
-        other_fuel = pw.NO_DATA_SET.copy()
-
-    try:
-        location = pw.format_string(row[location_col], None)
-        latitude = pw.NO_DATA_NUMERIC
-        longitude = pw.NO_DATA_NUMERIC
-        geolocation_source = SOURCE_NAME_CRE
-    except:
-        print(u"-Error: Can't read location for plant with name {0}".format(name))
-        location = pw.NO_DATA_UNICODE
-        latitude = pw.NO_DATA_NUMERIC
-        longitude = pw.NO_DATA_NUMERIC
-        geolocation_source = pw.NO_DATA_UNICODE
-
-    try:
-        com_date = row[rv[commissioning_col]]
-    except:
-        #print(u"-Error:Can't read reference date for plant with name {0}".format(name))
-        com_date = pw.NO_DATA_UNICODE
-
-    # assign ID number
-    idnr = pw.make_id(SAVE_CODE, i + max_id)   # probably should use idval somehow
-    new_location = pw.LocationObject(location, latitude, longitude)
-    new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=COUNTRY_NAME,
-        plant_owner=owner, plant_cap_year=SOURCE_YEAR,
-        plant_location=new_location, plant_coord_source=geolocation_source,
-        plant_primary_fuel=primary_fuel, plant_capacity=capacity,
-        plant_source=SOURCE_URL_3, plant_source_url=SOURCE_URL_3)
-    plants_dictionary[idnr] = new_plant
-
-# report on plants read from file
-print(u"Loaded {0} plants to database.".format(len(plants_dictionary)))
-
-# write database to csv format
-pw.write_csv_file(plants_dictionary, CSV_FILE_NAME)
-
-# save database
-pw.save_database(plants_dictionary, SAVE_CODE, SAVE_DIRECTORY)
-print(u"Pickled database to {0}".format(SAVE_DIRECTORY))
+                else:  # if (C) succeeds:
+                    try:  # (D) try to assign the remaining values to other fuels
+                        fuel_set = pw.standardize_fuel('/'.join(fuel_string_list[1:]), fuel_thesaurus, as_set=True)
+                    except:  # if (D) fails, give an empty value for the other fuels
+                        print(u"-Error: Can't read other fuels for plant with name {0}".format(name))
+                        other_fuel = pw.NO_DATA_SET.copy()
+        else:  # if (A) succeeds, give an empty value for the other fuels
+            other_fuel = pw.NO_DATA_SET.copy()
+
+        try:
+            location = pw.format_string(row[location_col], None)
+            latitude = pw.NO_DATA_NUMERIC
+            longitude = pw.NO_DATA_NUMERIC
+            geolocation_source = SOURCE_NAME_CRE
+        except:
+            print(u"-Error: Can't read location for plant with name {0}".format(name))
+            location = pw.NO_DATA_UNICODE
+            latitude = pw.NO_DATA_NUMERIC
+            longitude = pw.NO_DATA_NUMERIC
+            geolocation_source = pw.NO_DATA_UNICODE
+
+        try:
+            com_date = row[rv[commissioning_col]]
+        except:
+            #print(u"-Error:Can't read reference date for plant with name {0}".format(name))
+            com_date = pw.NO_DATA_UNICODE
+
+        # assign ID number
+        idnr = pw.make_id(SAVE_CODE, i + max_id)   # probably should use idval somehow
+        new_location = pw.LocationObject(location, latitude, longitude)
+        new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=COUNTRY_NAME,
+            plant_owner=owner, plant_cap_year=SOURCE_YEAR,
+            plant_location=new_location, plant_coord_source=geolocation_source,
+            plant_primary_fuel=primary_fuel, plant_capacity=capacity,
+            plant_source=SOURCE_URL_3, plant_source_url=SOURCE_URL_3)
+        plants_dictionary[idnr] = new_plant
+
+    # report on plants read from file
+    print(u"Loaded {0} plants to database.".format(len(plants_dictionary)))
+    pw.report_unidentified_fuels(fuel_thesaurus)
+
+    return plants_dictionary
+
+
+### MAIN ###
+if __name__ == '__main__':
+    plants_dictionary = build(pw.BuildResources(), pw.build_arg_parser())
+
+    # write database to csv format
+    pw.write_csv_file(plants_dictionary, CSV_FILE_NAME)
+
+    # save database
+    pw.save_database(plants_dictionary, SAVE_CODE, SAVE_DIRECTORY)
+    print(u"Pickled database to {0}".format(SAVE_DIRECTORY))
@@ -42,9 +42,6 @@ SAVE_DIRECTORY = pw.make_file_path(fileType="src_bin")
 #COORDINATE_FILE = pw.make_file_path(fileType="resource", subFolder=SAVE_CODE, filename="coordinates_{0}.csv".format(SAVE_CODE))
 ENCODING = "UTF-8"
 
-# download files if requested
-DOWNLOAD_FILES = pw.download('UTE data', {RAW_FILE_NAME: SOURCE_URL})
-
 # make URY-specific fuel parser
 def parse_fuel_URY(fuel_string, id_val):
     """Returns a tuple of primary_fuel, other_fuel_set."""
@@ -73,109 +70,122 @@ def parse_fuel_URY(fuel_string, id_val):
         return ("Oil", pw.NO_DATA_SET.copy())
 
 
-# set up fuel type thesaurus
-fuel_thesaurus = pw.make_fuel_thesaurus()
+def build(resources, options):
+    """Read the Uruguay (UTE) power plants into a dict of {gppd_idnr: PowerPlant}."""
+    # download files if requested
+    DOWNLOAD_FILES = pw.download('UTE data', {RAW_FILE_NAME: SOURCE_URL}, force=options.download)
+
+    # set up fuel type thesaurus
+    fuel_thesaurus = resources.fuel_thesaurus
+
+    # create dictionary for power plant objects
+    plants_dictionary = {}
+
+    # parse HTML to XML
+    parser = etree.HTMLParser(encoding=ENCODING)
+    tree = etree.parse(RAW_FILE_NAME, parser)
+    root = tree.getroot()
+
+    # get list of plant markers
+    plant_markers = tree.findall("body/form/ul/li")
 
-# create dictionary for power plant objects
-plants_dictionary = {}
+    # parse plant markers
+    for p in plant_markers:
 
-# parse HTML to XML
-parser = etree.HTMLParser(encoding=ENCODING)
-tree = etree.parse(RAW_FILE_NAME, parser)
-root = tree.getroot()
+        dict_string = p.attrib['data-gmapping']
+        try:
+            p_dict = json.loads(dict_string)      # safer than eval()
+        except:
+            print(u"- Error: Can't evaluate string to dictionary:")
+            print(dict_string)
+            continue
 
-# get list of plant markers
-plant_markers = tree.findall("body/form/ul/li")
+        # only read operational plants
+        try:
+            operational_status = p_dict['operativo']
+            if operational_status != "En Servicio":
+                continue
+        except:
+            print(u"- Error: Can't evaluate operational status.")
+            continue
 
-# parse plant markers
-for p in plant_markers:
+        # get id
+        try:
+            id_val = int(p_dict['id'])
+        except:
+            print(u"- Error: Can't get ID.")
+            continue
+
+        # get name
+        try:
+            name = pw.format_string(p_dict['generador'].encode(ENCODING), ENCODING)
+        except:
+            print(u"- Error: Can't get name for plant {0}".format(id_val))
+            continue
 
-    dict_string = p.attrib['data-gmapping']
-    try:
-        p_dict = json.loads(dict_string)      # safer than eval()
-    except:
-        print(u"- Error: Can't evaluate string to dictionary:")
-        print(dict_string)
-        continue
+        # get capacity in MW
+        try:
+            capacity = float(p_dict['potenciaInstalada'].strip(" MW"))
+        except:
+            print(u"- Error: Can't get capacity for plant {0}".format(id_val))
+            continue
 
-    # only read operational plants
-    try:
-        operational_status = p_dict['operativo']
-        if operational_status != "En Servicio":
+        # get fuel type
+        try:
+            fuel_string_raw = p_dict['icon']
+            primary_fuel_string, other_fuel_set = parse_fuel_URY(fuel_string_raw[9:12], id_val)         # extract fuel name from icon name
+            primary_fuel = pw.standardize_fuel(primary_fuel_string, fuel_thesaurus, as_set=False)
+        except:
+            print(u"- Error: Can't read fuel type {0} for plant {1}".format(primary_fuel_string, id_val))
             continue
-    except:
-        print(u"- Error: Can't evaluate operational status.")
-        continue
-
-    # get id
-    try:
-        id_val = int(p_dict['id'])
-    except:
-        print(u"- Error: Can't get ID.")
-        continue
-
-    # get name
-    try:
-        name = pw.format_string(p_dict['generador'].encode(ENCODING), ENCODING)
-    except:
-        print(u"- Error: Can't get name for plant {0}".format(id_val))
-        continue
-
-    # get capacity in MW
-    try:
-        capacity = float(p_dict['potenciaInstalada'].strip(" MW"))
-    except:
-        print(u"- Error: Can't get capacity for plant {0}".format(id_val))
-        continue
-
-    # get fuel type
-    try:
-        fuel_string_raw = p_dict['icon']
-        primary_fuel_string, other_fuel_set = parse_fuel_URY(fuel_string_raw[9:12], id_val)         # extract fuel name from icon name
-        primary_fuel = pw.standardize_fuel(primary_fuel_string, fuel_thesaurus, as_set=False)
-    except:
-        print(u"- Error: Can't read fuel type {0} for plant {1}".format(primary_fuel_string, id_val))
-        continue
-
-    # get coordinates
-    try:
-        c_dict = p_dict['latlng']
-        latitude = float(p_dict['latlng']['lat'])
-        longitude = float(p_dict['latlng']['lng'])
-        geolocation_source = SOURCE_NAME
-    except:
-        print(u"- Error: Can't read coordinates for plant {0}".format(id_val))
-        geolocation_source = pw.NO_DATA_UNICODE
-
-    # get owner
-    try:
-        owner = pw.format_string(p_dict['empresa'])
-    except:
-        print(u"- Error: Can't read owner for plant {0}".format(id_val))
-        owner = pw.NO_DATA_UNICODE
+
+        # get coordinates
+        try:
+            c_dict = p_dict['latlng']
+            latitude = float(p_dict['latlng']['lat'])
+            longitude = float(p_dict['latlng']['lng'])
+            geolocation_source = SOURCE_NAME
+        except:
+            print(u"- Error: Can't read coordinates for plant {0}".format(id_val))
+            geolocation_source = pw.NO_DATA_UNICODE
+
+        # get owner
+        try:
+            owner = pw.format_string(p_dict['empresa'])
+        except:
+            print(u"- Error: Can't read owner for plant {0}".format(id_val))
+            owner = pw.NO_DATA_UNICODE
         
-    # assign ID number
-    idnr = pw.make_id(SAVE_CODE,id_val)
-
-    # special coordinate corrections
-    #if idnr in special_coordinate_corrections.keys():
-    #    latitude,longitude = special_coordinate_corrections[idnr]
-    #    print(u"Special lat/long correction for plant {0}".format(idnr))
-
-    new_location = pw.LocationObject(pw.NO_DATA_UNICODE, latitude, longitude)
-    new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=COUNTRY_NAME,
-        plant_location=new_location, plant_coord_source=geolocation_source,
-        plant_primary_fuel=primary_fuel, plant_other_fuel=other_fuel_set,
-		plant_capacity=capacity,
-        plant_source=SOURCE_NAME, plant_source_url=SOURCE_URL, plant_cap_year=SOURCE_YEAR)
-    plants_dictionary[idnr] = new_plant
-
-# report on plants read from file
-print(u"...read {0} plants.".format(len(plants_dictionary)))
-
-# write database to csv format
-pw.write_csv_file(plants_dictionary, CSV_FILE_NAME)
-
-# save database
-pw.save_database(plants_dictionary, SAVE_CODE, SAVE_DIRECTORY)
-print(u"Pickled database to {0}".format(SAVE_DIRECTORY))
+        # assign ID number
+        idnr = pw.make_id(SAVE_CODE,id_val)
+
+        # special coordinate corrections
+        #if idnr in special_coordinate_corrections.keys():
+        #    latitude,longitude = special_coordinate_corrections[idnr]
+        #    print(u"Special lat/long correction for plant {0}".format(idnr))
+
+        new_location = pw.LocationObject(pw.NO_DATA_UNICODE, latitude, longitude)
+        new_plant = pw.PowerPlant(plant_idnr=idnr, plant_name=name, plant_country=COUNTRY_NAME,
+            plant_location=new_location, plant_coord_source=geolocation_source,
+            plant_primary_fuel=primary_fuel, plant_other_fuel=other_fuel_set,
+    		plant_capacity=capacity,
+            plant_source=SOURCE_NAME, plant_source_url=SOURCE_URL, plant_cap_year=SOURCE_YEAR)
+        plants_dictionary[idnr] = new_plant
+
+    # report on plants read from file
+    print(u"...read {0} plants.".format(len(plants_dictionary)))
+    pw.report_unidentified_fuels(fuel_thesaurus)
+
+    return plants_dictionary
+
+
+### MAIN ###
+if __name__ == '__main__':
+    plants_dictionary = build(pw.BuildResources(), pw.build_arg_parser())
+
+    # write database to csv format
+    pw.write_csv_file(plants_dictionary, CSV_FILE_NAME)
+
+    # save database
+    pw.save_database(plants_dictionary, SAVE_CODE, SAVE_DIRECTORY)
+    print(u"Pickled database to {0}".format(SAVE_DIRECTORY))
@@ -25,13 +25,20 @@ WRI_DATABASE_FILE = pw.make_file_path(fileType="src_bin", filename="WRI-Database
 GEO_DATABASE_FILE = pw.make_file_path(fileType="src_bin", filename="GEODB-Database.bin")
 CARMA_DATABASE_FILE = pw.make_file_path(fileType="src_bin", filename="CARMA-Database.bin")
 DATABASE_CSV_SAVEFILE = pw.make_file_path(fileType="output", filename="global_power_plant_database.csv")
+DATABASE_COLUMNAR_SAVEFILE = pw.make_file_path(fileType="output", filename="global_power_plant_database.npz")
+DATABASE_SQLITE_SAVEFILE = pw.make_file_path(fileType="output", filename="global_power_plant_database.sqlite")
+DATABASE_SUMMARY_SAVEFILE = pw.make_file_path(fileType="output", filename="global_power_plant_database_country_summary.csv")
 DATABASE_BUILD_LOG_FILE = pw.make_file_path(fileType="output", filename="database_build_log.txt")
 DATABASE_CSV_DUMPFILE = pw.make_file_path(fileType="output", filename="global_power_plant_database_data_dump.csv")
+DATABASE_SHARDS_DIR = pw.make_file_path(fileType="output", subFolder="country_shards")
 MINIMUM_CAPACITY_MW = 1
 
 parser = argparse.ArgumentParser()
 parser.add_argument("--dump", help="dump all the data", action="store_true")
-DATA_DUMP = True if parser.parse_args().dump else False
+parser.add_argument("--shards", nargs="+", choices=sorted(pw.SHARD_FORMATS),
+	help="also write per-country shards in these formats")
+args = parser.parse_args()
+DATA_DUMP = True if args.dump else False
 
 # open log file
 f_log = open(DATABASE_BUILD_LOG_FILE, 'a')
@@ -54,22 +61,46 @@ carma_id_used = []	# Record matched carma_ids
 
 # STEP 0: Read in source databases.
 # Identify countries with automated data from .automated flag.
+# All source databases are loaded as compact (slotted) plants to limit memory use.
 print("Loading source databases...")
 country_databases = {}
 for country_name, country in country_dictionary.iteritems():
 	if country.automated == 1:
 		country_code = country.iso_code
 		database_filename = COUNTRY_DATABASE_FILE.replace("COUNTRY", country_code)
-		country_databases[country_name] = pw.load_database(database_filename)
+		pw.record_build_input(database_filename)
+		country_databases[country_name] = pw.load_database(database_filename, compact=True)
 		print("Loaded {0} plants from {1} database.".format(len(country_databases[country_name]), country_name))
 
 # Load multi-country databases.
-wri_database = pw.load_database(WRI_DATABASE_FILE)
-print("Loaded {0} plants from WRI database.".format(len(wri_database)))
-geo_database = pw.load_database(GEO_DATABASE_FILE)
-print("Loaded {0} plants from GEO database.".format(len(geo_database)))
-carma_database = pw.load_database(CARMA_DATABASE_FILE)
-print("Loaded {0} plants from CARMA database.".format(len(carma_database)))
+# The data dump holds every plant, so all of them are loaded for it. Otherwise only
+# the country partitions that can contribute plants (and those of unrecognized
+# countries, which are reported) are read, and GEO and CARMA plants matched to WRI
+# plants are read by ID.
+def _wri_contributes(country):
+	if country not in country_dictionary:
+		return True
+	country = country_dictionary[country]
+	return not (country.automated or country.use_geo or country.wri_data_built_in)
+
+def _geo_contributes(country):
+	return country not in country_dictionary or country_dictionary[country].use_geo
+
+if DATA_DUMP:
+	wri_database = pw.load_database(WRI_DATABASE_FILE, compact=True)
+	wri_plants = wri_database.items()
+	geo_database = pw.load_database(GEO_DATABASE_FILE, compact=True)
+	geo_plants = geo_database.items()
+	carma_database = pw.load_database(CARMA_DATABASE_FILE, compact=True)
+	print("Loaded {0} plants from CARMA database.".format(len(carma_database)))
+else:
+	wri_database = pw.open_database(WRI_DATABASE_FILE, compact=True)
+	wri_plants = wri_database.items(filter(_wri_contributes, wri_database.countries()))
+	geo_database = pw.open_database(GEO_DATABASE_FILE, compact=True)
+	geo_plants = geo_database.items(filter(_geo_contributes, geo_database.countries()))
+	carma_database = pw.open_database(CARMA_DATABASE_FILE, compact=True)
+print("Loaded {0} plants from WRI database.".format(len(wri_plants)))
+print("Loaded {0} plants from GEO database.".format(len(geo_plants)))
 
 # Track counts using a dict with keys corresponding to each data source
 db_sources = country_databases.keys()
@@ -94,9 +125,9 @@ for country_name, database in country_databases.iteritems():
 
 # STEP 2: Go through WRI database and triage plants
 print("Adding plants from WRI internal database.")
-for plant_id, plant in wri_database.iteritems():
+for plant_id, plant in wri_plants:
 	# Cases to skip
-	if not isinstance(plant, pw.PowerPlant):
+	if not isinstance(plant, (pw.PowerPlant, pw.CompactPowerPlant)):
 		f_log.write('Error: plant {0} is not a PowerPlant object.\n'.format(plant_id))
 		continue
 	if plant.country not in country_dictionary.keys():
@@ -165,7 +196,7 @@ for plant_id, plant in wri_database.iteritems():
 
 # STEP 3: Go through GEO database and add plants from small countries
 # Plants in this database only have numeric ID (no prefix) because of concordance matching
-for plant_id,plant in geo_database.iteritems():
+for plant_id,plant in geo_plants:
 	# Catch errors if plants do not have a correct country assigned
 	datadump[plant_id] = plant
 	if plant.country not in country_dictionary.keys():
@@ -188,9 +219,9 @@ for plant_id,plant in geo_database.iteritems():
 # STEP 3.1: Append another multinational database
 wiki_solar_file = pw.make_file_path(fileType="raw", subFolder="Wiki-Solar", filename="wiki-solar-plant-additions-2019.csv")
 wiki_solar_exclusion = pw.make_file_path(fileType="resource", filename="wiki-solar-exclusion.csv")
-country_lookup = {cc.iso_code: cc.primary_name for cc in country_dictionary.values()}
+country_index = pw.CountryIndex(country_dictionary)
 # FIXME: patch lookup with additional geographies relevant in the wikisolar dataset
-country_lookup.update({
+for iso_code, country_name in {
 	# Bonaire, Sint Eustatius and Saba
 	"BES": "Netherlands",
 	# Cayman Islands
@@ -201,7 +232,8 @@ country_lookup.update({
 	"REU": "France",
 	# The Virgin Islands of the United States
 	"VIR": "United States of America",
-})
+}.iteritems():
+	country_index.add_alias(iso_code, country_name, replace=True)
 wiki_solar_skip = {
 	'United States of America': (0, 0)
 }
@@ -214,7 +246,7 @@ with open(wiki_solar_file) as fin:
 	for solar_plant in wiki_solar:
 		if solar_plant['id'] in _exclude_list:
 			continue
-		country = country_lookup.get(solar_plant['country'], '')
+		country = country_index.resolve(solar_plant['country'])
 		plant_idnr = 'WKS{0:07d}'.format(int(solar_plant['id']))
 		plant_location = pw.LocationObject(latitude=float(solar_plant['lat']), longitude=float(solar_plant['lon']))
 		plant = pw.PowerPlant(
@@ -239,6 +271,8 @@ print("Loaded {0} plants from Wiki-Solar database.".format(wiki_solar_count))
 for _country, _vals in wiki_solar_skip.iteritems():
 	if _vals[0] != 0:
 		print("...skipped {0} plants ({1} MW) for {2}.".format(_vals[0], _vals[1], _country))
+for _country, _count in country_index.pop_misses().iteritems():
+	print("...couldn't identify country {0} for {1} plants.".format(_country, _count))
 
 
 # STEP 3.9: Add in multinational generation datasets
@@ -311,7 +345,7 @@ for pid, pp in core_database.items():
 			gen = pw.PlantGenerationObject.create(val, year=yr, source='JRC-PPDB-OPEN')
 			new_generation.append(gen)
 		if new_generation:
-			pp.generation = new_generation
+			pp.generation = pw.GenerationSeries(new_generation)
 #print("Added {0} plants ({1} MW) from {2}.".format(data['count'], data['capacity'], dbname))
 
 # STEP 4: Estimate generation for plants without reported generation for target year
@@ -335,7 +369,23 @@ for dbname, data in database_additions.iteritems():
 
 f_log.close()
 print("Loaded {0} plants to the Global Power Plant Database.".format(len(core_database)))
-pw.write_csv_file(core_database, DATABASE_CSV_SAVEFILE)
+# write the CSV, the SQLite database, the country summary, the columnar file and the shards in one pass
+if os.path.exists(DATABASE_SQLITE_SAVEFILE):
+	os.remove(DATABASE_SQLITE_SAVEFILE)
+sqlite_sink = pw.SQLiteSink(DATABASE_SQLITE_SAVEFILE, keep_connection=True)
+sinks = [
+	pw.CSVSink(DATABASE_CSV_SAVEFILE),
+	sqlite_sink,
+	pw.CountrySummarySink(DATABASE_SUMMARY_SAVEFILE, database=sqlite_sink),
+	pw.ColumnarSink(DATABASE_COLUMNAR_SAVEFILE),
+	]
+if args.shards:
+	shard_sink = pw.ShardSink(DATABASE_SHARDS_DIR, formats=args.shards)
+	sinks.append(shard_sink)
+pw.export_database(core_database, sinks)
+sqlite_sink.conn.close()
+if args.shards:
+	print("Wrote shards for {0} countries to {1}.".format(len(shard_sink.manifest['countries']), DATABASE_SHARDS_DIR))
 print("Global Power Plant Database built.")
 
 # STEP 6: Dump Data
@@ -362,4 +412,6 @@ if DATA_DUMP:
 	pw.write_csv_file(datadump, DATABASE_CSV_DUMPFILE,dump=True)
 	print("Data dumped.")
 
+# record the inputs of this build, to skip it while they are unchanged
+pw.write_build_stamp(DATABASE_CSV_SAVEFILE, options=sys.argv[1:])
 print("Finished.")
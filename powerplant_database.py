@@ -7,13 +7,37 @@ A library to support open-source power sector data.
 import datetime
 import argparse
 import requests
-import urllib				# necessary because requests doesn't handle FTP
+import ftplib				# necessary because requests doesn't handle FTP
+import urlparse
 import pickle
+import cPickle
+import cStringIO
+import struct
 import csv
 import sys
 import os
 import sqlite3
+import time
 import re
+import math
+import gc
+import shutil
+import threading
+import multiprocessing
+import multiprocessing.pool
+import glob
+import gzip
+import hashlib
+import json
+import functools
+import operator
+try:
+	import fcntl			# file locks (POSIX)
+except ImportError:
+	import msvcrt			# file locks (Windows)
+	fcntl = None
+from itertools import izip, izip_longest, islice
+import numpy as np
 
 ### PARAMS ###
 # Folder directories
@@ -23,6 +47,8 @@ RESOURCES_DIR = os.path.join(ROOT_DIR, "resources")
 SOURCE_DB_BIN_DIR = os.path.join(ROOT_DIR, "source_databases")
 SOURCE_DB_CSV_DIR = os.path.join(ROOT_DIR, "source_databases_csv")
 OUTPUT_DIR = os.path.join(ROOT_DIR, "output_database")
+RESOURCE_CACHE_DIR = os.path.join(ROOT_DIR, "resource_cache")
+RAW_CACHE_DIR = os.path.join(RAW_DIR, ".cache")
 DIRs = {"raw": RAW_DIR, "resource": RESOURCES_DIR, "src_bin": SOURCE_DB_BIN_DIR,
 		"src_csv": SOURCE_DB_CSV_DIR, "root": ROOT_DIR, "output": OUTPUT_DIR}
 
@@ -113,10 +139,10 @@ class PowerPlant(object):
 				if input_parameter is NO_DATA_OTHER:
 					#setattr(self, attribute, [PlantGenerationObject()])
 					setattr(self, attribute, NO_DATA_OTHER)
-				elif type(input_parameter) is PlantGenerationObject:
-					setattr(self, attribute, [input_parameter])
+				elif type(input_parameter) in (PlantGenerationObject, CompactPlantGenerationObject):
+					setattr(self, attribute, GenerationSeries([input_parameter]))
 				else: # assume list/tuple of PlantGenerationObject
-					setattr(self, attribute, list(input_parameter))
+					setattr(self, attribute, GenerationSeries(input_parameter))
 			elif attribute == 'other_names':				# Note: Not implemented
 				if type(input_parameter) is NO_DATA_OTHER:
 					setattr(self, attribute, NO_DATA_OTHER)
@@ -151,12 +177,18 @@ class PowerPlant(object):
 					setattr(self, attribute, format_string(input_parameter, encoding=None))
 				else:
 					setattr(self, attribute, NO_DATA_UNICODE)
-			elif attribute == 'location' and type(input_parameter) is not LocationObject:
+			elif attribute == 'location' and type(input_parameter) not in (LocationObject, CompactLocationObject):
 				setattr(self, attribute, LocationObject())
 			else:  # everything OK
 				setattr(self, attribute, input_parameter)
 
 
+	def __setstate__(self, state):
+		"""Restore a pickled plant, indexing its generation data by year."""
+		self.__dict__.update(state)
+		if type(getattr(self, 'generation', None)) is list:
+			self.generation = GenerationSeries(self.generation)
+
 	def __repr__(self):
 		"""Representation of the PowerPlant."""
 		return 'PowerPlant: {0}'.format(self.idnr)
@@ -176,6 +208,205 @@ class PowerPlant(object):
 		except:
 			return self.__repr__()
 
+	@classmethod
+	def from_records(cls, records):
+		"""
+		Build plants in bulk from already-typed records.
+
+		Produces the same attributes as calling the constructor once per record,
+		but in a single pass: conversions are checked once per record, and
+		only a record that fails is re-examined field by field to report
+		what went wrong. Source names are formatted once per distinct value,
+		and cyclic garbage collection is paused for the duration.
+
+		Parameters
+		----------
+		records : iterable of dict
+			One dict per plant, keyed by constructor argument names without
+			the 'plant_' prefix (e.g. 'idnr', 'capacity', 'source_url').
+			'idnr', 'name' and 'country' are required; other keys default as
+			in the constructor.
+
+		Returns
+		-------
+		plants : list
+			Plants of this class, in record order. Records missing a
+			required field are left out.
+		errors : list of tuple
+			(row, field, value, message) for each problem found. Fields that
+			fail conversion are set to their no-data value (the constructor
+			leaves an unconvertible numeric attribute unset).
+		"""
+		plants = []
+		errors = []
+		sources = {}
+		# new plants hold no reference cycles; skip cyclic GC passes while allocating them
+		gc_enabled = gc.isenabled()
+		gc.disable()
+		try:
+			for row, record in enumerate(records):
+				try:
+					state = _record_state(record, sources)
+				except Exception:
+					state = _checked_record_state(record, sources, errors, row)
+					if state is None:
+						continue
+				plants.append(_restore_object(cls, state))
+		finally:
+			if gc_enabled:
+				gc.enable()
+		return plants, errors
+
+	@classmethod
+	def from_columns(cls, columns):
+		"""
+		Build plants in bulk from column sequences (lists or NumPy arrays).
+
+		Parameters
+		----------
+		columns : dict
+			Dict of {field: sequence}, with fields named as for `from_records()`
+			and all sequences of the same length.
+
+		Returns
+		-------
+		plants, errors
+			As for `from_records()`.
+		"""
+		names = list(columns)
+		values = [c.tolist() if isinstance(c, np.ndarray) else c for c in columns.itervalues()]
+		if len(set(len(v) for v in values)) > 1:
+			raise ValueError('columns must all have the same length')
+		return cls.from_records(dict(izip(names, row)) for row in izip(*values))
+
+### BULK CONSTRUCTION ###
+
+def _unicode_field(value):
+	if type(value) is unicode:
+		return value
+	return value.decode(UNICODE_ENCODING)
+
+def _numeric_field(value):
+	if value is NO_DATA_NUMERIC or type(value) is float or type(value) is int:
+		return value
+	return float(value)
+
+def _generation_field(value):
+	if value is NO_DATA_OTHER:
+		return NO_DATA_OTHER
+	if type(value) in (PlantGenerationObject, CompactPlantGenerationObject):
+		return GenerationSeries([value])
+	return GenerationSeries(value)
+
+def _location_field(value):
+	if type(value) in (LocationObject, CompactLocationObject):
+		return value
+	return LocationObject()
+
+def _other_fuel_field(value, primary_fuel):
+	# double-check that primary fuel isn't in other fuel (avoid redundancy)
+	if type(value) is set:
+		if primary_fuel in value:
+			value = value - set([primary_fuel])
+		return value if value else NO_DATA_SET.copy()
+	if value:
+		raise TypeError('other fuel must be a set')
+	return NO_DATA_SET.copy()
+
+def _source_field(value, sources):
+	if type(value) is SourceObject:
+		return value
+	if type(value) is str or type(value) is unicode:
+		# cache per type, so equal str and unicode names aren't mixed up
+		formatted = sources.setdefault(type(value), {})
+		if value not in formatted:
+			formatted[value] = format_string(value, encoding=UNICODE_ENCODING if type(value) is str else None)
+		return formatted[value]
+	return NO_DATA_UNICODE
+
+# (record key, plant attribute, converter, default, value used if conversion fails)
+RECORD_FIELDS = (
+	('idnr', 'idnr', _unicode_field, NO_DATA_UNICODE, NO_DATA_UNICODE),
+	('name', 'name', _unicode_field, NO_DATA_UNICODE, NO_DATA_UNICODE),
+	('country', 'country', _unicode_field, NO_DATA_UNICODE, NO_DATA_UNICODE),
+	('owner', 'owner', _unicode_field, NO_DATA_UNICODE, NO_DATA_UNICODE),
+	('nat_lang', 'nat_lang', _unicode_field, NO_DATA_UNICODE, NO_DATA_UNICODE),
+	('source_url', 'url', _unicode_field, NO_DATA_UNICODE, NO_DATA_UNICODE),
+	('coord_source', 'coord_source', _unicode_field, NO_DATA_UNICODE, NO_DATA_UNICODE),
+	('primary_fuel', 'primary_fuel', _unicode_field, NO_DATA_UNICODE, NO_DATA_UNICODE),
+	('wepp_id', 'wepp_id', _unicode_field, NO_DATA_UNICODE, NO_DATA_UNICODE),
+	('capacity', 'capacity', _numeric_field, NO_DATA_NUMERIC, NO_DATA_NUMERIC),
+	('cap_year', 'cap_year', _numeric_field, NO_DATA_NUMERIC, NO_DATA_NUMERIC),
+	('commissioning_year', 'commissioning_year', _numeric_field, NO_DATA_NUMERIC, NO_DATA_NUMERIC),
+	('estimated_generation_gwh', 'estimated_generation_gwh', _numeric_field, NO_DATA_NUMERIC, NO_DATA_NUMERIC),
+	('generation', 'generation', _generation_field, NO_DATA_OTHER, NO_DATA_OTHER),
+	('location', 'location', _location_field, NO_DATA_OTHER, NO_DATA_OTHER),
+)
+RECORD_KEYS = frozenset([f[0] for f in RECORD_FIELDS] + ['other_fuel', 'source'])
+REQUIRED_RECORD_KEYS = ('idnr', 'name', 'country')
+_UNICODE_RECORD_FIELDS = tuple((f[0], f[1]) for f in RECORD_FIELDS if f[2] is _unicode_field)
+_NUMERIC_RECORD_FIELDS = tuple((f[0], f[1]) for f in RECORD_FIELDS if f[2] is _numeric_field)
+_NUMERIC_TYPES = (float, int, type(NO_DATA_NUMERIC))
+
+def _record_state(record, sources):
+	"""
+	Convert a record to a PowerPlant attribute dict, as `PowerPlant.__init__` would.
+
+	Raise on the first problem; `_checked_record_state()` reports them all.
+	"""
+	if not RECORD_KEYS.issuperset(record):
+		raise ValueError('unknown field')
+	if 'idnr' not in record or 'name' not in record or 'country' not in record:
+		raise ValueError('missing required field')
+	get = record.get
+	state = {}
+	for key, attribute in _UNICODE_RECORD_FIELDS:
+		value = get(key, NO_DATA_UNICODE)
+		state[attribute] = value if type(value) is unicode else value.decode(UNICODE_ENCODING)
+	for key, attribute in _NUMERIC_RECORD_FIELDS:
+		value = get(key, NO_DATA_NUMERIC)
+		state[attribute] = value if type(value) in _NUMERIC_TYPES else float(value)
+	state['generation'] = _generation_field(get('generation', NO_DATA_OTHER))
+	state['location'] = _location_field(get('location', NO_DATA_OTHER))
+	state['other_fuel'] = _other_fuel_field(get('other_fuel', NO_DATA_SET), get('primary_fuel', NO_DATA_UNICODE))
+	state['source'] = _source_field(get('source', NO_DATA_OTHER), sources)
+	return state
+
+def _checked_record_state(record, sources, errors, row):
+	"""
+	Convert a record like `_record_state()`, checking each field.
+
+	Append (row, field, value, message) to `errors` for every problem, using
+	each field's no-data value instead. Return None if a required field is
+	missing.
+	"""
+	for key in set(record) - RECORD_KEYS:
+		errors.append((row, key, record[key], 'unknown field'))
+	missing = [key for key in REQUIRED_RECORD_KEYS if key not in record]
+	for key in missing:
+		errors.append((row, key, None, 'missing required field'))
+	if missing:
+		return None
+
+	get = record.get
+	state = {}
+	for key, attribute, convert, default, fallback in RECORD_FIELDS:
+		value = get(key, default)
+		try:
+			state[attribute] = convert(value)
+		except Exception:
+			errors.append((row, key, value, 'cannot convert with {0}'.format(convert.__name__)))
+			state[attribute] = fallback
+	primary_fuel = get('primary_fuel', NO_DATA_UNICODE)
+	other_fuel = get('other_fuel', NO_DATA_SET)
+	try:
+		state['other_fuel'] = _other_fuel_field(other_fuel, primary_fuel)
+	except Exception:
+		errors.append((row, 'other_fuel', other_fuel, 'other fuel must be a set'))
+		state['other_fuel'] = NO_DATA_SET.copy()
+	state['source'] = _source_field(get('source', NO_DATA_OTHER), sources)
+	return state
+
 class MasterPlant(object):
 	#TODO: remove this class
 	def __init__(self, master_idnr, matches):
@@ -402,6 +633,282 @@ class PlantGenerationObject(object):
 			return PlantGenerationObject(gwh, source=source)
 
 
+class GenerationSeries(list):
+	"""
+	List of PlantGenerationObject with a year index, used as `PowerPlant.generation`.
+
+	Behaves as the plain list of generation objects it replaces (entries may
+	be appended, replaced or edited in place), but keeps a year -> entries
+	index so that `annual_generation()` needs no scan or date arithmetic.
+	Appending updates the index; other list changes rebuild it on the next
+	lookup. Entries are indexed by their dates, which should not be changed
+	once added; gwh values may be.
+	"""
+	__slots__ = ('_full_years', '_part_years')
+
+	def __init__(self, iterable=()):
+		list.__init__(self, iterable)
+		self._reindex()
+
+	def __reduce__(self):
+		return (GenerationSeries, (list(self),))
+
+	def _reindex(self):
+		self._full_years = {}
+		self._part_years = {}
+		for gen in self:
+			self._index(gen)
+
+	def _index(self, gen):
+		start_date = getattr(gen, 'start_date', None)
+		end_date = getattr(gen, 'end_date', None)
+		if start_date is None or end_date is None:
+			return
+		if (end_date - start_date).days in [364, 365]:
+			years = self._full_years
+		else:
+			years = self._part_years
+		for year in xrange(start_date.year, end_date.year + 1):
+			years.setdefault(year, []).append(gen)
+
+	def _indexed(self):
+		if self._full_years is None:
+			self._reindex()
+		return self
+
+	def _changed(self):
+		self._full_years = None
+		self._part_years = None
+
+	def append(self, gen):
+		list.append(self, gen)
+		if self._full_years is not None:
+			self._index(gen)
+
+	def extend(self, iterable):
+		for gen in iterable:
+			self.append(gen)
+
+	def __iadd__(self, iterable):
+		self.extend(iterable)
+		return self
+
+	def __setitem__(self, key, value):
+		list.__setitem__(self, key, value)
+		self._changed()
+
+	def __delitem__(self, key):
+		list.__delitem__(self, key)
+		self._changed()
+
+	def __setslice__(self, i, j, sequence):
+		list.__setslice__(self, i, j, sequence)
+		self._changed()
+
+	def __delslice__(self, i, j):
+		list.__delslice__(self, i, j)
+		self._changed()
+
+	def insert(self, index, gen):
+		list.insert(self, index, gen)
+		self._changed()
+
+	def pop(self, *args):
+		gen = list.pop(self, *args)
+		self._changed()
+		return gen
+
+	def remove(self, gen):
+		list.remove(self, gen)
+		self._changed()
+
+	def reverse(self):
+		list.reverse(self)
+		self._changed()
+
+	def sort(self, *args, **kwargs):
+		list.sort(self, *args, **kwargs)
+		self._changed()
+
+	def annual_gwh(self, year):
+		"""
+		Get reported generation for a year, as `annual_generation()` does.
+
+		Returns
+		-------
+		Float (GWh) of the first valid full-year entry overlapping `year`, otherwise None.
+		"""
+		for gen in self._indexed()._full_years.get(year, ()):
+			if gen:
+				return gen.gwh
+		return None
+
+	def years(self):
+		"""Sorted list of years with a valid full-year entry."""
+		return sorted(year for year in self._indexed()._full_years if self.annual_gwh(year) is not None)
+
+	def annual_rollup(self, year):
+		"""
+		Sum sub-annual (e.g. monthly) entries into generation for a whole year.
+
+		Parameters
+		----------
+		year : int
+			Year to aggregate data.
+
+		Returns
+		-------
+		PlantGenerationObject for the full year if valid entries inside `year`
+		cover it exactly (without gaps or overlaps), otherwise None. It is
+		estimated if any part is, and carries the parts' source if they share one.
+		"""
+		year_start = datetime.date(year, 1, 1)
+		year_end = datetime.date(year, 12, 31)
+		parts = [gen for gen in self._indexed()._part_years.get(year, ())
+			if gen and gen.start_date >= year_start and gen.end_date <= year_end]
+		if not parts:
+			return None
+		parts.sort(key=lambda gen: gen.start_date)
+		next_start = year_start
+		for gen in parts:
+			if gen.start_date != next_start:
+				return None
+			next_start = gen.end_date + datetime.timedelta(days=1)
+		if next_start != year_end + datetime.timedelta(days=1):
+			return None
+		sources = set(gen.source for gen in parts)
+		return PlantGenerationObject(sum(gen.gwh for gen in parts), year_start, year_end,
+			source=sources.pop() if len(sources) == 1 else None,
+			estimated=any(gen.estimated for gen in parts))
+
+
+### COMPACT (SLOTTED) CLASSES ###
+
+# Attributes carried by PowerPlant objects; 'fuel' only appears in databases
+# pickled before fuel was split into primary_fuel and other_fuel.
+PLANT_ATTRIBUTES = ('idnr', 'name', 'country', 'owner', 'nat_lang', 'url',
+	'coord_source', 'primary_fuel', 'other_fuel', 'wepp_id', 'capacity',
+	'cap_year', 'commissioning_year', 'estimated_generation_gwh',
+	'generation', 'source', 'location')
+LEGACY_PLANT_ATTRIBUTES = ('fuel',)
+
+# Low-cardinality string attributes; compact plants share a single copy of each value.
+SHARED_PLANT_ATTRIBUTES = ('country', 'primary_fuel', 'source', 'url', 'coord_source')
+SHARED_GENERATION_ATTRIBUTES = ('source',)
+
+_shared_strings = {}
+
+def _share_string(value):
+	"""Return a single shared instance of a string value."""
+	if type(value) in (str, unicode):
+		return _shared_strings.setdefault(value, value)
+	return value
+
+
+class _SlotsPickleMixin(object):
+	"""Pickle slotted objects as an attribute dict, the same state as their unslotted equivalents."""
+	__slots__ = ()
+
+	def __getstate__(self):
+		state = {}
+		for attribute in self.__slots__:
+			if hasattr(self, attribute):
+				state[attribute] = getattr(self, attribute)
+		return state
+
+	def __setstate__(self, state):
+		for attribute, value in state.iteritems():
+			setattr(self, attribute, value)
+
+	@classmethod
+	def from_object(cls, obj):
+		"""Make a compact copy of an unslotted object (or return `obj` if already compact)."""
+		if type(obj) is cls:
+			return obj
+		compact = cls.__new__(cls)
+		compact.__setstate__(obj.__dict__)
+		return compact
+
+
+class CompactLocationObject(_SlotsPickleMixin):
+	"""Slotted equivalent of `LocationObject`."""
+	__slots__ = ('description', 'latitude', 'longitude')
+
+	__init__ = LocationObject.__dict__['__init__']
+	__repr__ = LocationObject.__dict__['__repr__']
+	__nonzero__ = LocationObject.__dict__['__nonzero__']
+
+
+class CompactPlantGenerationObject(_SlotsPickleMixin):
+	"""Slotted equivalent of `PlantGenerationObject`."""
+	__slots__ = ('gwh', 'start_date', 'end_date', 'source', 'estimated')
+
+	__init__ = PlantGenerationObject.__dict__['__init__']
+	__repr__ = PlantGenerationObject.__dict__['__repr__']
+	__str__ = PlantGenerationObject.__dict__['__str__']
+	__nonzero__ = PlantGenerationObject.__dict__['__nonzero__']
+
+	def __setstate__(self, state):
+		_SlotsPickleMixin.__setstate__(self, state)
+		for attribute in SHARED_GENERATION_ATTRIBUTES:
+			if hasattr(self, attribute):
+				setattr(self, attribute, _share_string(getattr(self, attribute)))
+
+	@staticmethod
+	def create(gwh, year=None, month=None, source=None):
+		"""Construct a CompactPlantGenerationObject for a certain year or month in year."""
+		generation = PlantGenerationObject.create(gwh, year=year, month=month, source=source)
+		return CompactPlantGenerationObject.from_object(generation)
+
+
+class CompactPowerPlant(_SlotsPickleMixin):
+	"""
+	Slotted equivalent of `PowerPlant`, without a per-instance __dict__.
+
+	Takes the same constructor arguments as `PowerPlant` and pickles to the same
+	state, so compact and regular plants can be read from and saved to the same
+	*-Database.bin files. Location and generation data are held in the compact
+	classes, and low-cardinality strings are shared between plants.
+	"""
+	__slots__ = PLANT_ATTRIBUTES + LEGACY_PLANT_ATTRIBUTES
+
+	def __init__(self, *args, **kwargs):
+		PowerPlant.__dict__['__init__'](self, *args, **kwargs)
+		self.__setstate__(self.__getstate__())
+
+	__repr__ = PowerPlant.__dict__['__repr__']
+	__str__ = PowerPlant.__dict__['__str__']
+	from_records = classmethod(PowerPlant.__dict__['from_records'].__func__)
+	from_columns = classmethod(PowerPlant.__dict__['from_columns'].__func__)
+
+	def __setstate__(self, state):
+		_SlotsPickleMixin.__setstate__(self, state)
+		for attribute in SHARED_PLANT_ATTRIBUTES:
+			if hasattr(self, attribute):
+				setattr(self, attribute, _share_string(getattr(self, attribute)))
+		if type(getattr(self, 'location', None)) is LocationObject:
+			self.location = CompactLocationObject.from_object(self.location)
+		if getattr(self, 'generation', None):
+			self.generation = GenerationSeries(CompactPlantGenerationObject.from_object(g)
+				if type(g) is PlantGenerationObject else g for g in self.generation)
+
+
+def compact_database(plant_dict):
+	"""
+	Convert a database of PowerPlant objects to the compact slotted classes.
+
+	Parameters
+	----------
+	plant_dict : dict
+		Dict of {'gppd_idnr': PowerPlant}.
+
+	Returns
+	-------
+	Dict of {'gppd_idnr': CompactPowerPlant}.
+	"""
+	return {idnr: CompactPowerPlant.from_object(plant) for idnr, plant in plant_dict.iteritems()}
+
+
 def annual_generation(gen_list, year):
 	"""
 	Compute the aggregated annual generation for a certain year.
@@ -409,7 +916,8 @@ def annual_generation(gen_list, year):
 	Parameters
 	----------
 	gen_list : list of PlantGenerationObject
-		Input generation data.
+		Input generation data. A GenerationSeries is looked up in its year
+		index instead of being scanned.
 	year : int
 		Year to aggregate data.
 
@@ -418,13 +926,16 @@ def annual_generation(gen_list, year):
 	Float if generation data is found in the year, otherwise None.
 
 	"""
+	if gen_list == None:
+		return None
+
+	if type(gen_list) is GenerationSeries:
+		return gen_list.annual_gwh(year)
+
 	year_start = datetime.date(year, 1, 1)
 	year_end = datetime.date(year, 12, 31)
 	candidates = []
 
-	if gen_list == None:
-		return None
-
 	for gen in gen_list:
 		if not gen:
 			continue
@@ -444,16 +955,230 @@ def annual_generation(gen_list, year):
 
 ### ARGUMENT PARSER ###
 
+_parsed_args = None
+
 def build_arg_parser():
-	"""Parse command-line system arguments."""
-	parser = argparse.ArgumentParser()
-	parser.add_argument("--download", help="download raw files", action="store_true")
-	return parser.parse_args()
+	"""Parse command-line system arguments (once; later calls return the same result)."""
+	global _parsed_args
+	if _parsed_args is None:
+		parser = argparse.ArgumentParser()
+		parser.add_argument("--download", help="download raw files", action="store_true")
+		_parsed_args = parser.parse_args()
+	return _parsed_args
+
+# Downloads: seconds to wait for a connection or data, attempts per file,
+# bytes written at a time and files fetched in parallel.
+DOWNLOAD_TIMEOUT = 60
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+DOWNLOAD_THREADS = 4
+# Suffix of partially downloaded files, kept between attempts to resume them,
+# and of the file saved next to one with the validator of the version being downloaded.
+DOWNLOAD_PART_SUFFIX = '.part'
+DOWNLOAD_VALIDATOR_SUFFIX = '.part.json'
+
+def make_download_session(pool_size=DOWNLOAD_THREADS):
+	"""HTTP session with a connection pool large enough for `pool_size` concurrent downloads."""
+	session = requests.Session()
+	adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+	session.mount('http://', adapter)
+	session.mount('https://', adapter)
+	return session
+
+def _response_validator(response):
+	"""Validator of the version of a response for If-Range: a strong ETag, else Last-Modified; None if neither."""
+	etag = response.headers.get('ETag')
+	if etag and not etag.startswith('W/'):
+		return etag
+	return response.headers.get('Last-Modified')
+
+def _read_part_validator(filename, url):
+	"""Validator saved with the partial download `filename` of `url`, or None."""
+	try:
+		with open(filename + DOWNLOAD_VALIDATOR_SUFFIX, 'rb') as fin:
+			saved = json.load(fin)
+	except (IOError, ValueError):
+		return None
+	if saved.get('url') != url:
+		return None
+	return saved.get('validator')
+
+def _write_part_validator(filename, url, validator):
+	"""Save the validator of the version of `url` being downloaded to `filename` (or remove it, if None)."""
+	validator_filename = filename + DOWNLOAD_VALIDATOR_SUFFIX
+	if validator is None:
+		if os.path.exists(validator_filename):
+			os.remove(validator_filename)
+		return
+	with open(validator_filename, 'wb') as fout:
+		json.dump({'url': url, 'validator': validator}, fout)
+
+def _fetch_http(session, url, fout, offset, post_data, timeout, chunk_size, headers=None, validator=None,
+	on_response=None):
+	"""
+	Stream an HTTP(S) response into `fout`, asking for the bytes from `offset` on.
+
+	With a `validator`, the range is asked for with If-Range, so a server
+	whose file has changed sends all of the new one instead; `fout` is then
+	written over. `on_response` is called with the response before its body
+	is written.
+
+	Returns
+	-------
+	response : requests.Response or None
+		The (closed) response; None if the server can't serve the range
+		requested, in which case nothing was written and the download should
+		start over. Nothing is written for a 304 (Not Modified) response either.
+	"""
+	headers = dict(headers or {})
+	if not post_data:
+		# byte offsets are counted in the file as sent, so it mustn't be compressed for the transfer
+		headers['Accept-Encoding'] = 'identity'
+	if offset:
+		headers['Range'] = 'bytes={0}-'.format(offset)
+		if validator:
+			headers['If-Range'] = validator
+	method = 'POST' if post_data else 'GET'
+	response = session.request(method, url, data=post_data or None, headers=headers, stream=True, timeout=timeout)
+	with response:
+		if offset and response.status_code == 416:
+			# the range starts at the end if the partial file is already complete
+			if response.headers.get('Content-Range', '').rpartition('/')[2] == str(offset):
+				return response
+			return None
+		if response.status_code == 304:
+			return response
+		response.raise_for_status()
+		if offset and response.status_code != 206:
+			# the file has changed, or the server ignores ranges: this is the whole file
+			fout.seek(0)
+			fout.truncate()
+		if on_response is not None:
+			on_response(response)
+		expected = response.headers.get('Content-Length')
+		written = 0
+		for chunk in response.iter_content(chunk_size):
+			fout.write(chunk)
+			written += len(chunk)
+		if expected is not None and written != int(expected) and not response.headers.get('Content-Encoding'):
+			raise IOError('incomplete response from {0}: {1} of {2} bytes'.format(url, written, expected))
+	return response
+
+def _fetch_ftp(url, fout, offset, timeout, chunk_size):
+	"""Stream a file from an FTP server into `fout`, from `offset` on."""
+	parts = urlparse.urlparse(url)
+	ftp = ftplib.FTP(timeout=timeout)
+	try:
+		ftp.connect(parts.hostname, parts.port or ftplib.FTP_PORT)
+		ftp.login(urlparse.unquote(parts.username or 'anonymous'), urlparse.unquote(parts.password or ''))
+		ftp.retrbinary('RETR ' + urlparse.unquote(parts.path), fout.write, chunk_size, offset or None)
+	finally:
+		ftp.close()
+
+def download_file(url, filename, post_data=None, session=None, timeout=DOWNLOAD_TIMEOUT,
+	retries=DOWNLOAD_RETRIES, chunk_size=DOWNLOAD_CHUNK_SIZE, headers=None):
+	"""
+	Download a URL to a file, streaming it to disk in chunks.
+
+	Data is written to `filename` + DOWNLOAD_PART_SUFFIX, which is renamed to
+	`filename` once complete, so `filename` is never left partly written.
+	A failed attempt is retried, resuming the partial file with a range
+	request (HTTP GET) or REST command (FTP).
+
+	The validator (strong ETag, else Last-Modified) of an HTTP response is
+	saved next to the partial file (DOWNLOAD_VALIDATOR_SUFFIX) and sent with
+	If-Range when resuming, so a file changed upstream is downloaded again
+	in full. A partial HTTP download is resumed only if it has a validator
+	for the same URL; otherwise it is started over (or, if left by an
+	earlier run, deleted).
+
+	Parameters
+	----------
+	url : str
+		HTTP(S) or FTP URL.
+	filename : str
+		Local filepath to save to.
+	post_data : dict, optional
+		Params and values for a POST request (not resumed); GET if not given.
+	session : requests.Session, optional
+		Session for HTTP(S) requests (default a new one).
+	timeout : float, optional
+		Seconds to wait for a connection or for data.
+	retries : int, optional
+		Number of attempts.
+	chunk_size : int, optional
+		Bytes read and written at a time.
+	headers : dict, optional
+		Extra HTTP request headers, e.g. for a conditional request; not sent
+		when resuming a partial file.
+
+	Returns
+	-------
+	response_headers : dict or None
+		Headers of the HTTP response ({} for FTP), or None if the server
+		answered 304 (Not Modified), in which case `filename` is untouched.
 
-def download(db_name='', file_savedir_url={}, post_data={}, force=False):
+	Raises
+	------
+	Exception
+		The error of the last attempt if all attempts fail.
+	"""
+	if session is None:
+		session = make_download_session(1)
+	part_filename = filename + DOWNLOAD_PART_SUFFIX
+	is_ftp = url.lower().startswith('ftp')
+
+	def _save_validator(response):
+		_write_part_validator(part_filename, url, _response_validator(response))
+
+	# a partial file of an earlier run may be of another version of the file
+	if is_ftp or post_data or _read_part_validator(part_filename, url) is None:
+		for stale_filename in [part_filename, part_filename + DOWNLOAD_VALIDATOR_SUFFIX]:
+			if os.path.exists(stale_filename):
+				os.remove(stale_filename)
+
+	for attempt in range(retries):
+		offset = os.path.getsize(part_filename) if os.path.exists(part_filename) and not post_data else 0
+		validator = None if is_ftp else _read_part_validator(part_filename, url)
+		if offset and not is_ftp and validator is None:
+			# the last response had no validator, so the file may have changed since: start over
+			offset = 0
+		try:
+			with open(part_filename, 'ab' if offset else 'wb') as fout:
+				if is_ftp:
+					_fetch_ftp(url, fout, offset, timeout, chunk_size)
+					response = None
+				else:
+					response = _fetch_http(session, url, fout, offset, post_data, timeout, chunk_size,
+						None if offset else headers, validator, _save_validator)
+					if response is None:
+						# start over without a range
+						fout.seek(0)
+						fout.truncate()
+						response = _fetch_http(session, url, fout, 0, post_data, timeout, chunk_size, headers,
+							on_response=_save_validator)
+		except Exception:
+			if attempt == retries - 1:
+				raise
+			time.sleep(2 ** attempt)
+			continue
+		_write_part_validator(part_filename, url, None)
+		if response is not None and response.status_code == 304:
+			os.remove(part_filename)
+			return None
+		if os.name == 'nt' and os.path.exists(filename):
+			os.remove(filename)	# rename doesn't replace files on Windows
+		os.rename(part_filename, filename)
+		return response.headers if response is not None else {}
+
+def download(db_name='', file_savedir_url={}, post_data={}, force=None, threads=DOWNLOAD_THREADS, cache=True):
 	"""
 	Fetch and download a database from an online source.
-	TO-DO: Trap timeout or other errors.
+
+	Files are downloaded in parallel with `download_file()`, sharing one
+	pool of HTTP connections. GET requests go through the raw file cache
+	(see `RawFileCache`), so files that haven't changed upstream are not
+	downloaded again.
 
 	Parameters
 	----------
@@ -465,8 +1190,13 @@ def download(db_name='', file_savedir_url={}, post_data={}, force=False):
 		Dict with params and values for POST request.
 		If not specified, use GET.
 		TO-DO: Extend to allow different values for each entry in file_savedir_url.
-	force: bool
-		Force the download, ignoring the required command line argument.
+	force: bool, optional
+		Whether to download (e.g. a builder's `options.download`); by default,
+		whether --download was given on the command line.
+	threads : int, optional
+		Maximum number of files downloaded at the same time.
+	cache : bool or RawFileCache, default True
+		Cache used for GET requests: True for the default RawFileCache, False for none.
 
 	Returns
 	-------
@@ -476,7 +1206,9 @@ def download(db_name='', file_savedir_url={}, post_data={}, force=False):
 			requested but failed.
 	"""
 
-	if not (build_arg_parser().download or force):
+	if force is None:
+		force = build_arg_parser().download
+	if not force:
 		print(u"Using raw data file(s) saved locally.")
 		return True
 
@@ -485,25 +1217,280 @@ def download(db_name='', file_savedir_url={}, post_data={}, force=False):
 		print(u"Error: Download requested but no database name specified.")
 		return False
 
-	print(u"Downloading {0} database...").format(db_name)
+	print(u"Downloading {0} database...".format(db_name))
+
+	threads = max(1, min(threads, len(file_savedir_url)))
+	session = make_download_session(threads)
+	if post_data or not cache:
+		cache = None	# POST responses can't be fetched conditionally
+	elif cache is True:
+		cache = RawFileCache()
 
+	def _download(item):
+		savedir, url = item
+		try:
+			if cache is None:
+				download_file(url, savedir, post_data, session)
+				return None
+			return savedir, url, cache.fetch(url, savedir, session)
+		except Exception as e:
+			return savedir, url, e
+
+	pool = multiprocessing.pool.ThreadPool(threads)
 	try:
-		for savedir, url in file_savedir_url.iteritems():
-			if url[0:3] == u"ftp":	# ftp
-				urllib.urlretrieve(url, savedir)
-			else:					# http
-				if post_data:
-					response = requests.post(url, post_data)
-				else:
-					response = requests.get(url)
-				with open(savedir, 'w') as f:
-					f.write(response.content)
-	except:
+		results = filter(None, pool.map(_download, file_savedir_url.items()))
+	finally:
+		pool.close()
+		pool.join()
+		session.close()
+		if cache is not None:
+			cache.save()
+
+	failures = [r for r in results if isinstance(r[2], Exception)]
+	unchanged = [r for r in results if r[2] is False]
+	if unchanged:
+		print(u"...{0} of {1} file(s) unchanged upstream.".format(len(unchanged), len(file_savedir_url)))
+	if failures:
+		for savedir, url, e in failures:
+			print(u"Error: Failed to download {0} to {1}: {2}".format(url, savedir, e))
 		print(u"Error: Failed to download one or more files.")
 		return False
-	else:
-		print(u"...done.")
-		return True
+	print(u"...done.")
+	return True
+
+
+### RAW FILE CACHE ###
+
+RAW_CACHE_MANIFEST_VERSION = 1
+RAW_CACHE_SECTIONS = ('urls', 'files', 'consumers')
+
+class _FileLock(object):
+	"""Context manager holding an exclusive lock on a lock file, for one process at a time."""
+	def __init__(self, filename):
+		self.filename = filename
+
+	def __enter__(self):
+		self._file = open(self.filename, 'ab')
+		if fcntl is not None:
+			fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+		else:
+			self._file.seek(0)
+			msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+		return self
+
+	def __exit__(self, *exc_info):
+		if fcntl is not None:
+			fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+		else:
+			self._file.seek(0)
+			msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+		self._file.close()
+
+class RawFileCache(object):
+	"""
+	Cache of downloaded raw source files, fetched with conditional requests.
+
+	For each URL, the manifest (`manifest.json` in `cache_dir`) records the
+	ETag and Last-Modified headers and the SHA-256 of the content last
+	downloaded, and a copy of that content is kept under its hash in
+	`cache_dir`/objects (content-addressed, so identical files are stored
+	once). Later fetches send If-None-Match/If-Modified-Since, and a 304
+	(Not Modified) response leaves the local file as it is, restoring it from
+	the stored copy if it was changed or deleted.
+
+	The manifest also records the hash of each local file (reused while its
+	size and modification time don't change) and, for each consumer (e.g. a
+	builder), the hashes of the files it last parsed, so that consumers can
+	skip re-parsing inputs that haven't changed; see `inputs_changed()`.
+
+	Call `save()` to write the manifest after fetching or recording. Methods
+	may be called from several threads, and several processes (e.g. builders
+	run in parallel) may share a cache.
+
+	Attributes
+	----------
+	cache_dir : str
+		Directory for the manifest and stored copies.
+	manifest : dict
+		'urls': {url: {'etag', 'last_modified', 'sha256', 'size', 'filename'}};
+		'files': {local path: {'sha256', 'size', 'mtime'}};
+		'consumers': {name: {local path: sha256 or None}}.
+		Local paths are relative to RAW_DIR.
+	"""
+	def __init__(self, cache_dir=RAW_CACHE_DIR):
+		self.cache_dir = cache_dir
+		self.manifest_file = os.path.join(cache_dir, 'manifest.json')
+		self._lock = threading.RLock()
+		self.manifest = self._read_manifest()
+		# keys of the entries changed through this object, by manifest section
+		self._changed = dict((section, set()) for section in RAW_CACHE_SECTIONS)
+
+	def _read_manifest(self):
+		"""The manifest saved in `cache_dir`, or an empty one."""
+		try:
+			with open(self.manifest_file, 'rb') as fin:
+				manifest = json.load(fin)
+		except (IOError, ValueError):
+			manifest = {}
+		if manifest.get('version') != RAW_CACHE_MANIFEST_VERSION:
+			manifest = {'version': RAW_CACHE_MANIFEST_VERSION, 'urls': {}, 'files': {}, 'consumers': {}}
+		return manifest
+
+	def save(self):
+		"""
+		Write the manifest (atomically).
+
+		The entries changed through this object are merged into the manifest
+		saved by other processes since it was read, under a file lock, so
+		that processes sharing the cache don't lose each other's entries.
+		"""
+		with self._lock:
+			if not os.path.isdir(self.cache_dir):
+				try:
+					os.makedirs(self.cache_dir)
+				except OSError:
+					pass	# made by another process
+			with _FileLock(self.manifest_file + '.lock'):
+				manifest = self._read_manifest()
+				for section, keys in self._changed.iteritems():
+					for key in keys:
+						manifest[section][key] = self.manifest[section][key]
+				temp_file = '{0}.{1}.tmp'.format(self.manifest_file, os.getpid())
+				with open(temp_file, 'wb') as fout:
+					json.dump(manifest, fout, indent=1, sort_keys=True)
+				if os.name == 'nt' and os.path.exists(self.manifest_file):
+					os.remove(self.manifest_file)
+				os.rename(temp_file, self.manifest_file)
+			self.manifest = manifest
+			self._changed = dict((section, set()) for section in RAW_CACHE_SECTIONS)
+
+	def object_path(self, sha256):
+		"""Path of the stored copy of content with hash `sha256`."""
+		return os.path.join(self.cache_dir, 'objects', sha256[:2], sha256)
+
+	@staticmethod
+	def _key(filename):
+		return os.path.relpath(os.path.abspath(filename), RAW_DIR)
+
+	def file_sha256(self, filename):
+		"""SHA-256 of a local file, or None if it doesn't exist; recorded hashes are reused while the file is unchanged."""
+		if not os.path.exists(filename):
+			return None
+		key = self._key(filename)
+		status = os.stat(filename)
+		with self._lock:
+			entry = self.manifest['files'].get(key)
+		if entry and entry['size'] == status.st_size and entry['mtime'] == status.st_mtime:
+			return entry['sha256']
+		sha256 = file_sha256(filename)
+		with self._lock:
+			self.manifest['files'][key] = {'sha256': sha256, 'size': status.st_size, 'mtime': status.st_mtime}
+			self._changed['files'].add(key)
+		return sha256
+
+	def _store(self, filename, sha256):
+		"""Keep a copy of a file under its hash."""
+		path = self.object_path(sha256)
+		if os.path.exists(path):
+			return
+		if not os.path.isdir(os.path.dirname(path)):
+			try:
+				os.makedirs(os.path.dirname(path))
+			except OSError:
+				pass	# made by another thread
+		temp_path = '{0}.{1}.{2}.tmp'.format(path, os.getpid(), threading.current_thread().ident)
+		shutil.copyfile(filename, temp_path)
+		os.rename(temp_path, path)
+
+	def _restore(self, filename, sha256):
+		"""Copy stored content back to a local file (atomically)."""
+		temp_file = filename + DOWNLOAD_PART_SUFFIX
+		shutil.copyfile(self.object_path(sha256), temp_file)
+		if os.name == 'nt' and os.path.exists(filename):
+			os.remove(filename)
+		os.rename(temp_file, filename)
+
+	def fetch(self, url, filename, session=None, **kwargs):
+		"""
+		Download a URL to a local file unless it is unchanged upstream.
+
+		Parameters
+		----------
+		url : str
+			HTTP(S) or FTP URL (FTP is always downloaded).
+		filename : str
+			Local filepath to save to.
+		session : requests.Session, optional
+			Session for HTTP(S) requests.
+		**kwargs
+			Passed on to `download_file()`.
+
+		Returns
+		-------
+		changed : bool
+			Whether the content differs from what was last fetched for this URL.
+		"""
+		with self._lock:
+			entry = self.manifest['urls'].get(url)
+		headers = {}
+		local_sha256 = None
+		if entry:
+			local_sha256 = self.file_sha256(filename)
+			# only ask conditionally if the cached content can be served
+			if local_sha256 == entry['sha256'] or os.path.exists(self.object_path(entry['sha256'])):
+				if entry.get('etag'):
+					headers['If-None-Match'] = entry['etag']
+				if entry.get('last_modified'):
+					headers['If-Modified-Since'] = entry['last_modified']
+
+		response_headers = download_file(url, filename, session=session, headers=headers, **kwargs)
+		if response_headers is None:
+			if entry is None:
+				raise IOError('unexpected 304 (Not Modified) response from {0}'.format(url))
+			if local_sha256 != entry['sha256']:
+				self._restore(filename, entry['sha256'])
+			return False
+
+		sha256 = self.file_sha256(filename)
+		self._store(filename, sha256)
+		with self._lock:
+			self.manifest['urls'][url] = {
+				'etag': response_headers.get('ETag'),
+				'last_modified': response_headers.get('Last-Modified'),
+				'sha256': sha256,
+				'size': os.path.getsize(filename),
+				'filename': self._key(filename),
+			}
+			self._changed['urls'].add(url)
+		return entry is None or entry['sha256'] != sha256
+
+	def inputs_changed(self, consumer, filenames):
+		"""
+		Whether local files differ from when `record_inputs()` was last called for `consumer`.
+
+		Parameters
+		----------
+		consumer : str
+			Name of the reader of the files, e.g. a builder.
+		filenames : list of str
+			Local filepaths.
+
+		Returns
+		-------
+		changed : bool
+			True if any file was added, removed or changed, or if nothing was recorded.
+		"""
+		with self._lock:
+			recorded = self.manifest['consumers'].get(consumer)
+		current = dict((self._key(f), self.file_sha256(f)) for f in filenames)
+		return recorded != current
+
+	def record_inputs(self, consumer, filenames):
+		"""Record the hashes of the local files `consumer` has just read."""
+		current = dict((self._key(f), self.file_sha256(f)) for f in filenames)
+		with self._lock:
+			self.manifest['consumers'][consumer] = current
+			self._changed['consumers'].add(consumer)
 
 
 ### FILE PATHS ###
@@ -524,6 +1511,11 @@ def make_file_path(fileType="root", subFolder="", filename=""):
 	Raises
 	-----
 	KeyError if fileType is invalid (not in `DIRs`).
+
+	Note
+	----
+	Raw and resource files and directories, and source databases, are
+	recorded as inputs of the current build (see `record_build_input()`).
 	"""
 	# if path doesn't exist, create it
 	for key, path in DIRs.items():
@@ -538,10 +1530,306 @@ def make_file_path(fileType="root", subFolder="", filename=""):
 		subFolder_path = os.path.normpath(os.path.join(dst, subFolder))
 		if not os.path.exists(subFolder_path):
 			os.mkdir(subFolder_path)
-	return os.path.normpath(os.path.join(dst, subFolder, filename))
+	path = os.path.normpath(os.path.join(dst, subFolder, filename))
+	if fileType in ("raw", "resource") and (subFolder or filename) or fileType == "src_bin" and filename:
+		record_build_input(path)
+	return path
+
+# Bytes read at a time when hashing files.
+HASH_CHUNK_SIZE = 1 << 20
+
+def file_sha256(filename):
+	"""Hex SHA-256 digest of a file's contents."""
+	sha = hashlib.sha256()
+	with open(filename, 'rb') as f:
+		for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), ''):
+			sha.update(chunk)
+	return sha.hexdigest()
+
+
+### BUILD STAMPS ###
+
+# A build stamp is saved next to each built database, recording the SHA-256 of
+# every input of the build: raw and resource files, source databases read,
+# this module and the build script. A database whose inputs all still have
+# the recorded hashes is up to date, and needn't be rebuilt.
+BUILD_STAMP_VERSION = 1
+BUILD_STAMP_SUFFIX = '.stamp.json'
+# Suffixes of files in input directories that aren't inputs (partial downloads).
+BUILD_STAMP_IGNORED = (DOWNLOAD_PART_SUFFIX, DOWNLOAD_VALIDATOR_SUFFIX)
+
+_build_inputs = set()	# absolute paths of the inputs of the current build
+
+def record_build_input(path):
+	"""Record a file, or all files in a directory, as an input of the current build."""
+	_build_inputs.add(os.path.abspath(path))
+
+def _build_input_files(paths):
+	"""Expand directories to the files they contain (not recursively); keep missing paths."""
+	filenames = set()
+	for path in paths:
+		if os.path.isdir(path):
+			for name in os.listdir(path):
+				filename = os.path.join(path, name)
+				if os.path.isfile(filename) and not name.endswith(BUILD_STAMP_IGNORED):
+					filenames.add(filename)
+		else:
+			filenames.add(path)
+	return filenames
+
+def _build_input_hashes(paths):
+	"""Dict of {path relative to ROOT_DIR: SHA-256, or None if missing}."""
+	hashes = {}
+	for filename in _build_input_files(paths):
+		key = os.path.relpath(filename, ROOT_DIR)
+		hashes[key] = file_sha256(filename) if os.path.isfile(filename) else None
+	return hashes
+
+def build_stamp_path(database_path):
+	"""Filepath of the build stamp of a built database (or other build output)."""
+	return database_path + BUILD_STAMP_SUFFIX
+
+def write_build_stamp(database_path, script=None, options=None):
+	"""
+	Save the build stamp of a just-built database.
+
+	Parameters
+	----------
+	database_path : str
+		Filepath of the built database.
+	script : str, optional
+		Build script; by default the script being run, if any.
+	options : list, optional
+		Command-line options the output depends on.
+	"""
+	if script is None and sys.argv and os.path.isfile(sys.argv[0]):
+		script = sys.argv[0]
+	inputs = set(_build_inputs)
+	inputs.discard(os.path.abspath(database_path))
+	inputs.add(os.path.splitext(os.path.abspath(__file__))[0] + '.py')
+	if script:
+		inputs.add(os.path.abspath(script))
+	stamp = {
+		'version': BUILD_STAMP_VERSION,
+		'built': datetime.datetime.now().isoformat(),
+		'output_sha256': file_sha256(database_path),
+		'options': list(options or []),
+		'inputs': _build_input_hashes(inputs),
+		'directories': sorted(os.path.relpath(path, ROOT_DIR) for path in inputs if os.path.isdir(path)),
+	}
+	temp_path = u'{0}.{1}.tmp'.format(build_stamp_path(database_path), os.getpid())
+	with open(temp_path, 'w') as f:
+		json.dump(stamp, f, indent=1, sort_keys=True)
+	os.rename(temp_path, build_stamp_path(database_path))
+
+def read_build_stamp(database_path):
+	"""Build stamp of a database as a dict, or None if it has no (readable) stamp."""
+	try:
+		with open(build_stamp_path(database_path)) as f:
+			stamp = json.load(f)
+	except (IOError, ValueError):
+		return None
+	if stamp.get('version') != BUILD_STAMP_VERSION:
+		return None
+	return stamp
+
+def build_stamp_changes(database_path, options=None):
+	"""
+	Find why a database would need to be rebuilt.
+
+	Parameters
+	----------
+	database_path : str
+		Filepath of the built database.
+	options : list, optional
+		Command-line options the next build would be run with.
+
+	Returns
+	-------
+	changes : list
+		Reasons for a rebuild (e.g. 'changed: resources/country_information.csv');
+		empty if the database is up to date.
+	"""
+	stamp = read_build_stamp(database_path)
+	if stamp is None:
+		return [u'no build stamp']
+	if not os.path.isfile(database_path):
+		return [u'missing: {0}'.format(os.path.relpath(database_path, ROOT_DIR))]
+	if file_sha256(database_path) != stamp['output_sha256']:
+		return [u'modified since built: {0}'.format(os.path.relpath(database_path, ROOT_DIR))]
+	changes = []
+	if list(options or []) != stamp['options']:
+		changes.append(u'options: {0} -> {1}'.format(u' '.join(stamp['options']), u' '.join(options or [])))
+	# rehash the recorded files, and the recorded directories to find new files in them
+	paths = [os.path.join(ROOT_DIR, key) for key in stamp['inputs'].keys() + stamp['directories']]
+	current = _build_input_hashes(paths)
+	for key in sorted(set(stamp['inputs']).union(current)):
+		if key not in stamp['inputs']:
+			changes.append(u'new: {0}'.format(key))
+		elif current.get(key) != stamp['inputs'][key]:
+			changes.append(u'{0}: {1}'.format(u'missing' if current.get(key) is None else u'changed', key))
+	return changes
+
+
+### RESOURCE CACHE ###
+
+# Version of resource snapshots; bump it to discard the snapshots saved before
+# a change that the source hash of this module doesn't show.
+RESOURCE_CACHE_VERSION = 1
+
+class ResourceCache(object):
+	"""
+	Cache of parsed resource files (thesauri, country information, concordances).
+
+	Each resource is parsed once. The parsed value is kept in memory, and a
+	binary (pickle) snapshot of it is saved in `cache_dir` under the SHA-1
+	hash of the source file contents (all files, for a directory), so later
+	processes skip parsing until the source changes. Snapshot names also hold
+	a hash of RESOURCE_CACHE_VERSION and of the source of this module, which
+	has the parsers and the classes of the pickled values, so snapshots made
+	by other code are not loaded. In memory, a value is
+	served again as long as its source files keep the same size and
+	modification time, or failing that, the same content hash.
+
+	Cached values are shared between callers and should be treated as read-only.
+
+	Attributes
+	----------
+	cache_dir : str
+		Directory for snapshots; None to keep values in memory only.
+	stats : dict
+		Dict of {resource name: {'memory': n, 'disk': n, 'miss': n}} counting
+		values served from memory, loaded from a snapshot, and parsed.
+	"""
+	def __init__(self, cache_dir=RESOURCE_CACHE_DIR):
+		self.cache_dir = cache_dir
+		self.stats = {}
+		self._memory = {}	# (name, path) -> (file signature, content hash, value)
+		self._code_hash = None
+
+	@staticmethod
+	def _source_files(path):
+		if os.path.isdir(path):
+			return [os.path.join(path, f) for f in sorted(os.listdir(path))]
+		return [path]
+
+	def _signature(self, path):
+		signature = []
+		for filename in self._source_files(path):
+			status = os.stat(filename)
+			signature.append((filename, status.st_size, status.st_mtime))
+		return tuple(signature)
+
+	def _content_hash(self, path):
+		sha = hashlib.sha1()
+		for filename in self._source_files(path):
+			sha.update(os.path.basename(filename))
+			with open(filename, 'rb') as f:
+				sha.update(f.read())
+		return sha.hexdigest()
+
+	def _code_version(self):
+		if self._code_hash is None:
+			sha = hashlib.sha1(str(RESOURCE_CACHE_VERSION))
+			with open(os.path.splitext(os.path.abspath(__file__))[0] + '.py', 'rb') as f:
+				sha.update(f.read())
+			self._code_hash = sha.hexdigest()[:12]
+		return self._code_hash
+
+	def _snapshot_path(self, name, content_hash):
+		return os.path.join(self.cache_dir, u'{0}-{1}-{2}.pkl'.format(name, content_hash, self._code_version()))
+
+	def _count(self, name, kind):
+		counts = self.stats.setdefault(name, {'memory': 0, 'disk': 0, 'miss': 0})
+		counts[kind] += 1
+
+	def get(self, name, path, parse):
+		"""
+		Get a parsed resource, parsing it with `parse(path)` only if not cached.
+
+		Parameters
+		----------
+		name : str
+			Resource name, used for counters, invalidation and snapshot filenames.
+		path : str
+			Resource file or directory.
+		parse : function
+			Function parsing `path` into the resource value.
+
+		Returns
+		-------
+		The parsed resource.
+		"""
+		key = (name, os.path.abspath(path))
+		record_build_input(path)
+		signature = self._signature(path)
+		cached = self._memory.get(key)
+		if cached and cached[0] == signature:
+			self._count(name, 'memory')
+			return cached[2]
+
+		content_hash = self._content_hash(path)
+		if cached and cached[1] == content_hash:
+			self._memory[key] = (signature, content_hash, cached[2])
+			self._count(name, 'memory')
+			return cached[2]
+
+		value = None
+		if self.cache_dir:
+			try:
+				with open(self._snapshot_path(name, content_hash), 'rb') as f:
+					value = cPickle.load(f)
+				self._count(name, 'disk')
+			except (IOError, EOFError, cPickle.UnpicklingError):
+				value = None
+		if value is None:
+			value = parse(path)
+			self._count(name, 'miss')
+			if self.cache_dir:
+				self._save_snapshot(name, content_hash, value)
+		self._memory[key] = (signature, content_hash, value)
+		return value
+
+	def _save_snapshot(self, name, content_hash, value):
+		if not os.path.isdir(self.cache_dir):
+			os.makedirs(self.cache_dir)
+		for old_snapshot in glob.glob(os.path.join(self.cache_dir, u'{0}-*.pkl'.format(name))):
+			os.remove(old_snapshot)
+		# write to a temporary file first, so other processes never read a partial snapshot
+		snapshot_path = self._snapshot_path(name, content_hash)
+		temp_path = u'{0}.{1}.tmp'.format(snapshot_path, os.getpid())
+		with open(temp_path, 'wb') as f:
+			cPickle.dump(value, f, cPickle.HIGHEST_PROTOCOL)
+		os.rename(temp_path, snapshot_path)
+
+	def invalidate(self, name=None):
+		"""Drop a resource (or all resources, if `name` is None) from memory and disk."""
+		for key in self._memory.keys():
+			if name is None or key[0] == name:
+				del self._memory[key]
+		if self.cache_dir:
+			pattern = u'{0}-*.pkl'.format(name) if name else u'*.pkl'
+			for snapshot in glob.glob(os.path.join(self.cache_dir, pattern)):
+				os.remove(snapshot)
+
+RESOURCE_CACHE = ResourceCache()
+
+def cached_resource(parse):
+	"""
+	Decorate a resource parser taking a file path, to serve it through `RESOURCE_CACHE`.
+
+	The uncached parser stays available as the `parse` attribute.
+	"""
+	default_path = parse.func_defaults[0]
+	@functools.wraps(parse)
+	def load(path=default_path):
+		return RESOURCE_CACHE.get(parse.__name__, path, parse)
+	load.parse = parse
+	return load
 
 ### SOURCES ###
 
+@cached_resource
 def make_source_thesaurus(source_thesaurus=SOURCE_THESAURUS_FILE):
 	"""
 	Get dict mapping country name to `SourceObject` for the country.
@@ -571,6 +1859,132 @@ def make_source_thesaurus(source_thesaurus=SOURCE_THESAURUS_FILE):
 	return source_thesaurus
 
 ### FUEL TYPES ###
+# Delimiters between fuel names in a raw fuel string (e.g. 'Gas/Oil', 'Carbón y Gas').
+FUEL_DELIMITER_PATTERN = re.compile('/| y |,| and ')
+
+class FuelThesaurus(dict):
+	"""
+	Dict of {"primary fuel name": ['alt_name0', 'alt_name1', ...]}, compiled for lookup.
+
+	Returned by `make_fuel_thesaurus()`. Keeps an alias -> standard name index
+	(where an alias is listed under several fuels, the first in iteration
+	order wins, as in a scan of the dict), a bounded memo of the fuels found
+	in raw fuel strings that drops the least recently used half when full,
+	and a count of every unidentified fuel name.
+	Adding or removing fuels resets the index and memo; the alias lists
+	should not be edited in place.
+
+	Attributes
+	----------
+	unidentified : dict
+		Dict of {'fuel name': count} of names that matched no fuel.
+	memo_size : int
+		Maximum number of raw fuel strings memoized.
+	"""
+	def __init__(self, *args, **kwargs):
+		dict.__init__(self, *args, **kwargs)
+		self.unidentified = {}
+		self.memo_size = 4096
+		self._index = None
+		self._memo = {}		# raw fuel string -> [fuel set, unidentified names, last use]
+		self._uses = 0
+
+	def __reduce__(self):
+		# pickle the contents with the alias index, which depends on the
+		# original iteration order; the memo and counts start empty
+		return (FuelThesaurus, (self.items(),), {'_index': self.alias_index()})
+
+	def _changed(self):
+		self._index = None
+		self._memo.clear()
+
+	def __setitem__(self, key, value):
+		dict.__setitem__(self, key, value)
+		self._changed()
+
+	def __delitem__(self, key):
+		dict.__delitem__(self, key)
+		self._changed()
+
+	def clear(self):
+		dict.clear(self)
+		self._changed()
+
+	def pop(self, *args):
+		value = dict.pop(self, *args)
+		self._changed()
+		return value
+
+	def popitem(self):
+		item = dict.popitem(self)
+		self._changed()
+		return item
+
+	def setdefault(self, key, default=None):
+		value = dict.setdefault(self, key, default)
+		self._changed()
+		return value
+
+	def update(self, *args, **kwargs):
+		dict.update(self, *args, **kwargs)
+		self._changed()
+
+	def pop_unidentified(self):
+		"""Get the counts of unidentified fuel names (see `unidentified`) and start counting anew."""
+		unidentified, self.unidentified = self.unidentified, {}
+		return unidentified
+
+	def alias_index(self):
+		"""Get dict mapping each alias to its standard fuel name."""
+		if self._index is None:
+			self._index = {}
+			for fuel_standard_name, fuel_synonyms in self.iteritems():
+				for alias in fuel_synonyms:
+					self._index.setdefault(alias, fuel_standard_name)
+		return self._index
+
+	def fuel_set(self, fuel_instance):
+		"""
+		Get standard fuel names for a string of alternate names.
+
+		Parameters
+		----------
+		fuel_instance : str
+			Potentially non-standard fuel names separated by '/' (e.g. bitumen/sun/uranium).
+
+		Returns
+		-------
+		fuel_set : frozenset
+			Standard fuel names identified in `fuel_instance`.
+		"""
+		self._uses += 1
+		memo = self._memo
+		entry = memo.get(fuel_instance)
+		if entry is None:
+			index = self.alias_index()
+			fuels = set()
+			unidentified = []
+			for fuel in FUEL_DELIMITER_PATTERN.split(fuel_instance):
+				fuel = fuel.strip()
+				if fuel in index:
+					fuels.add(index[fuel])
+				else:
+					unidentified.append(fuel)
+			if len(memo) >= self.memo_size:
+				self._evict()
+			entry = memo[fuel_instance] = [frozenset(fuels), tuple(unidentified), 0]
+		entry[2] = self._uses
+		for fuel in entry[1]:
+			self.unidentified[fuel] = self.unidentified.get(fuel, 0) + 1
+		return entry[0]
+
+	def _evict(self):
+		"""Drop the least recently used half of the memo."""
+		by_use = sorted(self._memo, key=lambda fuel_instance: self._memo[fuel_instance][2])
+		for fuel_instance in by_use[:max(1, len(by_use) // 2)]:
+			del self._memo[fuel_instance]
+
+@cached_resource
 def make_fuel_thesaurus(fuel_type_thesaurus=FUEL_THESAURUS_DIR):
 	"""
 	Get dict mapping standard fuel names to a list of alias values.
@@ -582,11 +1996,11 @@ def make_fuel_thesaurus(fuel_type_thesaurus=FUEL_THESAURUS_DIR):
 
 	Returns
 	-------
-	Dict of {"primary fuel name": ['alt_name0', 'alt_name1', ...]}
+	FuelThesaurus (dict) of {"primary fuel name": ['alt_name0', 'alt_name1', ...]}
 
 	"""
 	fuel_thesaurus_files = os.listdir(fuel_type_thesaurus)
-	fuel_thesaurus = {}
+	fuel_thesaurus = FuelThesaurus()
 	for fuel_file in fuel_thesaurus_files:
 		with open(os.path.join(fuel_type_thesaurus, fuel_file), 'rbU') as fin:
 			standard_name = fin.readline().decode(UNICODE_ENCODING).rstrip()
@@ -603,8 +2017,8 @@ def standardize_fuel(fuel_instance, fuel_thesaurus, as_set=False):
 	----------
 	fuel_instance : str
 		Potentially non-standard fuel names separated by '/' (e.g. bitumen/sun/uranium).
-	fuel_thesaurus : dict
-		Dict returned from `make_fuel_thesaurus()`.
+	fuel_thesaurus : FuelThesaurus
+		As returned from `make_fuel_thesaurus()`.
 	as_set : bool
 		Return set (if true) or string (if false).
 
@@ -616,6 +2030,15 @@ def standardize_fuel(fuel_instance, fuel_thesaurus, as_set=False):
 		If as_set=false: String containing one standard fuel name corresponding to the input string.
 		Returns 'NO_DATA_UNICODE' is a fuel type cannot be identified.
 
+	Raises
+	------
+	TypeError
+		If `fuel_thesaurus` is not a FuelThesaurus.
+
+	Note
+	----
+	Names that can't be identified are counted in `fuel_thesaurus.unidentified`;
+	builders report them with `report_unidentified_fuels()` at the end of each build.
 	"""
 	if not fuel_instance:  # if fuel_instance is blank, return empty values
 		if as_set:
@@ -623,40 +2046,28 @@ def standardize_fuel(fuel_instance, fuel_thesaurus, as_set=False):
 		else:
 			return NO_DATA_UNICODE
 
-
-	delimiter_pattern = '/| y |,| and '
-
-	if isinstance(fuel_instance, str):
-		fuel_instance_u = fuel_instance.decode(UNICODE_ENCODING)
-	elif isinstance(fuel_instance, unicode):
-		fuel_instance_u = fuel_instance
-
-	fuel_instance_list = re.split(delimiter_pattern,fuel_instance)
-	fuel_instance_list_clean = [f.strip() for f in fuel_instance_list]
-	fuel_set = NO_DATA_SET.copy()
-	for fuel in fuel_instance_list_clean:
-		if fuel_instance_u == NO_DATA_UNICODE:
-			continue
-		identified = False
-		for fuel_standard_name, fuel_synonyms in fuel_thesaurus.iteritems():
-			if fuel in fuel_synonyms:
-				fuel_set.add(fuel_standard_name)
-				identified = True
-				break
-		if not identified:
-			print(u"-Error: Couldn't identify fuel type {0}".format(fuel_instance_u))
+	if not isinstance(fuel_thesaurus, FuelThesaurus):
+		raise TypeError('fuel_thesaurus must be a FuelThesaurus (see make_fuel_thesaurus()), not {0}'.format(
+			type(fuel_thesaurus).__name__))
+	fuel_set = fuel_thesaurus.fuel_set(fuel_instance)
 
 	if as_set:
 		# Return entire set (for other/secondary fuels)
-		return fuel_set
+		return set(fuel_set)
 
 	else:
 		# Return string of a single fuel (for primary fuel)
 		assert len(fuel_set) == 1
-		return fuel_set.pop()
+		return next(iter(fuel_set))
+
+def report_unidentified_fuels(fuel_thesaurus):
+	"""Print the fuel names `fuel_thesaurus` couldn't identify since the last report, and start counting anew."""
+	for fuel, count in sorted(fuel_thesaurus.pop_unidentified().iteritems()):
+		print(u"-Error: Couldn't identify fuel {0} (found {1}x).".format(fuel, count))
 
 ### HEADER NAMES ###
 
+@cached_resource
 def make_header_names_thesaurus(header_names_thesaurus_file=HEADER_NAMES_THESAURUS_FILE):
 	"""
 	Get a dict mapping ideal domain-specific phrases to list of alternates.
@@ -682,6 +2093,7 @@ def make_header_names_thesaurus(header_names_thesaurus_file=HEADER_NAMES_THESAUR
 
 ### COUNTRY NAMES ###
 
+@cached_resource
 def make_country_names_thesaurus(country_names_thesaurus_file=COUNTRY_INFORMATION_FILE):
 	"""
 	Get a dict mapping ideal country names to list of alternates.
@@ -708,6 +2120,7 @@ def make_country_names_thesaurus(country_names_thesaurus_file=COUNTRY_INFORMATIO
 			]
 		return country_names_thesaurus
 
+@cached_resource
 def make_country_dictionary(country_information_file=COUNTRY_INFORMATION_FILE):
 	"""
 	Get a dict mapping country name to `CountryObject`.
@@ -750,8 +2163,10 @@ def standardize_country(country_instance, country_thesaurus):
 	----------
 	country_instance : str
 		Non-ideal or alternative country name (e.g. 'United States').
-	country_thesaurus : dict
-		Dict returned by `make_country_names_thesaurus()`.
+	country_thesaurus : dict or CountryIndex
+		Dict returned by `make_country_names_thesaurus()`, or a `CountryIndex`
+		(which also accepts primary names and ISO codes, and counts unidentified
+		countries in its `misses` instead of printing them; see `pop_misses()`).
 
 	Returns
 	-------
@@ -760,6 +2175,9 @@ def standardize_country(country_instance, country_thesaurus):
 		Returns `NO_DATA_UNICODE` if country cannot be identified.
 
 	"""
+	if type(country_thesaurus) is CountryIndex:
+		return country_thesaurus.resolve(country_instance)
+
 	country_instance = country_instance.replace(",", "")
 	for primary_name, aliases in country_thesaurus.iteritems():
 		if country_instance in aliases:
@@ -768,46 +2186,212 @@ def standardize_country(country_instance, country_thesaurus):
 	print("Couldn't identify country {0}".format(country_instance))
 	return NO_DATA_UNICODE
 
+class CountryIndex(object):
+	"""
+	Resolve country names, source-specific aliases and ISO codes to primary country names.
 
-### ID NUMBERS AND MATCHING ###
+	Built from country_information.csv. Every primary name, GEODB/CARMA/IEA
+	alias and 2- and 3-letter ISO code is normalized once (commas removed,
+	whitespace collapsed, case folded) into a single dict, so each lookup is
+	one normalization and one hash lookup.
 
-def make_id(letter_code, id_number):
+	Attributes
+	----------
+	countries : dict
+		Dict of {'country': CountryObject}, as from `make_country_dictionary()`.
+	misses : dict
+		Dict of {value: count} of values `resolve()` and `resolve_all()` couldn't
+		identify; builders report them with `pop_misses()` at the end of each build.
 	"""
-	Make the standard-format id (3- or 5-letter alpha code, followed by 7-digit number).
+	NAME_ATTRIBUTES = ('primary_name', 'geo_name', 'carma_name', 'iea_name', 'iso_code', 'iso_code2')
 
-	Parameters
-	----------
-	letter_code : str
-		3-character code (e.g. USA, BRA, CHN) or 5-character source code.
-	id_number : int
-		Number less than 10-million.
+	def __init__(self, country_dictionary):
+		self.countries = country_dictionary
+		self.misses = {}
+		self._index = {}
+		for attribute in self.NAME_ATTRIBUTES:
+			for primary_name in sorted(country_dictionary):
+				self.add_alias(getattr(country_dictionary[primary_name], attribute), primary_name)
 
-	Returns
-	-------
-	idnr : unicode
-		Alpha code followed by zero-leading 7-character numeral.
+	@classmethod
+	def from_file(cls, country_information_file=COUNTRY_INFORMATION_FILE):
+		"""Build the index from a country information CSV file."""
+		return cls(make_country_dictionary(country_information_file))
 
-	"""
-	return u"{alpha}{num:07d}".format(alpha=letter_code, num=id_number)
+	@staticmethod
+	def normalize(value):
+		"""Normalize a country name or code for lookup."""
+		if type(value) is str:
+			value = value.decode(UNICODE_ENCODING)
+		return u' '.join(value.replace(u',', u'').split()).lower()
 
-def make_plant_concordance(master_plant_condordance_file=MASTER_PLANT_CONCORDANCE_FILE):
-	"""
-	Get a dict that enables matching between the same plants from multiple databases.
+	def add_alias(self, alias, primary_name, replace=False):
+		"""Resolve `alias` to `primary_name`; unless `replace`, only if it doesn't already resolve to a country."""
+		key = self.normalize(alias)
+		if key and (replace or key not in self._index):
+			self._index[key] = primary_name
 
-	Parameters
-	----------
-	master_plant_concordance_file : str
-		Filepath for plant concordance.
+	def __getitem__(self, value):
+		"""Primary name for a name, alias or ISO code; KeyError if unknown."""
+		return self._index[self.normalize(value)]
 
-	Returns
-	-------
-	Dict mapping WRI-specific ID to a dict of equivalent ids for other databases.
+	def __contains__(self, value):
+		return self.normalize(value) in self._index
 
-	"""
-	# Note: These IDs are 'item source', not plant IDs.
-	with open(master_plant_condordance_file, 'rbU') as f:
-		csvreader = csv.DictReader(f)
-		plant_concordance = {}
+	def __len__(self):
+		return len(self.countries)
+
+	def resolve(self, value, default=NO_DATA_UNICODE):
+		"""
+		Get the primary country name for a name, alias or ISO code.
+
+		Returns `default` and counts the value in `misses` if it can't be identified.
+		"""
+		try:
+			return self._index[self.normalize(value)]
+		except (KeyError, AttributeError):
+			self.misses[value] = self.misses.get(value, 0) + 1
+			return default
+
+	def resolve_all(self, values, default=NO_DATA_UNICODE):
+		"""
+		Resolve a whole column of country names, aliases or ISO codes.
+
+		Each distinct value is normalized and looked up once.
+
+		Parameters
+		----------
+		values : iterable
+			Country names, aliases or ISO codes.
+		default : object
+			Value for entries that can't be identified.
+
+		Returns
+		-------
+		primary_names : list
+			Primary country name (or `default`) for each value.
+		misses : dict
+			Dict of {value: count} of values that couldn't be identified.
+		"""
+		resolved = {}
+		misses = {}
+		primary_names = []
+		for value in values:
+			if value not in resolved:
+				try:
+					resolved[value] = self._index[self.normalize(value)]
+				except (KeyError, AttributeError):
+					resolved[value] = default
+					misses[value] = 0
+			if value in misses:
+				misses[value] += 1
+			primary_names.append(resolved[value])
+		for value, count in misses.iteritems():
+			self.misses[value] = self.misses.get(value, 0) + count
+		return primary_names, misses
+
+	def pop_misses(self):
+		"""Get the counts of unidentified values (see `misses`) and start counting anew."""
+		misses, self.misses = self.misses, {}
+		return misses
+
+	def country(self, value):
+		"""Get the CountryObject for a name, alias or ISO code; KeyError if unknown."""
+		return self.countries[self[value]]
+
+
+### BUILD RESOURCES ###
+
+class BuildResources(object):
+	"""
+	Resources shared by the source database builders.
+
+	Each builder's `build(resources, options)` takes the thesauri and country
+	information it needs from here instead of loading them itself, so that
+	builders run in one process load each resource once. Resources are
+	loaded on first use (through `RESOURCE_CACHE`) and should be treated as
+	read-only.
+
+	Attributes
+	----------
+	fuel_thesaurus : FuelThesaurus
+		As from `make_fuel_thesaurus()`.
+	country_thesaurus : dict
+		As from `make_country_names_thesaurus()`.
+	country_dictionary : dict
+		As from `make_country_dictionary()`.
+	country_index : CountryIndex
+		As from `CountryIndex.from_file()`.
+	"""
+	def __init__(self):
+		self._loaded = {}
+
+	def _get(self, name, load):
+		if name not in self._loaded:
+			self._loaded[name] = load()
+		return self._loaded[name]
+
+	@property
+	def fuel_thesaurus(self):
+		return self._get('fuel_thesaurus', make_fuel_thesaurus)
+
+	@property
+	def country_thesaurus(self):
+		return self._get('country_thesaurus', make_country_names_thesaurus)
+
+	@property
+	def country_dictionary(self):
+		return self._get('country_dictionary', make_country_dictionary)
+
+	@property
+	def country_index(self):
+		return self._get('country_index', lambda: CountryIndex(self.country_dictionary))
+
+def make_build_options(download=False):
+	"""Options for a builder's `build()` run in-process, as `build_arg_parser()` returns them for a script."""
+	return argparse.Namespace(download=download)
+
+
+### ID NUMBERS AND MATCHING ###
+
+def make_id(letter_code, id_number):
+	"""
+	Make the standard-format id (3- or 5-letter alpha code, followed by 7-digit number).
+
+	Parameters
+	----------
+	letter_code : str
+		3-character code (e.g. USA, BRA, CHN) or 5-character source code.
+	id_number : int
+		Number less than 10-million.
+
+	Returns
+	-------
+	idnr : unicode
+		Alpha code followed by zero-leading 7-character numeral.
+
+	"""
+	return u"{alpha}{num:07d}".format(alpha=letter_code, num=id_number)
+
+@cached_resource
+def make_plant_concordance(master_plant_condordance_file=MASTER_PLANT_CONCORDANCE_FILE):
+	"""
+	Get a dict that enables matching between the same plants from multiple databases.
+
+	Parameters
+	----------
+	master_plant_concordance_file : str
+		Filepath for plant concordance.
+
+	Returns
+	-------
+	Dict mapping WRI-specific ID to a dict of equivalent ids for other databases.
+
+	"""
+	# Note: These IDs are 'item source', not plant IDs.
+	with open(master_plant_condordance_file, 'rbU') as f:
+		csvreader = csv.DictReader(f)
+		plant_concordance = {}
 		for row in csvreader:
 			wri_id = make_id(u"WRI", int(row['f']))
 			geo_id = make_id(u"GEODB", int(row['geo_id'])) if row['geo_id'] else ""
@@ -833,6 +2417,37 @@ def add_wepp_id(powerplant_dictionary, wepp_matches_file=WEPP_CONCORDANCE_FILE):
 	None.
 	"""
 	wepp_match_count = 0
+	for gppd_id, wepp_id in read_wepp_concordance(wepp_matches_file):
+		if gppd_id in powerplant_dictionary:
+			# test that we haven't already set this wepp id
+			try:
+				if not powerplant_dictionary[gppd_id].wepp_id:
+					powerplant_dictionary[gppd_id].wepp_id = wepp_id
+					wepp_match_count += 1
+				else:
+					print(u"Error: Duplicate WEPP match for plant {0}".format(gppd_id))
+			except:
+				print(u"Error: plant {0} does not have wepp_id attribute".format(gppd_id))
+		else:
+			print(u"Error: Attempt to match WEPP ID {0} to non-existant plant {1}".format(wepp_id, gppd_id))
+	print(u"Added {0} matches to WEPP plants.".format(wepp_match_count))
+
+@cached_resource
+def read_wepp_concordance(wepp_matches_file=WEPP_CONCORDANCE_FILE):
+	"""
+	Get the WEPP Location ID matches to use from the WEPP concordance file.
+
+	Parameters
+	----------
+	wepp_matches_file : path
+		Path to file with WEPP Location ID matches.
+
+	Returns
+	-------
+	List of (gppd_idnr, wepp_location_id) pairs, in file order, leaving out
+	rows marked to ignore and rows without a WEPP Location ID.
+	"""
+	wepp_matches = []
 	with open(wepp_matches_file, 'rbU') as f:
 		csvreader = csv.DictReader(f)
 		for row in csvreader:
@@ -840,21 +2455,8 @@ def add_wepp_id(powerplant_dictionary, wepp_matches_file=WEPP_CONCORDANCE_FILE):
 			if row['ignore'] == '1':
 				continue
 			if row['wepp_location_id']:
-				gppd_id = str(row['gppd_idnr'])
-				wepp_id = str(row['wepp_location_id'])
-				if gppd_id in powerplant_dictionary:
-					# test that we haven't already set this wepp id
-					try:
-						if not powerplant_dictionary[gppd_id].wepp_id:
-							powerplant_dictionary[gppd_id].wepp_id = wepp_id
-							wepp_match_count += 1
-						else:
-							print(u"Error: Duplicate WEPP match for plant {0}".format(gppd_id))
-					except:
-						print(u"Error: plant {0} does not have wepp_id attribute".format(gppd_id))
-				else:
-					print(u"Error: Attempt to match WEPP ID {0} to non-existant plant {1}".format(wepp_id, gppd_id))
-	print(u"Added {0} matches to WEPP plants.".format(wepp_match_count))
+				wepp_matches.append((str(row['gppd_idnr']), str(row['wepp_location_id'])))
+	return wepp_matches
 
 ### STRING CLEANING ###
 
@@ -890,7 +2492,148 @@ def format_string(value, encoding=UNICODE_ENCODING):
 
 ### GENERATION ESTIMATION ###
 
-def estimate_generation(powerplant_dictionary, total_generation_file=GENERATION_FILE):
+@cached_resource
+def read_generation_totals(total_generation_file=GENERATION_FILE):
+	"""
+	Read national total generation by country and fuel, for every year in the file.
+
+	Parameters
+	----------
+	total_generation_file : file path
+		CSV file with 'country' and 'fuel' columns and a 'generation_gwh_<year>'
+		column per year.
+
+	Returns
+	-------
+	generation_totals : dict
+		Dict of {year: {(country, fuel): gwh}}. Blank cells are left out.
+	"""
+	generation_totals = {}
+	with open(total_generation_file, 'rU') as f:
+		csvreader = csv.DictReader(f)
+		year_columns = {}
+		for column in csvreader.fieldnames:
+			match = re.match(r'^generation_gwh_(\d{4})$', column)
+			if match:
+				year_columns[int(match.group(1))] = column
+				generation_totals[int(match.group(1))] = {}
+		for row in csvreader:
+			for year, column in year_columns.iteritems():
+				if row[column].strip():
+					generation_totals[year][(row['country'], row['fuel'])] = float(row[column])
+	return generation_totals
+
+def _generation_estimates(plants, generation_totals):
+	"""
+	Allocate national generation among plants by capacity, for several years at once.
+
+	For each year, reported plant generation is subtracted from the national
+	country/fuel total, and the remainder is split among the other plants of
+	that country and fuel in proportion to capacity. Sums are accumulated in
+	plant order, so results are identical to doing the same plant by plant.
+
+	Parameters
+	----------
+	plants : dict of PowerPlant objects, or PlantTable
+		The power plants for which to estimate generation.
+	generation_totals : dict
+		Dict of {year: {(country, fuel): gwh}}, as from `read_generation_totals()`.
+
+	Returns
+	-------
+	keys : list
+		Plant idnr of each column of `estimates`.
+	years : list of int
+		Year of each row of `estimates`.
+	estimates : numpy.ndarray
+		Estimated generation (GWh), shape (years, plants). NaN where the plant
+		reports generation, has no capacity, or has no national total or
+		capacity to share it with. May be negative where reported generation
+		exceeds the national total.
+	"""
+	years = sorted(generation_totals)
+
+	# columnar view of the plants: capacity, country/fuel group and reported generation
+	if isinstance(plants, PlantTable):
+		keys = plants.keys.tolist()
+		capacity = plants.numeric['capacity']
+		groups, group_keys = plants.group_index(['country', 'primary_fuel'])
+		reported = np.array([plants.annual_generation(year) for year in years]).reshape(len(years), len(keys))
+	else:
+		keys = []
+		capacity = []
+		groups = []
+		group_numbers = {}
+		reported = [[] for year in years]
+		for idnr, plant in plants.iteritems():
+			keys.append(idnr)
+			capacity.append(plant.capacity)
+			groups.append(group_numbers.setdefault((plant.country, plant.primary_fuel), len(group_numbers)))
+			for year_reported, year in zip(reported, years):
+				year_reported.append(annual_generation(plant.generation, year))
+		capacity = np.array(capacity, dtype=np.float64)
+		groups = np.array(groups, dtype=np.int64)
+		group_keys = sorted(group_numbers, key=group_numbers.get)
+		reported = np.array(reported, dtype=np.float64).reshape(len(years), len(keys))
+
+	n_groups = len(group_keys)
+	national = np.array([[generation_totals[year].get(key, np.nan) for key in group_keys]
+		for year in years], dtype=np.float64).reshape(len(years), n_groups)
+
+	# rows (year, plant) with capacity, split into reported and to-be-estimated
+	has_capacity = ~np.isnan(capacity)
+	is_reported = ~np.isnan(reported) & has_capacity
+	is_estimated = np.isnan(reported) & has_capacity
+	year_rows, plant_rows = np.nonzero(is_reported)
+	for year_row, plant_row in zip(year_rows.tolist(), plant_rows.tolist()):
+		if np.isnan(national[year_row, groups[plant_row]]):
+			print("Warning {0}: attempt to discount fuel {1} from country {2}".format(
+				keys[plant_row], group_keys[groups[plant_row]][1], group_keys[groups[plant_row]][0]))
+
+	# subtract reported generation from national totals; sum capacity of the rest
+	remaining = national.copy()
+	np.subtract.at(remaining, (year_rows, groups[plant_rows]), reported[year_rows, plant_rows])
+	capacity_totals = np.zeros((len(years), n_groups))
+	year_rows, plant_rows = np.nonzero(is_estimated)
+	np.add.at(capacity_totals, (year_rows, groups[plant_rows]), capacity[plant_rows])
+
+	estimates = np.full((len(years), len(keys)), np.nan)
+	capacity_total = capacity_totals[year_rows, groups[plant_rows]]
+	shared = capacity_total != 0
+	year_rows, plant_rows, capacity_total = year_rows[shared], plant_rows[shared], capacity_total[shared]
+	estimates[year_rows, plant_rows] = capacity[plant_rows] / capacity_total * remaining[year_rows, groups[plant_rows]]
+	return keys, years, estimates
+
+def estimate_generation_by_year(plants, generation_totals):
+	"""
+	Estimate annual generation by plant for any number of years at once.
+
+	Vectorized equivalent of `estimate_generation()` for several years,
+	returning the estimates instead of setting them on the plants.
+
+	Parameters
+	----------
+	plants : dict of PowerPlant objects, or PlantTable
+		The power plants for which to estimate generation.
+	generation_totals : dict
+		Dict of {year: {(country, fuel): gwh}}, as from `read_generation_totals()`.
+
+	Returns
+	-------
+	keys : list
+		Plant idnr of each column of `estimates`.
+	years : list of int
+		Year of each row of `estimates`.
+	estimates : numpy.ndarray
+		Estimated generation (GWh, never negative), shape (years, plants);
+		NaN where not estimated.
+	"""
+	keys, years, estimates = _generation_estimates(plants, generation_totals)
+	with np.errstate(invalid='ignore'):
+		estimates[estimates < 0] = 0
+	return keys, years, estimates
+
+def estimate_generation(powerplant_dictionary, total_generation_file=GENERATION_FILE, year=2014):
 	"""
 	Function to estimate annual generation by plant.
 	Uses data from IEA on total national generation (2014) by fuel type.
@@ -903,6 +2646,9 @@ def estimate_generation(powerplant_dictionary, total_generation_file=GENERATION_
 		The power plants for which to estimate generation.
 	total_generation_file : file path
 		File with national total for annual generation, by fuel type.
+	year : int
+		Year to estimate generation for; `total_generation_file` must have
+		a 'generation_gwh_<year>' column.
 
 	Returns
 	-------
@@ -913,65 +2659,17 @@ def estimate_generation(powerplant_dictionary, total_generation_file=GENERATION_
 	----
 	Plant objects in powerplant_dictionary have `plant_estimated_generation_gwh' value set after this function call.
 	"""
+	generation_totals = read_generation_totals(total_generation_file)
+	keys, years, estimates = _generation_estimates(powerplant_dictionary, {year: generation_totals[year]})
 
-	# read in generation total data (by country and fuel)
-	generation_totals = {}
-	with open(total_generation_file, 'rU') as f:
-		csvreader = csv.DictReader(f)
-		for row in csvreader:
-			country = row['country']
-			fuel = row['fuel']
-			gen_gwh = float(row['generation_gwh_2014'])
-			if country not in generation_totals:
-				generation_totals[country] = {}
-			generation_totals[country][fuel] = gen_gwh
-
-	# read in plants and sum capacity by country and fuel
-	capacity_totals = {}
-	for plantid, plant in powerplant_dictionary.iteritems():
-		country = plant.country
-		capacity = plant.capacity
-		if capacity == None:			# TODO: catch these errors; should not occur
-			continue
-		fuel = plant.primary_fuel
-
-		# check if plant has 2014 reported generation
-		if plant.generation is not None:
-			generation_2014 = annual_generation(plant.generation, 2014)
-			if generation_2014 is not None:
-				# don't count this capacity, and do subtract this generation from country/fuel total
-				try:
-					generation_totals[country][fuel] -= generation_2014
-				except:
-					print("Warning {0}: attempt to discount fuel {1} from country {2}".format(plantid, fuel, country))
-				continue
-
-		# if no 2014 reported generation, add capacity to cumulative total
-		if country not in capacity_totals:
-			capacity_totals[country] = {}
-		fuel_cap = capacity_totals[country].get(fuel, 0)
-		capacity_totals[country][fuel] = fuel_cap + capacity
-
-	# now allocate remaining generation by relative capacity
 	estimate_count = 0
-	for plantid, plant in powerplant_dictionary.iteritems():
-		if annual_generation(plant.generation, 2014) is not None:
-			continue
-
-		country = plant.country
-		capacity = plant.capacity
-		if capacity == None:  # TODO: catch these errors; should not occur
-			continue
-		fuel = plant.primary_fuel
-		try:
-			capacity_fraction = capacity / float(capacity_totals[country][fuel])
-			estimated_generation = capacity_fraction * generation_totals[country][fuel]
-			if estimated_generation < 0:   # might happen because of subtraction step above
-				estimated_generation = 0
-			plant.estimated_generation_gwh = estimated_generation
-			estimate_count += 1
-		except:
+	for plantid, estimated_generation in zip(keys, estimates[0].tolist()):
+		if estimated_generation != estimated_generation:	# NaN: not estimated
 			continue
+		if estimated_generation < 0:   # might happen because of subtraction of reported generation
+			estimated_generation = 0
+		powerplant_dictionary[plantid].estimated_generation_gwh = estimated_generation
+		estimate_count += 1
 
 	# no need to return dictionary; modifying directly
 	return estimate_count
@@ -1067,277 +2765,796 @@ def excel_date_as_datetime(excel_date, date_mode=0):
 
 ### LOAD/SAVE/WRITE CSV ###
 
+# Framed *-Database.bin format (schema version 1):
+#   header:  magic, schema version, plant count, index offset and index length
+#   records: one pickle (protocol 2) per plant, grouped into per-country partitions
+#   index:   pickle of {'records': [(idnr, offset, length)] in file order,
+#            'partitions': [(country, first record, record count)],
+#            'order': record numbers in the iteration order of the saved dict}
+# Loading inserts plants in 'order', giving the same dict as unpickling a saved dict did
+# (plants with equal sort keys are written to CSV in dict order).
+DATABASE_MAGIC = 'GPPD-BIN'
+DATABASE_SCHEMA_VERSION = 1
+_DATABASE_HEADER = struct.Struct('<8sIIQQ')
+
+# Classes substituted when unpickling a database with `compact=True`.
+COMPACT_CLASS_NAMES = {
+	'PowerPlant': 'CompactPowerPlant',
+	'LocationObject': 'CompactLocationObject',
+	'PlantGenerationObject': 'CompactPlantGenerationObject'
+}
+# Classes substituted when unpickling plant records with `compact=False`.
+REGULAR_CLASS_NAMES = {v: k for k, v in COMPACT_CLASS_NAMES.iteritems()}
+
+class _CompactUnpickler(pickle.Unpickler):
+	"""Unpickler that loads plant classes as their compact slotted equivalents."""
+	def find_class(self, module, name):
+		if module == __name__ and name in COMPACT_CLASS_NAMES:
+			name = COMPACT_CLASS_NAMES[name]
+		return pickle.Unpickler.find_class(self, module, name)
+
+def _load_pickled_database(fin, compact=False):
+	"""Read a database pickled as a single dict (files saved before the framed format)."""
+	if compact:
+		return _CompactUnpickler(fin).load()
+	return pickle.load(fin)
+
+def _plant_partition(plant):
+	"""Country partition a plant is saved in."""
+	return getattr(plant, 'country', NO_DATA_UNICODE)
+
+def write_database_file(plant_dict, savepath):
+	"""
+	Save plants in the framed *-Database.bin format.
+
+	Parameters
+	----------
+	plant_dict : dict
+		Dict of {'gppd_idnr': PowerPlant} to save.
+	savepath : str
+		Filepath to write.
+	"""
+	keys = plant_dict.keys()
+	file_order = sorted(xrange(len(keys)), key=lambda i: (_plant_partition(plant_dict[keys[i]]), i))
+	records = []
+	partitions = []
+	order = [None] * len(keys)
+	with open(savepath, 'wb') as fout:
+		offset = _DATABASE_HEADER.size
+		fout.write('\0' * offset)
+		for record_number, i in enumerate(file_order):
+			plant = plant_dict[keys[i]]
+			partition = _plant_partition(plant)
+			if not partitions or partitions[-1][0] != partition:
+				partitions.append([partition, record_number, 0])
+			partitions[-1][2] += 1
+			data = cPickle.dumps(plant, 2)
+			fout.write(data)
+			records.append((keys[i], offset, len(data)))
+			order[i] = record_number
+			offset += len(data)
+		index = cPickle.dumps({'records': records, 'order': order,
+			'partitions': [tuple(p) for p in partitions]}, 2)
+		fout.write(index)
+		fout.seek(0)
+		fout.write(_DATABASE_HEADER.pack(DATABASE_MAGIC, DATABASE_SCHEMA_VERSION,
+			len(records), offset, len(index)))
+
+class DatabaseFile(object):
+	"""
+	Reader for a *-Database.bin file, with lazy access by ID or country.
+
+	For a framed file, only the header and index are read on opening; plants
+	are unpickled when asked for. Files saved as a single pickle (before the
+	framed format) are loaded whole and served from memory through the same
+	interface.
+
+	Parameters
+	----------
+	filename : str
+		Filepath of the database.
+	compact : bool, optional
+		Whether to load plants as `CompactPowerPlant` objects instead of `PowerPlant` objects.
+
+	Attributes
+	----------
+	schema_version : int
+		Format version of the file; 0 for a single-pickle file.
+	"""
+	def __init__(self, filename, compact=False):
+		self.filename = filename
+		self.compact = compact
+		self._file = open(filename, 'rb')
+		header = self._file.read(_DATABASE_HEADER.size)
+		if header[:len(DATABASE_MAGIC)] != DATABASE_MAGIC:
+			self._file.seek(0)
+			self._plants = _load_pickled_database(self._file, compact)
+			self._file.close()
+			self.schema_version = 0
+			return
+		self._plants = None
+		magic, self.schema_version, count, index_offset, index_length = _DATABASE_HEADER.unpack(header)
+		if self.schema_version > DATABASE_SCHEMA_VERSION:
+			raise ValueError('{0} has schema version {1}; this version reads up to {2}'.format(
+				filename, self.schema_version, DATABASE_SCHEMA_VERSION))
+		self._file.seek(index_offset)
+		index = cPickle.loads(self._file.read(index_length))
+		self._records = index['records']
+		self._order = index['order']
+		self._partitions = dict((p[0], (p[1], p[2])) for p in index['partitions'])
+		self._offsets = dict((r[0], (r[1], r[2])) for r in self._records)
+		self._class_names = COMPACT_CLASS_NAMES if compact else REGULAR_CLASS_NAMES
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def close(self):
+		self._file.close()
+
+	def _find_global(self, module, name):
+		if module == __name__ and name in self._class_names:
+			name = self._class_names[name]
+		__import__(module)
+		return getattr(sys.modules[module], name)
+
+	def _load_record(self, data):
+		unpickler = cPickle.Unpickler(cStringIO.StringIO(data))
+		unpickler.find_global = self._find_global
+		return unpickler.load()
+
+	def __len__(self):
+		if self._plants is not None:
+			return len(self._plants)
+		return len(self._records)
+
+	def __contains__(self, idnr):
+		if self._plants is not None:
+			return idnr in self._plants
+		return idnr in self._offsets
+
+	def __iter__(self):
+		return iter(self.keys())
+
+	def keys(self):
+		"""List of plant IDs, in the iteration order of the saved dict."""
+		if self._plants is not None:
+			return self._plants.keys()
+		return [self._records[n][0] for n in self._order]
+
+	def countries(self):
+		"""List of countries with at least one plant."""
+		if self._plants is not None:
+			return sorted(set(_plant_partition(p) for p in self._plants.itervalues()))
+		return sorted(self._partitions)
+
+	def __getitem__(self, idnr):
+		"""Plant with ID `idnr`; KeyError if not in the database."""
+		if self._plants is not None:
+			return self._plants[idnr]
+		offset, length = self._offsets[idnr]
+		self._file.seek(offset)
+		return self._load_record(self._file.read(length))
+
+	def get(self, idnr, default=None):
+		if idnr in self:
+			return self[idnr]
+		return default
+
+	def country(self, country):
+		"""Dict of {'gppd_idnr': PowerPlant} for the plants of one country (reading one partition)."""
+		if self._plants is not None:
+			return dict((k, p) for k, p in self._plants.iteritems() if _plant_partition(p) == country)
+		if country not in self._partitions:
+			return {}
+		first, count = self._partitions[country]
+		records = self._records[first:first + count]
+		start = records[0][1]
+		self._file.seek(start)
+		block = self._file.read(records[-1][1] + records[-1][2] - start)
+		return dict((idnr, self._load_record(block[offset - start:offset - start + length]))
+			for idnr, offset, length in records)
+
+	def iteritems(self):
+		"""Stream (idnr, plant) pairs in file order (grouped by country), reading one plant at a time."""
+		if self._plants is not None:
+			for item in self._plants.iteritems():
+				yield item
+			return
+		with open(self.filename, 'rb') as fin:
+			fin.seek(_DATABASE_HEADER.size)
+			for idnr, offset, length in self._records:
+				yield idnr, self._load_record(fin.read(length))
+
+	def items(self, countries=None):
+		"""
+		List of (idnr, plant) pairs in the iteration order of the dict returned by `load()`.
+
+		Parameters
+		----------
+		countries : iterable of str, optional
+			Countries to read (default all); only their partitions are read.
+		"""
+		if self._plants is not None:
+			if countries is None:
+				return self._plants.items()
+			countries = set(countries)
+			return [(k, p) for k, p in self._plants.iteritems() if _plant_partition(p) in countries]
+		if countries is None:
+			return self.load().items()
+		plants = {}
+		for country in set(countries):
+			plants.update(self.country(country))
+		# a dict of the same keys inserted in the same order iterates in the same order as load()
+		keys = dict((self._records[n][0], n) for n in self._order)
+		return [(idnr, plants[idnr]) for idnr in keys if idnr in plants]
+
+	def load(self):
+		"""Read all plants into a dict of {'gppd_idnr': PowerPlant}."""
+		if self._plants is not None:
+			return self._plants
+		start = _DATABASE_HEADER.size
+		self._file.seek(start)
+		block = self._file.read(self._records[-1][1] + self._records[-1][2] - start) if self._records else ''
+		plants = [self._load_record(block[offset - start:offset - start + length])
+			for idnr, offset, length in self._records]
+		return dict((self._records[n][0], plants[n]) for n in self._order)
+
 def save_database(plant_dict, filename, savedir=OUTPUT_DIR, datestamp=False):
 	"""
-	Pickle in-memory database to file.
+	Save in-memory database to file, in the framed *-Database.bin format.
 
 	Parameters
 	----------
 	plant_dict : dict
 		Dict of {'gppd_idnr': PowerPlant} to save.
 	filename : str
-		Base filename to save the pickle.
+		Base filename to save the database.
 	savedir : str, optional
 		Directory in which `filename` will be located.
 	datestamp : bool, optional
 		Whether to add a timestamp to the filename.
+
+	Note
+	----
+	A build stamp of the files read while building the database is saved
+	alongside it (see `write_build_stamp()`).
 	"""
-	# pickle database with timestamp
+	# save database with timestamp
 	if datestamp:
 		savename = (filename + '-Database-' + datetime.datetime.now().isoformat().replace(":","-")[:-10] + '.bin')
 	else:
 		savename = (filename + '-Database.bin')
 	savepath = os.path.join(savedir, savename)
-	with open(savepath, 'wb') as fout:
-		pickle.dump(plant_dict, fout)
+	write_database_file(plant_dict, savepath)
+	write_build_stamp(savepath)
+
+def open_database(filename, compact=False):
+	"""
+	Open a database file for lazy access by ID or country, or streaming.
+
+	Parameters
+	----------
+	filename : str
+		Filepath of the database.
+	compact : bool, optional
+		Whether to load plants as `CompactPowerPlant` objects (with compact
+		location and generation data) instead of `PowerPlant` objects.
+
+	Returns
+	-------
+	DatabaseFile
+	"""
+	return DatabaseFile(filename, compact)
+
+def load_database(filename, compact=False):
+	"""
+	Read in database file, in the framed format or pickled as a single dict.
+
+	Parameters
+	----------
+	filename : str
+		Filepath of the database.
+	compact : bool, optional
+		Whether to load plants as `CompactPowerPlant` objects (with compact
+		location and generation data) instead of `PowerPlant` objects.
+
+	Returns
+	-------
+	Dict of {'gppd_idnr': PowerPlant} (or CompactPowerPlant).
+	"""
+	with open_database(filename, compact) as database:
+		return database.load()
+
+# Ordered list of output CSV fields; equivalently the header.
+CSV_FIELDNAMES = (
+	"country",
+	"country_long",
+	"name",
+	"gppd_idnr",
+	"capacity_mw",
+	"latitude",
+	"longitude",
+	"primary_fuel",
+	"other_fuel1",
+	"other_fuel2",
+	"other_fuel3",
+	"commissioning_year",
+	"owner",
+	"source",
+	"url",
+	"geolocation_source",
+	"wepp_id",
+	"year_of_capacity_data",
+	"generation_gwh_2013",
+	"generation_gwh_2014",
+	"generation_gwh_2015",
+	"generation_gwh_2016",
+	"generation_gwh_2017",
+	"generation_gwh_2018",
+	"generation_gwh_2019",
+	"generation_data_source",
+	"estimated_generation_gwh"
+)
+
+
+# Years with a generation column in the output CSV.
+CSV_GENERATION_YEARS = range(2013, 2020)
+
+def _other_fuel_fields(primary_fuel, other_fuel):
+	"""List of up to 3 other fuels for an output CSV row, in output order."""
+	if not other_fuel:
+		return []
+	other_fuel_list = list(other_fuel)
+	# ensure no redundancy
+	if primary_fuel in other_fuel_list:
+		other_fuel_list.remove(primary_fuel)
+	# rotate 'Other' and 'Storage' to the end
+	if len(other_fuel_list) > 1:
+		if u'Storage' in other_fuel_list:
+			other_fuel_list.remove(u'Storage')
+			other_fuel_list.append(u'Storage')
+		if u'Other' in other_fuel_list:
+			other_fuel_list.remove(u'Other')
+			other_fuel_list.append(u'Other')
+	return other_fuel_list[:3] # keep 3 "other" fuels
+
+def _generation_fields(generation):
+	"""Generation data source and annual generation for each of CSV_GENERATION_YEARS, for an output CSV row."""
+	# log the sources of generation data
+	gen_sources = {}
+	if generation:
+		for g in generation:
+			if g.source and g.gwh is not None:
+				gen_sources[g.source] = gen_sources.get(g.source, 0) + 1
+	if not gen_sources:
+		return NO_DATA_UNICODE, [NO_DATA_UNICODE] * len(CSV_GENERATION_YEARS)
+	gen_source_name = u'|'.join(sorted(gen_sources, key=lambda x: gen_sources[x] * -1))
+	return gen_source_name, [annual_generation(generation, year) for year in CSV_GENERATION_YEARS]
+
+def _set_fuel_and_generation_fields(ret, primary_fuel, other_fuel, generation):
+	"""Fill the fuel and generation fields of an output CSV row dict."""
+	# handle fuel
+	ret['primary_fuel'] = primary_fuel
+	for i, f in enumerate(_other_fuel_fields(primary_fuel, other_fuel)):
+		ret['other_fuel{0}'.format(i+1)] = f
+	# handle generation
+	ret['generation_data_source'], annual_gwh = _generation_fields(generation)
+	for year, gwh in izip(CSV_GENERATION_YEARS, annual_gwh):
+		ret['generation_gwh_{0}'.format(year)] = gwh
+
+def _plant_csv_row(powerplant, country_dictionary):
+	"""Format a PowerPlant as a row dict for the output CSV."""
+	ret = {}
+	ret['name'] = powerplant.name.encode(UNICODE_ENCODING)
+	ret['gppd_idnr'] = powerplant.idnr.encode(UNICODE_ENCODING)
+	ret['capacity_mw'] = powerplant.capacity
+	ret['year_of_capacity_data'] = powerplant.cap_year
+	ret['country_long'] = powerplant.country.encode(UNICODE_ENCODING)
+	ret['country'] = country_dictionary[powerplant.country].iso_code
+	ret['owner'] = powerplant.owner.encode(UNICODE_ENCODING)
+	ret['source'] = powerplant.source
+	if ret['source'] is not None:
+		ret['source'] = ret['source'].encode(UNICODE_ENCODING)
+	ret['url'] = powerplant.url.encode(UNICODE_ENCODING)
+	if powerplant.location.latitude and powerplant.location.longitude:
+		ret['latitude'] = u"{:.4f}".format(powerplant.location.latitude)
+		ret['longitude'] = u"{:.4f}".format(powerplant.location.longitude)
+	else:
+		ret['latitude'] = NO_DATA_NUMERIC
+		ret['longitude'] = NO_DATA_NUMERIC
+	ret['geolocation_source'] = powerplant.coord_source.encode(UNICODE_ENCODING)
+	ret['wepp_id'] = powerplant.wepp_id.encode(UNICODE_ENCODING)
+	ret['commissioning_year'] = powerplant.commissioning_year
+	_set_fuel_and_generation_fields(ret, powerplant.primary_fuel,
+			powerplant.other_fuel, powerplant.generation)
+	ret['estimated_generation_gwh'] = powerplant.estimated_generation_gwh
+	return ret
+
+# Plants formatted together by the streaming CSV exporter.
+CSV_BATCH_SIZE = 1000
+
+def _plant_items(plants):
+	"""('gppd_idnr', plant) pairs of a plant dict in dict order, or of a PlantTable in table row order."""
+	if isinstance(plants, PlantTable):
+		return plants.iter_plants()
+	return plants.iteritems()
+
+def _get_plant(plants, idnr):
+	"""Get a plant of a plant dict or a PlantTable by its gppd_idnr."""
+	if isinstance(plants, PlantTable):
+		return plants.plant(idnr)
+	return plants[idnr]
+
+def _csv_sort_order(plant_items):
+	"""('gppd_idnr', plant) pairs in output CSV order: by (country, name), ties in the given order."""
+	keyed = [(plant.country, plant.name, n, idnr, plant)
+		for n, (idnr, plant) in enumerate(plant_items)]
+	keyed.sort()
+	return [(k[3], k[4]) for k in keyed]
+
+def _csv_values(column):
+	"""Convert unicode values of a column as the csv module does (raises on non-ASCII text)."""
+	if unicode not in set(map(type, column)):
+		return column
+	return [str(v) if type(v) is unicode else v for v in column]
+
+def _csv_batch_columns(plants, country_dictionary, fieldnames):
+	"""Format a batch of plants column by column into lists of output CSV values, one per field."""
+	def _encoded(values, none_ok=False):
+		# encode each distinct value once
+		memo = dict((v, v if v is None and none_ok else v.encode(UNICODE_ENCODING)) for v in set(values))
+		return [memo[v] for v in values]
+
+	columns = {}
+	countries = [p.country for p in plants]
+	columns['name'] = [p.name.encode(UNICODE_ENCODING) for p in plants]
+	columns['gppd_idnr'] = [p.idnr.encode(UNICODE_ENCODING) for p in plants]
+	columns['capacity_mw'] = _csv_values([p.capacity for p in plants])
+	columns['year_of_capacity_data'] = _csv_values([p.cap_year for p in plants])
+	columns['country_long'] = _encoded(countries)
+	iso_codes = dict((c, country_dictionary[c].iso_code) for c in set(countries))
+	columns['country'] = _csv_values([iso_codes[c] for c in countries])
+	columns['owner'] = _encoded([p.owner for p in plants])
+	columns['source'] = _encoded([p.source for p in plants], none_ok=True)
+	columns['url'] = _encoded([p.url for p in plants])
+	latitude = []
+	longitude = []
+	for p in plants:
+		location = p.location
+		if location.latitude and location.longitude:
+			latitude.append("{:.4f}".format(location.latitude))
+			longitude.append("{:.4f}".format(location.longitude))
+		else:
+			latitude.append(NO_DATA_NUMERIC)
+			longitude.append(NO_DATA_NUMERIC)
+	columns['latitude'] = latitude
+	columns['longitude'] = longitude
+	columns['geolocation_source'] = _encoded([p.coord_source for p in plants])
+	columns['wepp_id'] = _encoded([p.wepp_id for p in plants])
+	columns['commissioning_year'] = _csv_values([p.commissioning_year for p in plants])
+	primary_fuel = [p.primary_fuel for p in plants]
+	columns['primary_fuel'] = _csv_values(primary_fuel)
+	other_fuel = [_other_fuel_fields(f, p.other_fuel) + [u''] * 3 for f, p in izip(primary_fuel, plants)]
+	for i in range(3):
+		columns['other_fuel{0}'.format(i+1)] = _csv_values([f[i] for f in other_fuel])
+	generation = [_generation_fields(p.generation) for p in plants]
+	columns['generation_data_source'] = _csv_values([g[0] for g in generation])
+	for i, year in enumerate(CSV_GENERATION_YEARS):
+		columns['generation_gwh_{0}'.format(year)] = _csv_values([g[1][i] for g in generation])
+	columns['estimated_generation_gwh'] = _csv_values([p.estimated_generation_gwh for p in plants])
+	empty = [''] * len(plants)
+	return [columns.get(field, empty) for field in fieldnames]
+
+def _iter_formatted_batches(plants_dictionary, fieldnames, country_dictionary, errors, batch_size):
+	"""Generate `(plants, columns)` for batches of plants in output CSV order; see `_iter_csv_batches()`."""
+	if country_dictionary is None:
+		country_dictionary = make_country_dictionary()
+	sorted_items = _csv_sort_order(_plant_items(plants_dictionary))
+	for start in xrange(0, len(sorted_items), batch_size):
+		keys, batch = zip(*sorted_items[start:start + batch_size])
+		batch = list(batch)
+		try:
+			columns = _csv_batch_columns(batch, country_dictionary, fieldnames)
+		except Exception:
+			# format plant by plant to find the plants that fail
+			columns = [[] for field in fieldnames]
+			formatted = []
+			for idnr, plant in izip(keys, batch):
+				try:
+					plant_columns = _csv_batch_columns([plant], country_dictionary, fieldnames)
+				except Exception as e:
+					if errors is None:
+						raise
+					errors.append((idnr, e))
+					continue
+				formatted.append(plant)
+				for column, values in izip(columns, plant_columns):
+					column.extend(values)
+			batch = formatted
+		yield batch, columns
+
+def _iter_csv_batches(plants_dictionary, fieldnames, country_dictionary, errors, batch_size):
+	"""Generate batches of output CSV values, as lists of columns; see `iter_csv_rows()`."""
+	for plants, columns in _iter_formatted_batches(plants_dictionary, fieldnames, country_dictionary,
+		errors, batch_size):
+		yield columns
+
+def iter_csv_rows(plants_dictionary, fieldnames=CSV_FIELDNAMES, country_dictionary=None,
+	errors=None, batch_size=CSV_BATCH_SIZE):
+	"""
+	Generate output CSV rows for plants, in output order (by country, then name).
 
-def load_database(filename):
-	"""Read in pickled database file."""
-	with open(filename, 'rb') as fin:
-		return pickle.load(fin)
+	Plants are formatted in batches, column by column. A batch that fails to
+	format is formatted again plant by plant, skipping the plants that fail.
+	Plants with the same country and name keep their dict order, or their
+	row order in a PlantTable.
 
-def write_csv_file(plants_dictionary, csv_filename, dump=False):
+	Parameters
+	----------
+	plants_dictionary : dict or PlantTable
+		Dict of {'gppd_idnr': PowerPlant}, or a PlantTable, to format.
+	fieldnames : sequence of str, optional
+		Output columns; columns that are not plant fields (such as 'in_pw') are left empty.
+	country_dictionary : dict, optional
+		Country information as returned by `make_country_dictionary()`.
+	errors : list, optional
+		If given, `(idnr, exception)` is appended for each plant that can't be
+		formatted; otherwise the exception is raised.
+	batch_size : int, optional
+		Number of plants formatted together.
+
+	Returns
+	-------
+	Generator of tuples of CSV values, in the order of `fieldnames`.
+	"""
+	for columns in _iter_csv_batches(plants_dictionary, fieldnames, country_dictionary, errors, batch_size):
+		for row in izip(*columns):
+			yield row
+
+def write_csv_file(plants_dictionary, csv_filename, dump=False, compress=False, errors=None):
 	"""
 	Write in-memory database into a CSV format.
 	Standardize all lat/long values to 4 decimals.
 
 	Parameters
 	----------
-	plants_dictionary : dict
-		Dict of {'gppd_idnr': PowerPlant} to save.
+	plants_dictionary : dict or PlantTable
+		Dict of {'gppd_idnr': PowerPlant}, or a PlantTable, to save.
 	csv_filename : str
 		Filepath for the output CSV.
 	dump : bool, default False
 		Whether this is a full-dump or a cleaned database.
-
+	compress : bool, default False
+		Whether to write gzip-compressed output.
+	errors : list, optional
+		If given, `(idnr, exception)` is appended for each plant that can't be
+		written; otherwise these plants are reported on stdout.
 	"""
 
-	country_dictionary = make_country_dictionary()
-
-	def _dict_row(powerplant):
-		ret = {}
-		ret['name'] = powerplant.name.encode(UNICODE_ENCODING)
-		ret['gppd_idnr'] = powerplant.idnr.encode(UNICODE_ENCODING)
-		ret['capacity_mw'] = powerplant.capacity
-		ret['year_of_capacity_data'] = powerplant.cap_year
-		ret['country_long'] = powerplant.country.encode(UNICODE_ENCODING)
-		ret['country'] = country_dictionary[powerplant.country].iso_code
-		ret['owner'] = powerplant.owner.encode(UNICODE_ENCODING)
-		ret['source'] = powerplant.source
-		if ret['source'] is not None:
-			ret['source'] = ret['source'].encode(UNICODE_ENCODING)
-		ret['url'] = powerplant.url.encode(UNICODE_ENCODING)
-		if powerplant.location.latitude and powerplant.location.longitude:
-			ret['latitude'] = u"{:.4f}".format(powerplant.location.latitude)
-			ret['longitude'] = u"{:.4f}".format(powerplant.location.longitude)
-		else:
-			ret['latitude'] = NO_DATA_NUMERIC
-			ret['longitude'] = NO_DATA_NUMERIC
-		ret['geolocation_source'] = powerplant.coord_source.encode(UNICODE_ENCODING)
-		ret['wepp_id'] = powerplant.wepp_id.encode(UNICODE_ENCODING)
-		ret['commissioning_year'] = powerplant.commissioning_year
-		# handle fuel
-		ret['primary_fuel'] = powerplant.primary_fuel
-		other_fuel_list = list(powerplant.other_fuel)
-		# ensure no redundancy
-		if powerplant.primary_fuel in other_fuel_list:
-			other_fuel_list.remove(powerplant.primary_fuel)
-		# rotate 'Other' and 'Storage' to the end
-		if len(other_fuel_list) > 1:
-			if u'Storage' in other_fuel_list:
-				other_fuel_list.remove(u'Storage')
-				other_fuel_list.append(u'Storage')
-			if u'Other' in other_fuel_list:
-				other_fuel_list.remove(u'Other')
-				other_fuel_list.append(u'Other')
-		for i, f in enumerate(other_fuel_list):
-			if i == 3: # keep 3 "other" fuels
-				break
-			ret['other_fuel{0}'.format(i+1)] = f
-		# log the sources of generation data
-		gen_sources = {}
-		gen_source_name = NO_DATA_UNICODE
-		if powerplant.generation:
-			for g in powerplant.generation:
-				if g.source and g.gwh is not None:
-					gen_sources[g.source] = gen_sources.get(g.source, 0) + 1
-			gen_source_name = u'|'.join(sorted(gen_sources, key=lambda x: gen_sources[x] * -1))
-		ret['generation_data_source'] = gen_source_name
-		# handle generation
-		for year in range(2013, 2020):
-			if gen_sources:
-				gwh = annual_generation(powerplant.generation, year)
-				ret['generation_gwh_{0}'.format(year)] = gwh
-			else:
-				ret['generation_gwh_{0}'.format(year)] = NO_DATA_UNICODE
-				ret['generation_data_source'] = NO_DATA_UNICODE
-		ret['estimated_generation_gwh'] = powerplant.estimated_generation_gwh
-		return ret
-
-	fieldnames = [
-		"country",
-		"country_long",
-		"name",
-		"gppd_idnr",
-		"capacity_mw",
-		"latitude",
-		"longitude",
-		"primary_fuel",
-		"other_fuel1",
-		"other_fuel2",
-		"other_fuel3",
-		"commissioning_year",
-		"owner",
-		"source",
-		"url",
-		"geolocation_source",
-		"wepp_id",
-		"year_of_capacity_data",
-		"generation_gwh_2013",
-		"generation_gwh_2014",
-		"generation_gwh_2015",
-		"generation_gwh_2016",
-		"generation_gwh_2017",
-		"generation_gwh_2018",
-		"generation_gwh_2019",
-		"generation_data_source",
-		"estimated_generation_gwh"
-	]
+	fieldnames = list(CSV_FIELDNAMES)
 
 	if dump:
 		fieldnames.insert(2, 'in_pw')
 
+	report_errors = errors is None
+	if report_errors:
+		errors = []
+
 	# TODO: get csv_file abs path
-	with open(csv_filename, 'wb') as fout:
-		#warning_text = "NOTE: The Global Power Plant Database is currently in draft status and not yet published. Please do not reference or cite the data as basis for research or publications until the data is officially published.\n"
-		#fout.write(warning_text)
+	#warning_text = "NOTE: The Global Power Plant Database is currently in draft status and not yet published. Please do not reference or cite the data as basis for research or publications until the data is officially published.\n"
+	export_database(plants_dictionary, [CSVSink(csv_filename, compress)], fieldnames, errors)
 
-		writer = csv.DictWriter(fout, fieldnames=fieldnames, lineterminator='\r\n')
-		writer.writeheader()
+	if report_errors:
+		for idnr, e in errors:
+			plant = _get_plant(plants_dictionary, idnr)
+			print(u"Unicode error with plant {0}".format(plant.idnr))
+			print(plant)
 
-		sort_key = lambda x: (plants_dictionary[x].country,  plants_dictionary[x].name)
 
-		sorted_keys = sorted(plants_dictionary.keys(), key=sort_key)
-		for k in sorted_keys:
-			try:
-				drow = _dict_row(plants_dictionary[k])
-				writer.writerow(drow)
-			except:
-				print(u"Unicode error with plant {0}".format(plants_dictionary[k].idnr))
-				print(plants_dictionary[k])
+# Rows converted together by `read_csv_file()`.
+CSV_READ_CHUNK_SIZE = 10000
 
+def _csv_float(value):
+	try:
+		return float(value)
+	except (ValueError, TypeError):
+		return None
 
-def read_csv_file_to_dict(filename):
-	"""
-	Read saved CSV database into nested dict with gppd_idnr as key.
+def _csv_int(value):
+	try:
+		return int(value)
+	except (ValueError, TypeError):
+		return None
 
-	Parameters
-	----------
-	filename : str
-		Filepath for the CSV to read.
+# Converters for raw output CSV cells; every cell is cleaned with format_string() first.
+_CSV_CONVERTERS = {
+	'text': format_string,
+	'text_or_none': lambda value: format_string(value) or None,
+	'float': lambda value: _csv_float(format_string(value)),
+	'int': lambda value: _csv_int(format_string(value)),
+}
+
+# Type of each output CSV column as read by `read_csv_file()`: 'float', 'int',
+# 'text_or_none' (None when empty) or 'text' (the default for other columns).
+CSV_COLUMN_TYPES = {
+	'capacity_mw': 'float',
+	'latitude': 'float',
+	'longitude': 'float',
+	'commissioning_year': 'float',
+	'year_of_capacity_data': 'int',
+	'primary_fuel': 'text_or_none',
+	'other_fuel1': 'text_or_none',
+	'other_fuel2': 'text_or_none',
+	'other_fuel3': 'text_or_none',
+	'generation_data_source': 'text_or_none',
+	'estimated_generation_gwh': 'text_or_none',
+	'geolocation_source': 'text_or_none',
+	'wepp_id': 'text_or_none',
+}
+CSV_COLUMN_TYPES.update(('generation_gwh_{0}'.format(year), 'text_or_none') for year in CSV_GENERATION_YEARS)
+
+class _ConvertedValues(dict):
+	"""Memo of converted cells for one column; each distinct raw value is converted once."""
+	__slots__ = ('convert',)
+
+	# cleared when larger than this, so that columns of unique values don't grow the memo without bound
+	MAX_SIZE = 100000
+
+	def __init__(self, convert):
+		self.convert = convert
+
+	def __missing__(self, value):
+		converted = self[value] = self.convert(value)
+		return converted
+
+def _pair_coordinates(latitude, longitude):
+	"""Set both coordinates to None where either is None (coordinates are only kept in pairs)."""
+	for i, (a, b) in enumerate(izip(latitude, longitude)):
+		if a is None or b is None:
+			latitude[i] = longitude[i] = None
+
+def _read_csv_columns(filename, columns=None, chunk_size=CSV_READ_CHUNK_SIZE):
+	"""
+	Read a saved CSV database column by column; see `read_csv_file()`.
 
 	Returns
 	-------
-	pdb : dict
-		Dictionary with gppd_idnr for keys and dictionary
+	names : list of str
+		Columns read, in file order.
+	converted : dict
+		Dict of {column: list of converted values}, in file order.
+	long_rows : list of int
+		Indexes of the rows with more cells than the header.
 	"""
 	with open(filename, 'rbU') as fin:
-		reader = csv.DictReader(fin)
-		pdb = {}  # returned object
-		for row in reader:
-			row = {k: format_string(v) for k, v in row.items()}
-			try:
-				row['capacity_mw'] = float(row['capacity_mw'])
-			except:
-				row['capacity_mw'] = None
-			try:
-				row['latitude'] = float(row['latitude'])
-				row['longitude'] = float(row['longitude'])
-			except:
-				row['latitude'] = None
-				row['longitude'] = None
-			try:
-				row['commissioning_year'] = float(row['commissioning_year'])
-			except:
-				row['commissioning_year'] = None
-			try:
-				row['year_of_capacity_data'] = int(row['year_of_capacity_data'])
-			except:
-				row['year_of_capacity_data'] = None
-			# check if fuels are empty strings
-			if not row['primary_fuel']:
-				row['primary_fuel'] = None
-			if not row['other_fuel1']:
-				row['other_fuel1'] = None
-			if not row['other_fuel2']:
-				row['other_fuel2'] = None
-			if not row['other_fuel3']:
-				row['other_fuel3'] = None
-			# check if annual generation data are empty
-			if not row['generation_gwh_2013']:
-				row['generation_gwh_2013'] = None
-			if not row['generation_gwh_2014']:
-				row['generation_gwh_2014'] = None
-			if not row['generation_gwh_2015']:
-				row['generation_gwh_2015'] = None
-			if not row['generation_gwh_2016']:
-				row['generation_gwh_2016'] = None
-			if not row['generation_gwh_2017']:
-				row['generation_gwh_2017'] = None
-			if not row['generation_gwh_2018']:
-				row['generation_gwh_2018'] = None
-			if not row['generation_gwh_2019']:
-				row['generation_gwh_2019'] = None
-			if not row['generation_data_source']:
-				row['generation_data_source'] = None
-			if not row['estimated_generation_gwh']:
-				row['estimated_generation_gwh'] = None
-			# check if geolocation source is empty string
-			if not row['geolocation_source']:
-				row['geolocation_source'] = None
-			# check if wepp_id is empty string
-			if not row['wepp_id']:
-				row['wepp_id'] = None
-			# add row to output dict
-			pdb[row['gppd_idnr']] = row
-		return pdb
-
-
-def write_sqlite_file(plants_dict, filename, return_connection=False):
+		reader = csv.reader(fin)
+		header = next(reader)
+		if columns is None:
+			names = list(header)
+		else:
+			missing = set(columns) - set(header)
+			if missing:
+				raise ValueError('{0} has no column(s) {1}'.format(filename, ', '.join(sorted(missing))))
+			names = [name for name in header if name in columns or name == 'gppd_idnr']
+		positions = [header.index(name) for name in names]
+		memos = [_ConvertedValues(_CSV_CONVERTERS[CSV_COLUMN_TYPES.get(name, 'text')]) for name in names]
+		results = [[] for name in names]
+		long_rows = []  # rows with more cells than the header
+		row_count = 0
+
+		while True:
+			# skip blank lines like csv.DictReader
+			chunk = filter(None, islice(reader, chunk_size))
+			if not chunk:
+				break
+			# transpose, padding short rows with None like csv.DictReader
+			cells = list(izip_longest(*chunk))
+			cells.extend([(None,) * len(chunk)] * (len(header) - len(cells)))
+			if len(cells) > len(header):
+				long_rows.extend(row_count + i for i, row in enumerate(chunk) if len(row) > len(header))
+			row_count += len(chunk)
+			for memo, position, result in izip(memos, positions, results):
+				if len(memo) > memo.MAX_SIZE:
+					memo.clear()
+				result.extend(map(memo.__getitem__, cells[position]))
+
+	converted = dict(izip(names, results))
+	if 'latitude' in converted and 'longitude' in converted:
+		_pair_coordinates(converted['latitude'], converted['longitude'])
+
+	return names, converted, long_rows
+
+def read_csv_file(filename, columns=None, columnar=False, chunk_size=CSV_READ_CHUNK_SIZE):
 	"""
-	Write database into sqlite format from nested dict.
+	Read a saved CSV database, converting each column according to CSV_COLUMN_TYPES.
 
 	Parameters
 	----------
-	plants_dict : dict
-		Has the structure inherited from <read_csv_file_to_dict>.
 	filename : str
-		Output filepath; should not exist before function call.
-	return_connection : bool (default False)
-		Whether to return an active database connection.
+		Filepath for the CSV to read.
+	columns : list of str, optional
+		Columns to read (default all); 'gppd_idnr' is always read.
+	columnar : bool, default False
+		Whether to return arrays by column instead of a dict by plant.
+	chunk_size : int, optional
+		Number of rows converted together.
 
 	Returns
 	-------
-	conn: sqlite3.Connection
-		Only returned if `return_connection` is True.
+	dict
+		If `columnar` is False, dict of {gppd_idnr: {column: value}}, as
+		returned by `read_csv_file_to_dict()`. Otherwise dict of {column: numpy.ndarray},
+		with float arrays (NaN for no data) for 'float' and 'int' columns and object
+		arrays for text columns, in file order.
 
 	Raises
 	------
-	OSError
-		If SQLite cannot make a database connection.
-	sqlite3.Error
-		If database has already been populated.
-
+	ValueError
+		If a requested column is not in the file.
 	"""
-	try:
-		conn = sqlite3.connect(filename)
-	except:
-		raise OSError('Cannot connect to {0}'.format(filename))
-	conn.isolation_level = None  # faster database insertions
+	names, converted, long_rows = _read_csv_columns(filename, columns, chunk_size)
 
-	c = conn.cursor()
+	if columnar:
+		arrays = {}
+		for name in names:
+			if CSV_COLUMN_TYPES.get(name) in ('float', 'int'):
+				arrays[name] = np.array([np.nan if v is None else v for v in converted[name]], dtype=float)
+			else:
+				arrays[name] = np.array(converted[name], dtype=object)
+		return arrays
+	rows = [dict(izip(names, values)) for values in izip(*[converted[name] for name in names])]
+	for i in long_rows:
+		# csv.DictReader keeps extra cells under None; format_string() blanks them
+		rows[i][None] = NO_DATA_UNICODE
+	return dict(izip(converted['gppd_idnr'], rows))
+
+def read_csv_file_to_dict(filename, columns=None):
+	"""
+	Read saved CSV database into nested dict with gppd_idnr as key.
 
-	try:
+	Parameters
+	----------
+	filename : str
+		Filepath for the CSV to read.
+	columns : list of str, optional
+		Columns to read (default all); 'gppd_idnr' is always read.
+
+	Returns
+	-------
+	pdb : dict
+		Dictionary with gppd_idnr for keys and dictionary
+	"""
+	return read_csv_file(filename, columns)
+
+
+# Rows inserted per executemany() call when writing SQLite databases.
+SQLITE_BATCH_SIZE = 5000
+
+# Indexes created on the powerplants table after loading it. The UNIQUE
+# constraint on gppd_idnr already gives SQLite an index on that column.
+SQLITE_INDEXES = (
+	('idx_country', 'country'),
+	('idx_primary_fuel', 'primary_fuel'),
+	('idx_capacity_mw', 'capacity_mw'),
+	('idx_commissioning_year', 'commissioning_year'),
+)
+
+_SQLITE_INSERT = u'INSERT INTO powerplants VALUES ({0})'.format(', '.join(['?'] * len(CSV_FIELDNAMES)))
+
+def _create_sqlite_database(filename):
+	"""Connect to a new SQLite database and create the empty powerplants table."""
+	try:
+		conn = sqlite3.connect(filename)
+	except:
+		raise OSError('Cannot connect to {0}'.format(filename))
+	conn.isolation_level = None  # faster database insertions
+
+	c = conn.cursor()
+
+	try:
 		c.execute('''CREATE TABLE powerplants (
 						country TEXT,
 						country_long TEXT,
@@ -1368,53 +3585,162 @@ def write_sqlite_file(plants_dict, filename, return_connection=False):
 						estimated_generation_gwh REAL )''')
 	except:
 		raise sqlite3.Error('Cannot create table "powerplants" (it might already exist).')
+	return conn
 
+def _begin_powerplants_load(conn):
+	"""Turn off journaling and syncing and begin the transaction for loading the powerplants table."""
+	c = conn.cursor()
+	c.execute('PRAGMA journal_mode = MEMORY')
+	c.execute('PRAGMA synchronous = OFF')
 	c.execute('begin')
-	for k, p in plants_dict.iteritems():
-		stmt = u'''INSERT INTO powerplants VALUES (
-					?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
-		vals = (
-				p['country'],
-				p['country_long'],
-				p['name'],
-				p['gppd_idnr'],
-				p['capacity_mw'],
-				p['latitude'],
-				p['longitude'],
-				p['primary_fuel'],
-				p['other_fuel1'],
-				p['other_fuel2'],
-				p['other_fuel3'],
-				p['commissioning_year'],
-				p['owner'],
-				p['source'],
-				p['url'],
-				p['geolocation_source'],
-				p['wepp_id'],
-				p['year_of_capacity_data'],
-				p['generation_gwh_2013'],
-				p['generation_gwh_2014'],
-				p['generation_gwh_2015'],
-				p['generation_gwh_2016'],
-				p['generation_gwh_2017'],
-				p['generation_gwh_2018'],
-				p['generation_gwh_2019'],
-				p['generation_data_source'],
-				p['estimated_generation_gwh'])
-		c.execute(stmt, vals)
+	return c
 
+def _finish_powerplants_load(conn, spatial_index=False):
+	"""Commit a load begun by `_begin_powerplants_load()`, index the table and restore journaling and syncing."""
+	c = conn.cursor()
 	c.execute('commit')
+	for index_name, column in SQLITE_INDEXES:
+		c.execute('CREATE INDEX {0} ON powerplants ({1})'.format(index_name, column))
+	if spatial_index:
+		create_spatial_index(conn)
+	c.execute('PRAGMA synchronous = FULL')
+	c.execute('PRAGMA journal_mode = DELETE')
+
+def _load_powerplants_table(conn, batches, spatial_index=False):
+	"""
+	Insert batches of rows into the powerplants table in one transaction, then index it.
+
+	Journaling and syncing are turned off for the load and restored afterwards.
+	With `spatial_index`, the SPATIAL_INDEX_TABLE R*Tree is built as well.
+
+	Returns
+	-------
+	count : int
+		Number of rows inserted.
+	"""
+	c = _begin_powerplants_load(conn)
+	count = 0
+	for rows in batches:
+		c.executemany(_SQLITE_INSERT, rows)
+		count += c.rowcount
+	_finish_powerplants_load(conn, spatial_index)
+	return count
+
+def _sqlite_load_order(idnrs):
+	"""
+	Get the indices of rows with the given gppd_idnrs in the order they are loaded into SQLite.
+
+	This is the iteration order of a dict keyed on gppd_idnr filled in row
+	order, the way `copy_csv_to_sqlite()` has always loaded the output CSV;
+	a later row with the same gppd_idnr replaces an earlier one. SQLite adds
+	up capacities in table row order, so the country summary depends on it
+	to the last digit (see `summarize_countries()`).
+	"""
+	order = {}
+	for i, idnr in enumerate(idnrs):
+		order[idnr] = i
+	return order.values()
+
+def write_sqlite_file(plants_dict, filename, return_connection=False, spatial_index=False):
+	"""
+	Write database into sqlite format from nested dict.
+
+	Parameters
+	----------
+	plants_dict : dict
+		Has the structure inherited from <read_csv_file_to_dict>.
+	filename : str
+		Output filepath; should not exist before function call.
+	return_connection : bool (default False)
+		Whether to return an active database connection.
+	spatial_index : bool (default False)
+		Whether to build an R*Tree index over plant coordinates (see `create_spatial_index()`).
 
-	index_stmt = '''CREATE INDEX idx_country ON powerplants (country)'''
-	c.execute(index_stmt)
+	Returns
+	-------
+	conn: sqlite3.Connection
+		Only returned if `return_connection` is True.
+
+	Raises
+	------
+	OSError
+		If SQLite cannot make a database connection.
+	sqlite3.Error
+		If database has already been populated.
+
+	"""
+	conn = _create_sqlite_database(filename)
+
+	rows = (tuple(p[field] for field in CSV_FIELDNAMES) for p in plants_dict.itervalues())
+	batches = iter(lambda: list(islice(rows, SQLITE_BATCH_SIZE)), [])
+	_load_powerplants_table(conn, batches, spatial_index)
 
 	if return_connection:
 		return conn
 	else:
 		conn.close()
 
+def _csv_cell_text(value):
+	"""Text written by the csv module for a value."""
+	if value is None:
+		return ''
+	if type(value) is float:
+		return repr(value)
+	if type(value) is str:
+		return value
+	return str(value)
+
+def _cell_converter(column, column_types=CSV_COLUMN_TYPES):
+	"""Converter from a (type, value) pair of an output CSV value to the value read back from the CSV."""
+	convert = _CSV_CONVERTERS[column_types.get(column, 'text')]
+	return lambda key: convert(_csv_cell_text(key[1]))
+
+def write_sqlite_database(plants, filename, return_connection=False, errors=None, batch_size=SQLITE_BATCH_SIZE,
+	spatial_index=False):
+	"""
+	Write plants directly into an SQLite database, without going through a CSV file.
+
+	The powerplants table has the same schema, values and row order as one
+	written by `copy_csv_to_sqlite()` from the output CSV of the same plants.
+
+	Parameters
+	----------
+	plants : dict or PlantTable
+		Dict of {'gppd_idnr': PowerPlant}, or a PlantTable, to save.
+	filename : str
+		Output filepath; should not exist before function call.
+	return_connection : bool (default False)
+		Whether to return an active database connection.
+	errors : list, optional
+		If given, `(idnr, exception)` is appended for each plant that can't be
+		written; otherwise these plants are reported on stdout.
+	batch_size : int, optional
+		Number of rows formatted and inserted together.
+	spatial_index : bool (default False)
+		Whether to build an R*Tree index over plant coordinates (see `create_spatial_index()`).
 
-def copy_csv_to_sqlite(csv_filename, sqlite_filename, return_connection=False):
+	Returns
+	-------
+	conn: sqlite3.Connection
+		Only returned if `return_connection` is True.
+
+	Raises
+	------
+	OSError
+		If SQLite cannot make a database connection.
+	sqlite3.Error
+		If database has already been populated.
+	"""
+	start = time.time()
+	sink = SQLiteSink(filename, spatial_index, keep_connection=return_connection)
+	export_database(plants, [sink], errors=errors, batch_size=batch_size)
+	print(u"Wrote {0} plants to {1} in {2:.2f} s.".format(sink.count, filename, time.time() - start))
+
+	if return_connection:
+		return sink.conn
+
+
+def copy_csv_to_sqlite(csv_filename, sqlite_filename, return_connection=False, spatial_index=False):
 	"""
 	Copy the output database from CSV format into SQLite format.
 
@@ -1424,11 +3750,1680 @@ def copy_csv_to_sqlite(csv_filename, sqlite_filename, return_connection=False):
 		Input file to copy.
 	sqlite_filename : str
 		Output database file; should not exist prior to function call.
+	spatial_index : bool (default False)
+		Whether to build an R*Tree index over plant coordinates (see `create_spatial_index()`).
+
+	Rows are inserted in the order of `_sqlite_load_order()`, so that the
+	table matches the one written by `write_sqlite_database()` along with the
+	CSV, including the order in which SUM() adds up capacities.
 	"""
-	pdb = read_csv_file_to_dict(csv_filename)
+	names, converted, long_rows = _read_csv_columns(csv_filename)
 	try:
-		conn = write_sqlite_file(pdb, sqlite_filename, return_connection=return_connection)
+		conn = _create_sqlite_database(sqlite_filename)
+		columns = [converted[field] for field in CSV_FIELDNAMES]
+		rows = (tuple(column[i] for column in columns) for i in _sqlite_load_order(converted['gppd_idnr']))
+		batches = iter(lambda: list(islice(rows, SQLITE_BATCH_SIZE)), [])
+		_load_powerplants_table(conn, batches, spatial_index)
 	except:
 		raise Exception('Error handling sqlite database')
 	if return_connection:
 		return conn
+	else:
+		conn.close()
+
+
+### COUNTRY SUMMARY ###
+
+# Ordered list of country summary CSV fields; equivalently the header.
+SUMMARY_FIELDNAMES = (
+			'iso_code',
+			'country',
+			'count',
+			'total_capacity_gw',
+			'max_capacity_mw',
+			'count_distinct_fuel',
+			'count_distinct_name',
+			'count_distinct_owner',
+			'count_distinct_source',
+			'count_fuel_coal',
+			'capacity_gw_fuel_coal',
+			'count_fuel_gas',
+			'capacity_gw_fuel_gas',
+			'count_fuel_oil',
+			'capacity_gw_fuel_oil',
+			'count_fuel_petcoke',
+			'capacity_gw_fuel_petcoke',
+			'count_fuel_hydro',
+			'capacity_gw_fuel_hydro',
+			'count_fuel_nuclear',
+			'capacity_gw_fuel_nuclear',
+			'count_fuel_wind',
+			'capacity_gw_fuel_wind',
+			'count_fuel_solar',
+			'capacity_gw_fuel_solar',
+			'count_fuel_geothermal',
+			'capacity_gw_fuel_geothermal',
+			'count_fuel_biomass',
+			'capacity_gw_fuel_biomass',
+			'count_fuel_cogeneration',
+			'capacity_gw_fuel_cogeneration',
+			'count_fuel_waste',
+			'capacity_gw_fuel_waste',
+			'count_fuel_wave_and_tidal',
+			'capacity_gw_fuel_wave_and_tidal',
+			'count_fuel_storage',
+			'capacity_gw_fuel_storage',
+			'count_fuel_other',
+			'capacity_gw_fuel_other',
+			'count_null_name',
+			'count_null_gppd_idnr',
+			'count_null_capacity_mw',
+			'count_null_year_of_capacity_data',
+			'count_null_owner',
+			'count_null_source',
+			'count_null_url',
+			'count_null_latitude',
+			'count_null_longitude',
+			'count_null_fuel',
+			'count_wepp_id',
+			'capacity_gw_wepp_id',
+			'count_null_generation_gwh_all',
+			'count_generation_gwh_2013',
+			'count_generation_gwh_2014',
+			'count_generation_gwh_2015',
+			'count_generation_gwh_2016',
+			'count_generation_gwh_2017',
+			'count_generation_gwh_2018',
+			'count_generation_gwh_2019',
+			'count_generation_data_source',
+			'count_estimated_generation_gwh',
+			)
+
+def summarize_countries(db_conn, countries):
+	"""
+	Get country-level summaries of the database in one GROUP BY pass over the powerplants table.
+
+	Gives the same summaries as the per-country queries of
+	utils/database_country_summary.py. Capacities are added up by SQLite in
+	table row order, so databases with the same rows in the same order (such
+	as those written by `write_sqlite_database()` and `copy_csv_to_sqlite()`)
+	give identical summaries.
+
+	Parameters
+	----------
+	db_conn : sqlite3.Connection
+		Open database connection.
+	countries : dict
+		Dict of {iso_code: standard country name} for the countries to summarize.
+
+	Returns
+	-------
+	Dict of {iso_code: dict holding the summarized metrics for the country}.
+
+	"""
+	fuel_list = make_fuel_thesaurus().keys()
+	any_fuel = '''(primary_fuel=? OR other_fuel1=? OR other_fuel2=? OR other_fuel3=?)'''
+	count_distinct_list = ['name', 'owner', 'source']
+	count_null_list = ['name', 'gppd_idnr',
+			'capacity_mw', 'year_of_capacity_data',
+			'owner', 'source', 'url', 'latitude', 'longitude']
+	count_list = ['generation_gwh_{0}'.format(year) for year in range(2013,2020)] + \
+			['generation_data_source', 'estimated_generation_gwh']
+
+	# each summary field with its SQL expression; fuel expressions take the fuel as parameters
+	columns = [
+		('count', 'COUNT(*)'),
+		('total_capacity_mw', 'SUM(capacity_mw)'),
+		('max_capacity_mw', 'MAX(capacity_mw)'),
+	]
+	parameters = []
+	for fuel in fuel_list:
+		fuel_column_name = '_'.join(fuel.lower().split())
+		columns.append(('count_fuel_{0}'.format(fuel_column_name),
+			'SUM(CASE WHEN {0} THEN 1 ELSE 0 END)'.format(any_fuel)))
+		columns.append(('capacity_mw_fuel_{0}'.format(fuel_column_name),
+			'SUM(CASE WHEN {0} THEN capacity_mw END)'.format(any_fuel)))
+		parameters.extend([fuel] * 8)
+	for field in count_distinct_list:
+		columns.append(('count_distinct_{0}'.format(field), 'COUNT(DISTINCT({0}))'.format(field)))
+	for field in count_null_list:
+		columns.append(('count_null_{0}'.format(field), 'SUM({0} IS NULL)'.format(field)))
+	columns.extend([
+		('count_null_fuel', '''SUM(primary_fuel IS NULL
+					AND other_fuel1 IS NULL
+					AND other_fuel2 IS NULL
+					AND other_fuel3 IS NULL)'''),
+		('count_wepp_id', 'COUNT(wepp_id)'),
+		('capacity_mw_wepp_id', 'SUM(CASE WHEN wepp_id IS NOT NULL THEN capacity_mw END)'),
+		('count_null_generation_gwh_all', '''SUM(generation_gwh_2015 IS NULL
+					AND generation_gwh_2016 IS NULL
+					AND generation_gwh_2017 IS NULL
+					AND generation_gwh_2018 IS NULL
+					AND generation_gwh_2019 IS NULL
+					AND estimated_generation_gwh IS NULL)'''),
+	])
+	for field in count_list:
+		columns.append(('count_{0}'.format(field), 'COUNT({0})'.format(field)))
+
+	c = db_conn.cursor()
+	stmt = '''SELECT country, {0} FROM powerplants
+				GROUP BY country'''.format(',\n\t\t\t\t\t'.join(expression for name, expression in columns))
+	rows = {}
+	for row in c.execute(stmt, parameters):
+		rows[row[0]] = dict(zip([name for name, expression in columns], row[1:]))
+
+	# count distinct fuel types
+	stmt = '''SELECT country, COUNT(*) FROM (
+				SELECT country, primary_fuel AS fuel from powerplants
+					WHERE (primary_fuel IS NOT NULL)
+				UNION
+				SELECT country, other_fuel1 from powerplants
+					WHERE (other_fuel1 IS NOT NULL)
+				UNION
+				SELECT country, other_fuel2 from powerplants
+					WHERE (other_fuel2 IS NOT NULL)
+				UNION
+				SELECT country, other_fuel3 from powerplants
+					WHERE (other_fuel3 IS NOT NULL)
+				) AS temp
+				GROUP BY country'''
+	distinct_fuels = dict(c.execute(stmt).fetchall())
+
+	summaries = {}
+	for iso_code, country in countries.iteritems():
+		summary = {'country': country, 'iso_code': iso_code}
+		summaries[iso_code] = summary
+		row = rows.get(iso_code)
+
+		# skip rest of summary if there aren't any powerplants
+		if row is None:
+			summary['count'] = 0
+			continue
+
+		for name, expression in columns:
+			if not name.startswith('capacity_mw_') and name != 'total_capacity_mw':
+				summary[name] = row[name]
+		summary['total_capacity_gw'] = row['total_capacity_mw'] / 1000
+		summary['count_distinct_fuel'] = distinct_fuels.get(iso_code, 0)
+		for fuel in fuel_list:
+			fuel_column_name = '_'.join(fuel.lower().split())
+			fuel_capacity_mw = row['capacity_mw_fuel_{0}'.format(fuel_column_name)]
+			summary_name = 'capacity_gw_fuel_{0}'.format(fuel_column_name)
+			if fuel_capacity_mw is None:
+				summary[summary_name] = 0
+			else:
+				summary[summary_name] = fuel_capacity_mw / 1000
+		if row['capacity_mw_wepp_id'] is None:
+			summary['capacity_gw_wepp_id'] = 0
+		else:
+			summary['capacity_gw_wepp_id'] = row['capacity_mw_wepp_id'] / 1000.
+
+	return summaries
+
+def write_country_summary(summaries, filename, iso_codes):
+	"""
+	Write country summaries into a CSV with SUMMARY_FIELDNAMES.
+
+	Parameters
+	----------
+	summaries : dict
+		Dict of {iso_code: dict of summarized metrics}, as returned by `summarize_countries()`.
+	filename : str
+		Filepath for the summary CSV.
+	iso_codes : sequence of str
+		Countries to write, a row each in this order.
+	"""
+	with open(filename, 'wb') as fout:
+		writer = csv.DictWriter(fout, fieldnames=SUMMARY_FIELDNAMES, lineterminator='\r\n')
+		writer.writeheader()
+		for iso_code in iso_codes:
+			writer.writerow(summaries[iso_code])
+
+
+### MULTI-SINK EXPORT ###
+
+class ExportBatch(object):
+	"""
+	A batch of plants formatted for export, handed to every sink.
+
+	Attributes
+	----------
+	fieldnames : list of str
+		Output columns.
+	columns : list of lists
+		Output CSV values, one list per field in `fieldnames`.
+	values : list of lists
+		Values read back from the output CSV (as stored in SQLite), one list
+		per field in CSV_FIELDNAMES; converted on first use.
+	"""
+	def __init__(self, fieldnames, columns, memos):
+		self.fieldnames = fieldnames
+		self.columns = columns
+		self._memos = memos
+		self._values = None
+
+	def column(self, field):
+		"""Output CSV values of a field."""
+		return self.columns[self.fieldnames.index(field)]
+
+	@property
+	def values(self):
+		if self._values is None:
+			values = []
+			for memo, field in izip(self._memos, CSV_FIELDNAMES):
+				column = self.column(field)
+				if len(memo) > memo.MAX_SIZE:
+					memo.clear()
+				values.append(map(memo.__getitem__, izip(map(type, column), column)))
+			_pair_coordinates(values[CSV_FIELDNAMES.index('latitude')], values[CSV_FIELDNAMES.index('longitude')])
+			self._values = values
+		return self._values
+
+class CSVSink(object):
+	"""Export sink writing the output CSV (see `write_csv_file()`)."""
+	def __init__(self, filename, compress=False):
+		self.filename = filename
+		self.compress = compress
+
+	def open(self, fieldnames):
+		open_output = gzip.open if self.compress else open
+		self.fout = open_output(self.filename, 'wb')
+		self.writer = csv.writer(self.fout, lineterminator='\r\n')
+		self.writer.writerow(fieldnames)
+
+	def write(self, batch):
+		self.writer.writerows(izip(*batch.columns))
+
+	def close(self):
+		self.fout.close()
+
+class SQLiteSink(object):
+	"""
+	Export sink loading the powerplants table of a new SQLite database (see `write_sqlite_database()`).
+
+	The rows are kept until closing and then inserted in the order of
+	`_sqlite_load_order()`, as `copy_csv_to_sqlite()` inserts the output CSV.
+
+	Attributes
+	----------
+	conn : sqlite3.Connection
+		Connection to the database after closing, if `keep_connection` is True.
+	count : int
+		Number of rows inserted.
+	"""
+	def __init__(self, filename, spatial_index=False, keep_connection=False):
+		self.filename = filename
+		self.spatial_index = spatial_index
+		self.keep_connection = keep_connection
+		self.conn = None
+		self.count = 0
+
+	def open(self, fieldnames):
+		self.conn = _create_sqlite_database(self.filename)
+		self._idnr_column = list(fieldnames).index('gppd_idnr')
+		self._rows = []
+
+	def write(self, batch):
+		self._rows.extend(izip(*batch.values))
+
+	def close(self):
+		rows, self._rows = self._rows, None
+		ordered = (rows[i] for i in _sqlite_load_order(row[self._idnr_column] for row in rows))
+		batches = iter(lambda: list(islice(ordered, SQLITE_BATCH_SIZE)), [])
+		self.count = _load_powerplants_table(self.conn, batches, self.spatial_index)
+		if not self.keep_connection:
+			self.conn.close()
+			self.conn = None
+
+class CountrySummarySink(object):
+	"""
+	Export sink summarizing the exported plants by country with `summarize_countries()`.
+
+	The summary is computed on the powerplants table of an SQLite database
+	holding the exported rows in the order `copy_csv_to_sqlite()` loads the
+	output CSV, so it is identical to the one utils/database_country_summary.py
+	makes from the output CSV.
+
+	Attributes
+	----------
+	summaries : dict
+		After closing, dict of {iso_code: dict of summarized metrics}, as
+		returned by `summarize_countries()`.
+	"""
+	def __init__(self, filename=None, countries=None, database=None):
+		"""
+		Parameters
+		----------
+		filename : str, optional
+			Summary CSV to write on closing, with a row per country in order of country name.
+		countries : dict, optional
+			Dict of {iso_code: standard country name} to summarize (default all countries).
+		database : SQLiteSink, optional
+			Sink of the same export, listed before this one, whose connection
+			is kept (`keep_connection=True`); the summary is run on its table.
+			By default the rows are loaded into an in-memory database.
+		"""
+		if database is not None and not database.keep_connection:
+			raise ValueError('CountrySummarySink needs an SQLiteSink with keep_connection=True')
+		self.filename = filename
+		self.countries = countries
+		self.database = database
+		self._own_database = database is None
+		self.summaries = None
+
+	def open(self, fieldnames):
+		if self.countries is None:
+			self.countries = {v.iso_code: k for k, v in make_country_dictionary().iteritems()}
+		if self._own_database:
+			self.database = SQLiteSink(':memory:', keep_connection=True)
+			self.database.open(fieldnames)
+
+	def write(self, batch):
+		if self._own_database:
+			self.database.write(batch)
+
+	def close(self):
+		if self._own_database:
+			self.database.close()
+		self.summaries = summarize_countries(self.database.conn, self.countries)
+		if self._own_database:
+			self.database.conn.close()
+			self.database = None
+		if self.filename:
+			write_country_summary(self.summaries, self.filename, sorted(self.countries, key=self.countries.get))
+
+def export_database(plants_dictionary, sinks, fieldnames=CSV_FIELDNAMES, errors=None, batch_size=CSV_BATCH_SIZE):
+	"""
+	Format plants once, in output CSV order, and hand each batch to several export sinks.
+
+	A sink has `open(fieldnames)`, `write(batch)` (with an ExportBatch) and
+	`close()` methods; see CSVSink, SQLiteSink, CountrySummarySink, ColumnarSink
+	and ShardSink.
+
+	Parameters
+	----------
+	plants_dictionary : dict or PlantTable
+		Dict of {'gppd_idnr': PowerPlant}, or a PlantTable, to export.
+	sinks : list
+		Export sinks, opened and closed in order.
+	fieldnames : sequence of str, optional
+		Output columns, including all of CSV_FIELDNAMES; other columns (such as 'in_pw') are left empty.
+	errors : list, optional
+		If given, `(idnr, exception)` is appended for each plant that can't be
+		formatted; otherwise these plants are reported on stdout.
+	batch_size : int, optional
+		Number of plants formatted together.
+
+	Returns
+	-------
+	count : int
+		Number of plants exported.
+	"""
+	report_errors = errors is None
+	if report_errors:
+		errors = []
+
+	fieldnames = list(fieldnames)
+	# converted values are memoized by (type, value) so that e.g. 2017 and 2017.0 stay distinct
+	memos = [_ConvertedValues(_cell_converter(column)) for column in CSV_FIELDNAMES]
+	for sink in sinks:
+		sink.open(fieldnames)
+	count = 0
+	for columns in _iter_csv_batches(plants_dictionary, fieldnames, None, errors, batch_size):
+		batch = ExportBatch(fieldnames, columns, memos)
+		for sink in sinks:
+			sink.write(batch)
+		count += len(columns[0]) if columns else 0
+	for sink in sinks:
+		sink.close()
+
+	if report_errors:
+		for idnr, e in errors:
+			print(u"Error with plant {0}".format(_get_plant(plants_dictionary, idnr).idnr))
+	return count
+
+
+### SPATIAL QUERIES ###
+
+# R*Tree virtual table over plant coordinates; its id is the rowid of the plant in powerplants.
+SPATIAL_INDEX_TABLE = 'powerplants_rtree'
+EARTH_RADIUS_KM = 6371.0088  # mean radius
+# First search radius for nearest-plant queries; doubled until enough plants are found.
+NEAREST_START_RADIUS_KM = 50.0
+
+def create_spatial_index(conn):
+	"""
+	Build an R*Tree index over the coordinates of the plants in the powerplants table.
+
+	Plants without both latitude and longitude are left out. R*Tree stores
+	bounds as 32-bit floats (rounded outwards), so queries check candidates
+	against the exact coordinates in the powerplants table.
+
+	Parameters
+	----------
+	conn : sqlite3.Connection
+		Connection to a database with a loaded powerplants table.
+	"""
+	c = conn.cursor()
+	c.execute('''CREATE VIRTUAL TABLE {0} USING rtree(
+					id, min_latitude, max_latitude, min_longitude, max_longitude)'''.format(SPATIAL_INDEX_TABLE))
+	c.execute('''INSERT INTO {0}
+					SELECT rowid, latitude, latitude, longitude, longitude FROM powerplants
+					WHERE latitude IS NOT NULL AND longitude IS NOT NULL'''.format(SPATIAL_INDEX_TABLE))
+	conn.commit()
+
+def has_spatial_index(conn):
+	"""Whether the database has the R*Tree index built by `create_spatial_index()`."""
+	stmt = '''SELECT 1 FROM sqlite_master WHERE name = ?'''
+	return conn.execute(stmt, (SPATIAL_INDEX_TABLE,)).fetchone() is not None
+
+def haversine_km(latitude1, longitude1, latitude2, longitude2):
+	"""Great-circle distance in km between two points given in degrees."""
+	phi1 = math.radians(latitude1)
+	phi2 = math.radians(latitude2)
+	a = math.sin((phi2 - phi1) / 2) ** 2 + \
+		math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(longitude2 - longitude1) / 2) ** 2
+	return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def _select_columns(columns):
+	"""SQL column list for the powerplants table (aliased p); only known columns are accepted."""
+	if columns is None:
+		columns = CSV_FIELDNAMES
+	unknown = [column for column in columns if column not in CSV_FIELDNAMES]
+	if unknown:
+		raise ValueError('powerplants has no column(s) {0}'.format(', '.join(unknown)))
+	return ', '.join('p.' + column for column in columns)
+
+def _query_boxes(conn, boxes, select, use_index):
+	"""Rows with coordinates inside any of the (min_lat, max_lat, min_lon, max_lon) boxes."""
+	if use_index and has_spatial_index(conn):
+		stmt = '''SELECT {0} FROM {1} AS r JOIN powerplants AS p ON p.rowid = r.id
+					WHERE r.max_latitude >= ? AND r.min_latitude <= ?
+					AND r.max_longitude >= ? AND r.min_longitude <= ?
+					AND p.latitude BETWEEN ? AND ? AND p.longitude BETWEEN ? AND ?'''.format(select, SPATIAL_INDEX_TABLE)
+		arguments = lambda box: box + box
+	else:
+		stmt = '''SELECT {0} FROM powerplants AS p
+					WHERE p.latitude BETWEEN ? AND ? AND p.longitude BETWEEN ? AND ?'''.format(select)
+		arguments = lambda box: box
+	rows = []
+	for box in boxes:
+		rows.extend(conn.execute(stmt, arguments(box)).fetchall())
+	return rows
+
+def _longitude_ranges(min_longitude, max_longitude):
+	"""Split a longitude range crossing the antimeridian into ranges within [-180, 180]."""
+	if min_longitude <= -180 and max_longitude >= 180:
+		return [(-180.0, 180.0)]
+	if min_longitude < -180:
+		return [(min_longitude + 360, 180.0), (-180.0, max_longitude)]
+	if max_longitude > 180:
+		return [(min_longitude, 180.0), (-180.0, max_longitude - 360)]
+	if min_longitude > max_longitude:
+		return [(min_longitude, 180.0), (-180.0, max_longitude)]
+	return [(min_longitude, max_longitude)]
+
+def query_bbox(conn, min_latitude, min_longitude, max_latitude, max_longitude, columns=None, use_index=True):
+	"""
+	Find the plants inside a latitude/longitude bounding box.
+
+	Parameters
+	----------
+	conn : sqlite3.Connection
+		Connection to a database written by `write_sqlite_file()` or `write_sqlite_database()`.
+	min_latitude, min_longitude, max_latitude, max_longitude : float
+		Box bounds in degrees (inclusive). A box with `min_longitude` greater
+		than `max_longitude` crosses the antimeridian.
+	columns : list of str, optional
+		Columns to return (default all).
+	use_index : bool (default True)
+		Whether to use the R*Tree index when the database has one; otherwise scan the table.
+
+	Returns
+	-------
+	rows : list of tuple
+		Values of `columns` for each plant in the box.
+	"""
+	select = _select_columns(columns)
+	boxes = [(min_latitude, max_latitude, low, high) for low, high in _longitude_ranges(min_longitude, max_longitude)]
+	return _query_boxes(conn, boxes, select, use_index)
+
+def query_radius(conn, latitude, longitude, radius_km, columns=None, use_index=True):
+	"""
+	Find the plants within a great-circle distance of a point.
+
+	Candidates are taken from the bounding box of the circle and kept if
+	their haversine distance is within `radius_km`.
+
+	Parameters
+	----------
+	conn : sqlite3.Connection
+		Connection to a database written by `write_sqlite_file()` or `write_sqlite_database()`.
+	latitude, longitude : float
+		Center point in degrees.
+	radius_km : float
+		Search radius in km.
+	columns : list of str, optional
+		Columns to return (default all).
+	use_index : bool (default True)
+		Whether to use the R*Tree index when the database has one; otherwise scan the table.
+
+	Returns
+	-------
+	results : list of (float, tuple)
+		Distance in km and values of `columns` for each plant found, nearest first.
+	"""
+	select = _select_columns(columns) + ', p.latitude, p.longitude'
+	angle = radius_km / EARTH_RADIUS_KM
+	delta_latitude = math.degrees(angle)
+	min_latitude = max(latitude - delta_latitude, -90.0)
+	max_latitude = min(latitude + delta_latitude, 90.0)
+	if min_latitude == -90.0 or max_latitude == 90.0 or angle >= math.pi / 2:
+		# the circle reaches a pole: all longitudes
+		longitude_ranges = [(-180.0, 180.0)]
+	else:
+		delta_longitude = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(latitude))))
+		longitude_ranges = _longitude_ranges(longitude - delta_longitude, longitude + delta_longitude)
+	boxes = [(min_latitude, max_latitude, low, high) for low, high in longitude_ranges]
+
+	results = []
+	for row in _query_boxes(conn, boxes, select, use_index):
+		distance = haversine_km(latitude, longitude, row[-2], row[-1])
+		if distance <= radius_km:
+			results.append((distance, row[:-2]))
+	results.sort(key=lambda result: result[0])
+	return results
+
+def query_nearest(conn, latitude, longitude, k, columns=None, use_index=True):
+	"""
+	Find the k plants nearest to a point.
+
+	With the R*Tree index, radius queries starting at NEAREST_START_RADIUS_KM
+	are repeated with a doubled radius until at least k plants are found;
+	without it, distances to all plants are computed in one scan.
+
+	Parameters
+	----------
+	conn : sqlite3.Connection
+		Connection to a database written by `write_sqlite_file()` or `write_sqlite_database()`.
+	latitude, longitude : float
+		Center point in degrees.
+	k : int
+		Number of plants to return.
+	columns : list of str, optional
+		Columns to return (default all).
+	use_index : bool (default True)
+		Whether to use the R*Tree index when the database has one; otherwise scan the table.
+
+	Returns
+	-------
+	results : list of (float, tuple)
+		Distance in km and values of `columns` for the nearest plants, nearest first.
+	"""
+	max_radius_km = math.pi * EARTH_RADIUS_KM
+	radius_km = NEAREST_START_RADIUS_KM
+	if not (use_index and has_spatial_index(conn)):
+		radius_km = max_radius_km
+	while True:
+		results = query_radius(conn, latitude, longitude, radius_km, columns, use_index)
+		if len(results) >= k or radius_km >= max_radius_km:
+			return results[:k]
+		radius_km = min(2 * radius_km, max_radius_km)
+
+
+### COLUMNAR PLANT TABLE ###
+
+# Marks an attribute that a plant does not have (e.g. in databases pickled with an older schema).
+_ABSENT = object()
+
+def _plant_state(obj):
+	"""Get the attribute dict of a regular or compact (slotted) object."""
+	try:
+		return obj.__dict__
+	except AttributeError:
+		return obj.__getstate__()
+
+def _restore_object(cls, state):
+	"""Create an instance of `cls` from an attribute dict, without calling __init__."""
+	obj = cls.__new__(cls)
+	if hasattr(obj, '__setstate__'):
+		obj.__setstate__(state)
+	else:
+		obj.__dict__.update(state)
+	return obj
+
+class PlantTable(object):
+	"""
+	Columnar store of power plants, as an alternative to a dict of PowerPlant objects.
+
+	Each attribute is held in one NumPy array with a row per plant: numeric
+	attributes as float64 (NaN for no data), low-cardinality strings as integer
+	codes into a list of categories, and other strings and objects (fuel sets,
+	generation lists) as object arrays. Values that don't fit their column
+	(e.g. a capacity stored as a string) and attributes outside the PowerPlant
+	schema are kept per row in `extra`, so conversion to and from a plant
+	dictionary is lossless.
+
+	Attributes
+	----------
+	keys : numpy.ndarray
+		Dictionary key (gppd_idnr) of each row.
+	index : dict
+		Dict of {'gppd_idnr': row number}.
+	numeric : dict of {str: numpy.ndarray}
+		Float64 column for each attribute in `NUMERIC_COLUMNS`.
+	integer : dict of {str: numpy.ndarray}
+		Boolean column for each numeric attribute; True where the value was an int.
+	codes : dict of {str: numpy.ndarray}
+		Int32 category code column for each attribute in `CATEGORICAL_COLUMNS`.
+	categories : dict of {str: list}
+		Category values for each attribute in `CATEGORICAL_COLUMNS`.
+	objects : dict of {str: numpy.ndarray}
+		Object column for each attribute in `OBJECT_COLUMNS`.
+	extra : dict of {int: dict}
+		Per-row attribute values that are not represented in the columns.
+	"""
+
+	# plant attributes held as float64 columns; latitude/longitude come from plant.location
+	NUMERIC_COLUMNS = ('capacity', 'cap_year', 'commissioning_year',
+		'estimated_generation_gwh', 'latitude', 'longitude')
+	# plant attributes held as category codes
+	CATEGORICAL_COLUMNS = ('country', 'primary_fuel', 'source', 'url', 'coord_source')
+	# plant attributes held as object arrays; location_description comes from plant.location
+	OBJECT_COLUMNS = ('idnr', 'name', 'owner', 'nat_lang', 'wepp_id',
+		'location_description', 'other_fuel', 'generation')
+	LOCATION_COLUMNS = {'latitude': 'latitude', 'longitude': 'longitude',
+		'location_description': 'description'}
+
+	def __init__(self, keys, numeric, integer, codes, categories, objects, extra=None):
+		self.keys = np.asarray(keys, dtype=object)
+		self.index = {k: i for i, k in enumerate(self.keys)}
+		self.numeric = numeric
+		self.integer = integer
+		self.codes = codes
+		self.categories = categories
+		self.objects = objects
+		self.extra = extra if extra is not None else {}
+
+	def __len__(self):
+		return len(self.keys)
+
+	def __contains__(self, key):
+		return key in self.index
+
+	def __repr__(self):
+		return 'PlantTable: {0} plants'.format(len(self))
+
+	@classmethod
+	def from_plants(cls, plants_dictionary):
+		"""
+		Build a table from a plant dictionary.
+
+		Parameters
+		----------
+		plants_dictionary : dict
+			Dict of {'gppd_idnr': PowerPlant} (or CompactPowerPlant).
+
+		Returns
+		-------
+		PlantTable with rows in the iteration order of `plants_dictionary`.
+		"""
+		keys = list(plants_dictionary.keys())
+		n = len(keys)
+		numeric = {c: np.empty(n, dtype=np.float64) for c in cls.NUMERIC_COLUMNS}
+		integer = {c: np.zeros(n, dtype=bool) for c in cls.NUMERIC_COLUMNS}
+		codes = {c: np.empty(n, dtype=np.int32) for c in cls.CATEGORICAL_COLUMNS}
+		lookups = {c: {} for c in cls.CATEGORICAL_COLUMNS}
+		objects = {c: np.empty(n, dtype=object) for c in cls.OBJECT_COLUMNS}
+		extra = {}
+
+		def _set_numeric(row, column, value, attribute, raw):
+			if value is None:
+				numeric[column][row] = np.nan
+			elif type(value) in (int, long, float):
+				numeric[column][row] = value
+				integer[column][row] = type(value) is not float
+			else:
+				numeric[column][row] = np.nan
+				extra.setdefault(row, {})[attribute] = raw
+
+		for row, key in enumerate(keys):
+			state = _plant_state(plants_dictionary[key])
+			for attribute, value in state.iteritems():
+				if attribute not in PLANT_ATTRIBUTES:
+					extra.setdefault(row, {})[attribute] = value
+			for column in cls.NUMERIC_COLUMNS:
+				if column in cls.LOCATION_COLUMNS:
+					continue
+				value = state.get(column, _ABSENT)
+				_set_numeric(row, column, value if value is not _ABSENT else None, column, value)
+			for column in cls.CATEGORICAL_COLUMNS:
+				value = state.get(column, _ABSENT)
+				if value is _ABSENT:
+					extra.setdefault(row, {})[column] = _ABSENT
+					value = NO_DATA_UNICODE
+				lookup = lookups[column]
+				try:
+					codes[column][row] = lookup.setdefault(value, len(lookup))
+				except TypeError:  # unhashable value
+					extra.setdefault(row, {})[column] = value
+					codes[column][row] = lookup.setdefault(NO_DATA_UNICODE, len(lookup))
+			for column in cls.OBJECT_COLUMNS:
+				if column in cls.LOCATION_COLUMNS:
+					continue
+				value = state.get(column, _ABSENT)
+				if value is _ABSENT:
+					extra.setdefault(row, {})[column] = _ABSENT
+					value = None
+				objects[column][row] = value
+			location = state.get('location', _ABSENT)
+			if type(location) in (LocationObject, CompactLocationObject):
+				location_state = _plant_state(location)
+				for column, attribute in cls.LOCATION_COLUMNS.iteritems():
+					value = location_state.get(attribute)
+					if column in cls.OBJECT_COLUMNS:
+						objects[column][row] = value
+					elif value is None or type(value) in (int, long, float):
+						_set_numeric(row, column, value, column, value)
+					else:  # keep the whole location object if coordinates aren't numeric
+						numeric[column][row] = np.nan
+						extra.setdefault(row, {})['location'] = location
+			else:
+				numeric['latitude'][row] = numeric['longitude'][row] = np.nan
+				extra.setdefault(row, {})['location'] = location
+
+		categories = {}
+		for column, lookup in lookups.iteritems():
+			categories[column] = [None] * len(lookup)
+			for value, code in lookup.iteritems():
+				categories[column][code] = value
+		return cls(keys, numeric, integer, codes, categories, objects, extra)
+
+	def _numeric_values(self, column):
+		"""Get a numeric column as a list of Python int/float/None values."""
+		values = self.numeric[column].tolist()
+		for row in np.flatnonzero(self.integer[column]).tolist():
+			values[row] = int(values[row])
+		for row in np.flatnonzero(np.isnan(self.numeric[column])).tolist():
+			values[row] = None
+		return values
+
+	def _column_lists(self):
+		"""Get every column as a list of Python values."""
+		lists = {c: self._numeric_values(c) for c in self.NUMERIC_COLUMNS}
+		for c in self.CATEGORICAL_COLUMNS:
+			lists[c] = [self.categories[c][code] for code in self.codes[c].tolist()]
+		for c in self.OBJECT_COLUMNS:
+			lists[c] = self.objects[c].tolist()
+		return lists
+
+	def _row_plant(self, row, lists, plant_class=PowerPlant, lists_row=None):
+		"""Rebuild the plant object of a row from the column lists (indexed by `lists_row`, default `row`)."""
+		if lists_row is None:
+			lists_row = row
+		state = {}
+		location_state = {}
+		for column, values in lists.iteritems():
+			if column in self.LOCATION_COLUMNS:
+				location_state[self.LOCATION_COLUMNS[column]] = values[lists_row]
+			else:
+				state[column] = values[lists_row]
+		if type(state['other_fuel']) is set:
+			state['other_fuel'] = set(state['other_fuel'])
+		if type(state['generation']) is list:
+			state['generation'] = list(state['generation'])
+		for attribute, value in self.extra.get(row, {}).iteritems():
+			if value is _ABSENT:
+				del state[attribute]
+			else:
+				state[attribute] = value
+		if 'location' not in state:
+			if plant_class is CompactPowerPlant:
+				state['location'] = _restore_object(CompactLocationObject, location_state)
+			else:
+				state['location'] = _restore_object(LocationObject, location_state)
+		return _restore_object(plant_class, state)
+
+	def plant(self, key, plant_class=PowerPlant):
+		"""Get a single plant by its gppd_idnr."""
+		row = self.index[key]
+		lists = {}
+		for c in self.NUMERIC_COLUMNS:
+			value = self.numeric[c][row].item()
+			lists[c] = [None if value != value else (int(value) if self.integer[c][row] else value)]
+		for c in self.CATEGORICAL_COLUMNS:
+			lists[c] = [self.categories[c][self.codes[c][row]]]
+		for c in self.OBJECT_COLUMNS:
+			lists[c] = [self.objects[c][row]]
+		return self._row_plant(row, lists, plant_class, lists_row=0)
+
+	def iter_plants(self, plant_class=PowerPlant):
+		"""
+		Rebuild the plant objects of the table.
+
+		Parameters
+		----------
+		plant_class : class, optional
+			PowerPlant (default) or CompactPowerPlant.
+
+		Returns
+		-------
+		Generator of ('gppd_idnr', plant_class) pairs, in table row order.
+		"""
+		lists = self._column_lists()
+		for row, key in enumerate(self.keys.tolist()):
+			yield key, self._row_plant(row, lists, plant_class)
+
+	def to_plants(self, plant_class=PowerPlant):
+		"""
+		Convert the table back to a plant dictionary.
+
+		Parameters
+		----------
+		plant_class : class, optional
+			PowerPlant (default) or CompactPowerPlant.
+
+		Returns
+		-------
+		Dict of {'gppd_idnr': plant_class}; use `iter_plants()` for table row order.
+		"""
+		return dict(self.iter_plants(plant_class))
+
+	def column(self, name):
+		"""
+		Get the values of a column as an array.
+
+		Categorical columns are decoded to an object array of category values.
+		"""
+		if name in self.numeric:
+			return self.numeric[name]
+		if name in self.codes:
+			return np.array(self.categories[name] + [None], dtype=object)[:-1][self.codes[name]]
+		return self.objects[name]
+
+	def category_code(self, name, value):
+		"""Get the code of `value` in categorical column `name`, or -1 if not present."""
+		try:
+			return self.categories[name].index(value)
+		except ValueError:
+			return -1
+
+	def group_index(self, columns):
+		"""
+		Group rows by the combination of values in categorical columns.
+
+		Parameters
+		----------
+		columns : list of str
+			Categorical column names.
+
+		Returns
+		-------
+		groups : numpy.ndarray
+			Group number of each row.
+		group_keys : list of tuple
+			Tuple of category values for each group number.
+		"""
+		combined = np.zeros(len(self), dtype=np.int64)
+		for column in columns:
+			combined = combined * len(self.categories[column]) + self.codes[column]
+		unique_combined, groups = np.unique(combined, return_inverse=True)
+		group_keys = []
+		for value in unique_combined.tolist():
+			key = []
+			for column in reversed(columns):
+				n_categories = len(self.categories[column])
+				key.append(self.categories[column][value % n_categories])
+				value //= n_categories
+			group_keys.append(tuple(reversed(key)))
+		return groups, group_keys
+
+	def group_sum(self, values, columns, where=None):
+		"""
+		Sum values over groups of rows sharing the same categorical values.
+
+		Parameters
+		----------
+		values : numpy.ndarray
+			Value for each row.
+		columns : list of str
+			Categorical column names to group by.
+		where : numpy.ndarray of bool, optional
+			Only include these rows in the sums.
+
+		Returns
+		-------
+		groups : numpy.ndarray
+			Group number of each row; `totals[groups]` broadcasts totals back to rows.
+		totals : numpy.ndarray
+			Sum of `values` for each group.
+		group_keys : list of tuple
+			Tuple of category values for each group number.
+		"""
+		groups, group_keys = self.group_index(columns)
+		if where is None:
+			where = np.ones(len(self), dtype=bool)
+		totals = np.bincount(groups[where], weights=values[where], minlength=len(group_keys))
+		return groups, totals, group_keys
+
+	def annual_generation(self, year):
+		"""Get the reported generation (GWh) of each plant in `year`, NaN where not available."""
+		gwh = np.full(len(self), np.nan)
+		for row, generation in enumerate(self.objects['generation'].tolist()):
+			if generation:
+				value = annual_generation(generation, year)
+				if value is not None:
+					gwh[row] = value
+		return gwh
+
+
+### DATABASE DIFF ###
+
+# Column types for reporting changed values; generation is compared as numbers.
+DIFF_COLUMN_TYPES = dict(CSV_COLUMN_TYPES)
+DIFF_COLUMN_TYPES.update((field, 'float') for field in CSV_FIELDNAMES if 'generation_gwh' in field)
+
+def _database_rows(source):
+	"""
+	Header and rows of CSV text cells for an output CSV file, a PlantTable or a plant dict.
+
+	Returns
+	-------
+	header : list of str
+		Column names.
+	rows : generator of list of str
+		Rows in output CSV order.
+	"""
+	if isinstance(source, basestring):
+		fin = open(source, 'rbU')
+		reader = csv.reader(fin)
+		header = next(reader)
+		def _rows():
+			with fin:
+				for row in reader:
+					if row:
+						yield row
+		return header, _rows()
+	rows = ([_csv_cell_text(value) for value in row] for row in iter_csv_rows(source, errors=[]))
+	return list(CSV_FIELDNAMES), rows
+
+def diff_databases(old, new):
+	"""
+	Compare two builds of the database plant by plant (by gppd_idnr).
+
+	Each row is reduced to a hash of the columns both builds have, so only
+	hashes (and the new rows of changed plants) are held in memory. The old
+	build is read a second time to get the old values of changed plants.
+
+	Parameters
+	----------
+	old, new : str, PlantTable or dict
+		Output CSV file, PlantTable or dict of {'gppd_idnr': PowerPlant} for each build.
+		Plant dicts and tables are formatted as in the output CSV.
+
+	Returns
+	-------
+	diff : dict
+		'fields': columns compared;
+		'added': gppd_idnr of plants only in `new`, in `new` order;
+		'removed': gppd_idnr of plants only in `old`, in `old` order;
+		'changed': dict of {gppd_idnr: {field: (old value, new value)}} for the
+		fields that differ, with values converted according to DIFF_COLUMN_TYPES;
+		'unchanged': number of plants with the same values in both builds.
+	"""
+	old_header, old_rows = _database_rows(old)
+	new_header, new_rows = _database_rows(new)
+	fields = [field for field in old_header if field in new_header]
+	old_cells = operator.itemgetter(*[old_header.index(field) for field in fields])
+	new_cells = operator.itemgetter(*[new_header.index(field) for field in fields])
+	old_id = old_header.index('gppd_idnr')
+	new_id = new_header.index('gppd_idnr')
+
+	old_digests = {}
+	old_order = []
+	for row in old_rows:
+		old_digests[row[old_id]] = hashlib.md5('\x1f'.join(old_cells(row))).digest()
+		old_order.append(row[old_id])
+
+	added = []
+	changed_rows = {}
+	seen = set()
+	for row in new_rows:
+		idnr = row[new_id]
+		seen.add(idnr)
+		digest = old_digests.get(idnr)
+		if digest is None:
+			added.append(idnr)
+		elif digest != hashlib.md5('\x1f'.join(new_cells(row))).digest():
+			changed_rows[idnr] = new_cells(row)
+	removed = [idnr for idnr in old_order if idnr not in seen]
+	unchanged = len(seen) - len(added) - len(changed_rows)
+	del old_digests, old_order, seen
+
+	converters = [_CSV_CONVERTERS[DIFF_COLUMN_TYPES.get(field, 'text')] for field in fields]
+	changed = {}
+	if changed_rows:
+		old_header, old_rows = _database_rows(old)
+		for row in old_rows:
+			new_values = changed_rows.get(row[old_id])
+			if new_values is None:
+				continue
+			deltas = {}
+			for field, convert, old_value, new_value in izip(fields, converters, old_cells(row), new_values):
+				if old_value != new_value:
+					deltas[field] = (convert(old_value), convert(new_value))
+			changed[row[old_id]] = deltas
+
+	return {'fields': fields, 'added': added, 'removed': removed, 'changed': changed, 'unchanged': unchanged}
+
+
+### COLUMNAR FILE ###
+
+# Columnar database files are uncompressed NumPy .npz archives with one or more
+# typed arrays per output CSV column, so that columns can be read independently.
+COLUMNAR_FILE_VERSION = 1
+_COLUMNAR_SCHEMA = '__schema__'
+
+# Storage of each output CSV column in a columnar file: 'float64', 'float32',
+# 'category' (dictionary-encoded) or 'text' (the default for other columns).
+# Values are stored as read back from the output CSV, with generation as numbers.
+COLUMNAR_COLUMN_TYPES = {
+	'country': 'category',
+	'country_long': 'category',
+	'capacity_mw': 'float64',
+	'latitude': 'float64',
+	'longitude': 'float64',
+	'primary_fuel': 'category',
+	'other_fuel1': 'category',
+	'other_fuel2': 'category',
+	'other_fuel3': 'category',
+	'commissioning_year': 'float64',
+	'source': 'category',
+	'url': 'category',
+	'geolocation_source': 'category',
+	'year_of_capacity_data': 'float32',
+	'generation_data_source': 'category',
+	'estimated_generation_gwh': 'float64',
+}
+COLUMNAR_COLUMN_TYPES.update(('generation_gwh_{0}'.format(year), 'float64') for year in CSV_GENERATION_YEARS)
+
+def _columnar_converter_types():
+	"""Converter type (as in CSV_COLUMN_TYPES) of each column written to a columnar file."""
+	types = dict(CSV_COLUMN_TYPES)
+	types.update((column, 'float') for column, kind in COLUMNAR_COLUMN_TYPES.iteritems() if kind.startswith('float'))
+	return types
+
+def _encode_text(values):
+	"""Concatenated UTF-8 bytes and int64 offsets (one more than values) for a list of unicode strings."""
+	encoded = [value.encode(UNICODE_ENCODING) for value in values]
+	offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+	np.cumsum([len(value) for value in encoded], out=offsets[1:])
+	return np.frombuffer(''.join(encoded), dtype=np.uint8), offsets
+
+def _decode_text(data, offsets):
+	"""List of unicode strings from `_encode_text()` output."""
+	text = data.tostring()
+	bounds = offsets.tolist()
+	return [text[start:end].decode(UNICODE_ENCODING) for start, end in izip(bounds[:-1], bounds[1:])]
+
+def _category_code_dtype(count):
+	"""Smallest signed integer type holding codes 0..count-1."""
+	for dtype in (np.int8, np.int16, np.int32):
+		if count <= np.iinfo(dtype).max + 1:
+			return dtype
+	return np.int64
+
+def _columnar_arrays(kind, values):
+	"""Arrays stored for one column of converted values (None or u'' for no data)."""
+	valid = np.array([value is not None and value != NO_DATA_UNICODE for value in values], dtype=bool)
+	arrays = {'valid': np.packbits(valid)}
+	if kind in ('float64', 'float32'):
+		arrays['values'] = np.array([np.nan if value is None else value for value in values], dtype=kind)
+	elif kind == 'category':
+		codes = {}
+		for value in values:
+			if value and value not in codes:
+				codes[value] = len(codes)
+		categories = sorted(codes, key=codes.get)
+		arrays['codes'] = np.array([codes.get(value, 0) for value in values],
+			dtype=_category_code_dtype(len(categories)))
+		arrays['category_text'], arrays['category_offsets'] = _encode_text(categories)
+	else:
+		arrays['text'], arrays['offsets'] = _encode_text([value or NO_DATA_UNICODE for value in values])
+	return arrays
+
+def _write_columnar_values(columns, values, filename):
+	"""
+	Write lists of converted values (see `_columnar_converter_types()`) to a columnar file.
+
+	Returns
+	-------
+	count : int
+		Number of rows written.
+	"""
+	if 'latitude' in columns and 'longitude' in columns:
+		_pair_coordinates(values[columns.index('latitude')], values[columns.index('longitude')])
+	schema = {'version': COLUMNAR_FILE_VERSION, 'rows': len(values[0]), 'columns': []}
+	arrays = {}
+	for column, column_values in izip(columns, values):
+		kind = COLUMNAR_COLUMN_TYPES.get(column, 'text')
+		schema['columns'].append([column, kind])
+		for part, array in _columnar_arrays(kind, column_values).iteritems():
+			arrays['{0}.{1}'.format(column, part)] = array
+	arrays[_COLUMNAR_SCHEMA] = np.frombuffer(json.dumps(schema), dtype=np.uint8)
+	with open(filename, 'wb') as fout:
+		np.savez(fout, **arrays)
+	return schema['rows']
+
+class ColumnarSink(object):
+	"""
+	Export sink writing a typed columnar file (see `write_columnar_file()`).
+
+	Attributes
+	----------
+	count : int
+		Number of rows written, after closing.
+	"""
+	def __init__(self, filename):
+		self.filename = filename
+		self.count = 0
+
+	def open(self, fieldnames):
+		converter_types = _columnar_converter_types()
+		self._memos = [_ConvertedValues(_cell_converter(column, converter_types)) for column in CSV_FIELDNAMES]
+		self._values = [[] for column in CSV_FIELDNAMES]
+
+	def write(self, batch):
+		for memo, field, result in izip(self._memos, CSV_FIELDNAMES, self._values):
+			if len(memo) > memo.MAX_SIZE:
+				memo.clear()
+			column = batch.column(field)
+			result.extend(map(memo.__getitem__, izip(map(type, column), column)))
+
+	def close(self):
+		del self._memos
+		self.count = _write_columnar_values(CSV_FIELDNAMES, self._values, self.filename)
+		del self._values
+
+def write_columnar_file(plants, filename, errors=None, batch_size=CSV_BATCH_SIZE):
+	"""
+	Write plants to a typed columnar file, in output CSV order.
+
+	Country, fuel and source columns are dictionary-encoded (integer codes and
+	a table of distinct values), numeric columns are stored as float64 or
+	float32 arrays (see COLUMNAR_COLUMN_TYPES), other text as UTF-8 bytes with
+	offsets, and every column has a bitmap of rows with data.
+	Read the file with `read_columnar_file()`.
+
+	Parameters
+	----------
+	plants : dict or PlantTable
+		Dict of {'gppd_idnr': PowerPlant}, or a PlantTable, to save.
+	filename : str
+		Output filepath (.npz).
+	errors : list, optional
+		If given, `(idnr, exception)` is appended for each plant that can't be
+		written; otherwise these plants are reported on stdout.
+	batch_size : int, optional
+		Number of rows formatted together.
+	"""
+	start = time.time()
+	sink = ColumnarSink(filename)
+	export_database(plants, [sink], errors=errors, batch_size=batch_size)
+	print(u"Wrote {0} plants to {1} in {2:.2f} s.".format(sink.count, filename, time.time() - start))
+
+def copy_csv_to_columnar(csv_filename, columnar_filename):
+	"""
+	Copy the output database from CSV format into a columnar file (see `write_columnar_file()`).
+
+	Parameters
+	----------
+	csv_filename : str
+		Input file to copy.
+	columnar_filename : str
+		Output filepath (.npz).
+	"""
+	converter_types = _columnar_converter_types()
+	with open(csv_filename, 'rbU') as fin:
+		reader = csv.reader(fin)
+		header = next(reader)
+		memos = [_ConvertedValues(_CSV_CONVERTERS[converter_types.get(column, 'text')]) for column in header]
+		values = [[] for column in header]
+		while True:
+			chunk = filter(None, islice(reader, CSV_READ_CHUNK_SIZE))
+			if not chunk:
+				break
+			for memo, column, result in izip(memos, izip(*chunk), values):
+				if len(memo) > memo.MAX_SIZE:
+					memo.clear()
+				result.extend(map(memo.__getitem__, column))
+	del memos
+	_write_columnar_values(header, values, columnar_filename)
+
+def read_columnar_file(filename, columns=None, encoded=False):
+	"""
+	Read columns of a file written by `write_columnar_file()`.
+
+	Only the arrays of the requested columns are read from the file.
+
+	Parameters
+	----------
+	filename : str
+		Filepath for the columnar file to read.
+	columns : list of str, optional
+		Columns to read (default all); 'gppd_idnr' is always read.
+	encoded : bool, default False
+		Whether to return dictionary-encoded columns as `(codes, categories)`,
+		with code -1 for no data, instead of decoding them.
+
+	Returns
+	-------
+	dict
+		Dict of {column: numpy.ndarray}, rows in file order: float arrays (NaN
+		for no data) for numeric columns and object arrays for text columns,
+		with None for no data in columns that are 'text_or_none' in
+		CSV_COLUMN_TYPES and u'' in other text columns, as returned by
+		`read_csv_file(columnar=True)` except that generation is numeric.
+
+	Raises
+	------
+	ValueError
+		If the file is not a columnar database file or a requested column is not in it.
+	"""
+	with np.load(filename) as archive:
+		if _COLUMNAR_SCHEMA not in archive.files:
+			raise ValueError('{0} is not a columnar database file'.format(filename))
+		schema = json.loads(archive[_COLUMNAR_SCHEMA].tostring())
+		if schema['version'] > COLUMNAR_FILE_VERSION:
+			raise ValueError('{0} has unsupported columnar file version {1}'.format(filename, schema['version']))
+		kinds = [(str(name), kind) for name, kind in schema['columns']]
+		if columns is not None:
+			missing = set(columns) - set(name for name, kind in kinds)
+			if missing:
+				raise ValueError('{0} has no column(s) {1}'.format(filename, ', '.join(sorted(missing))))
+			kinds = [(name, kind) for name, kind in kinds if name in columns or name == 'gppd_idnr']
+
+		rows = schema['rows']
+		arrays = {}
+		for name, kind in kinds:
+			if kind in ('float64', 'float32'):
+				arrays[name] = archive[name + '.values']
+				continue
+			valid = np.unpackbits(archive[name + '.valid'])[:rows].astype(bool)
+			no_data = None if CSV_COLUMN_TYPES.get(name) == 'text_or_none' else NO_DATA_UNICODE
+			if kind == 'category':
+				categories = _decode_text(archive[name + '.category_text'], archive[name + '.category_offsets'])
+				codes = archive[name + '.codes'].astype(np.intp)
+				codes[~valid] = -1
+				if encoded:
+					arrays[name] = (codes, categories)
+				else:
+					# code -1 picks the no-data value at the end of the table
+					arrays[name] = np.array(categories + [no_data], dtype=object)[codes]
+			else:
+				values = np.array(_decode_text(archive[name + '.text'], archive[name + '.offsets']), dtype=object)
+				values[~valid] = no_data
+				arrays[name] = values
+	return arrays
+
+
+### GEOJSON ###
+
+# Decimals of exported coordinates, as in the output CSV.
+GEOJSON_PRECISION = 4
+
+# Type of each exported property, as read back from the output CSV; generation is numeric.
+GEOJSON_PROPERTY_TYPES = dict(CSV_COLUMN_TYPES)
+GEOJSON_PROPERTY_TYPES.update((field, 'float') for field in CSV_FIELDNAMES if 'generation_gwh' in field)
+
+# Output CSV columns exported as properties by default; coordinates are the feature geometry.
+GEOJSON_PROPERTIES = tuple(field for field in CSV_FIELDNAMES if field not in ('latitude', 'longitude'))
+
+_GEOJSON_COLLECTION_START = '{"type": "FeatureCollection", "features": [\n'
+_GEOJSON_COLLECTION_END = '\n]}\n'
+
+def _geojson_geometry(location, precision):
+	"""GeoJSON Point text for a plant location, or 'null' without coordinates (as in the output CSV)."""
+	if not (location.latitude and location.longitude):
+		return 'null'
+	if precision is None:
+		coordinates = (repr(float(location.longitude)), repr(float(location.latitude)))
+	else:
+		coordinates = ('{0:.{1}f}'.format(location.longitude, precision),
+			'{0:.{1}f}'.format(location.latitude, precision))
+	return '{{"type": "Point", "coordinates": [{0}, {1}]}}'.format(*coordinates)
+
+class _GeoJSONWriter(object):
+	"""Sequential writer of GeoJSON features to one file, as a FeatureCollection or one feature per line."""
+
+	def __init__(self, filename, line_delimited):
+		self.filename = filename
+		self.line_delimited = line_delimited
+		self.count = 0
+		self.fout = open(filename, 'wb')
+		if not line_delimited:
+			self.fout.write(_GEOJSON_COLLECTION_START)
+
+	def write(self, features):
+		if not features:
+			return
+		if self.line_delimited:
+			self.fout.write('\n'.join(features) + '\n')
+		else:
+			if self.count:
+				self.fout.write(',\n')
+			self.fout.write(',\n'.join(features))
+		self.count += len(features)
+
+	def close(self):
+		if not self.line_delimited:
+			self.fout.write(_GEOJSON_COLLECTION_END)
+		self.fout.close()
+
+def write_geojson_file(plants_dictionary, filename, properties=None, precision=GEOJSON_PRECISION,
+	line_delimited=False, split_by_country=False, errors=None, batch_size=CSV_BATCH_SIZE):
+	"""
+	Write plants as GeoJSON Point features, in output CSV order.
+
+	Features are formatted and written in batches, so memory use does not
+	grow with the number of plants. Properties are output CSV values, typed
+	according to GEOJSON_PROPERTY_TYPES (null for no data). Plants without
+	coordinates in the output CSV have a null geometry.
+
+	Parameters
+	----------
+	plants_dictionary : dict or PlantTable
+		Dict of {'gppd_idnr': PowerPlant}, or a PlantTable, to save.
+	filename : str
+		Output filepath. With `split_by_country`, a pattern containing '{country}',
+		which is replaced by the ISO3 code of each country.
+	properties : sequence of str, optional
+		Output CSV columns to export as properties (default GEOJSON_PROPERTIES).
+	precision : int or None, default GEOJSON_PRECISION
+		Decimals of coordinates; None for full precision.
+	line_delimited : bool, default False
+		Whether to write one feature per line (GeoJSONL) instead of a FeatureCollection.
+	split_by_country : bool, default False
+		Whether to write one file per country.
+	errors : list, optional
+		If given, `(idnr, exception)` is appended for each plant that can't be
+		written; otherwise these plants are reported on stdout.
+	batch_size : int, optional
+		Number of plants formatted together.
+
+	Returns
+	-------
+	counts : dict
+		Dict of {filepath: number of features written}.
+
+	Raises
+	------
+	ValueError
+		If a property is not an output CSV column, or `filename` has no '{country}'
+		field with `split_by_country`.
+	"""
+	if properties is None:
+		properties = GEOJSON_PROPERTIES
+	unknown = set(properties) - set(CSV_FIELDNAMES)
+	if unknown:
+		raise ValueError('not output CSV column(s): {0}'.format(', '.join(sorted(unknown))))
+	if split_by_country and '{country}' not in filename:
+		raise ValueError('filename <{0}> has no {{country}} field'.format(filename))
+
+	report_errors = errors is None
+	if report_errors:
+		errors = []
+
+	# the country column is always formatted, to split files
+	fieldnames = list(properties) + ['country']
+	# property values are memoized as JSON text by (type, value)
+	memos = []
+	for field in properties:
+		convert = _cell_converter(field, GEOJSON_PROPERTY_TYPES)
+		memos.append(_ConvertedValues(lambda key, convert=convert: json.dumps(convert(key))))
+	keys = [json.dumps(field) + ': ' for field in properties]
+
+	counts = {}
+	writer = None
+	try:
+		for plants, columns in _iter_formatted_batches(plants_dictionary, fieldnames, None, errors, batch_size):
+			values = []
+			for key, memo, column in izip(keys, memos, columns):
+				if len(memo) > memo.MAX_SIZE:
+					memo.clear()
+				values.append([key + text for text in map(memo.__getitem__, izip(map(type, column), column))])
+			features = ['{{"type": "Feature", "geometry": {0}, "properties": {{{1}}}}}'.format(
+					_geojson_geometry(plant.location, precision), ', '.join(cells))
+				for plant, cells in izip(plants, izip(*values))]
+
+			if not split_by_country:
+				if writer is None:
+					writer = _GeoJSONWriter(filename, line_delimited)
+				writer.write(features)
+				continue
+			# plants are sorted by country, so each country's file is written in one run
+			countries = columns[-1]
+			start = 0
+			for end in xrange(1, len(features) + 1):
+				if end < len(features) and countries[end] == countries[start]:
+					continue
+				country_filename = filename.format(country=countries[start])
+				if writer is None or writer.filename != country_filename:
+					if writer is not None:
+						writer.close()
+						counts[writer.filename] = writer.count
+					writer = _GeoJSONWriter(country_filename, line_delimited)
+				writer.write(features[start:end])
+				start = end
+		if writer is None and not split_by_country:
+			writer = _GeoJSONWriter(filename, line_delimited)
+	finally:
+		if writer is not None:
+			writer.close()
+			counts[writer.filename] = writer.count
+
+	if report_errors:
+		for idnr, e in errors:
+			print(u"Error with plant {0}".format(_get_plant(plants_dictionary, idnr).idnr))
+	return counts
+
+
+### COUNTRY SHARDS ###
+
+# Formats of country shards and the file extension of each.
+SHARD_FORMATS = {'csv': '.csv', 'sqlite': '.sqlite'}
+SHARD_MANIFEST_FILENAME = 'manifest.json'
+SHARD_MANIFEST_VERSION = 1
+
+def _write_country_shard(directory, iso_code, rows, formats):
+	"""
+	Write the output CSV text rows of one country to shard files.
+
+	Returns
+	-------
+	(iso_code, entry) : tuple
+		ISO3 code and manifest entry for the country (see `write_country_shards()`).
+	"""
+	capacity = CSV_FIELDNAMES.index('capacity_mw')
+	entry = {
+		'country_long': rows[0][CSV_FIELDNAMES.index('country_long')].decode(UNICODE_ENCODING),
+		'rows': len(rows),
+		'capacity_mw': sum(_csv_float(row[capacity]) or 0 for row in rows),
+		'files': {},
+	}
+	for shard_format in formats:
+		filename = os.path.join(directory, iso_code + SHARD_FORMATS[shard_format])
+		if os.path.exists(filename):
+			os.remove(filename)
+		if shard_format == 'csv':
+			with open(filename, 'wb') as fout:
+				writer = csv.writer(fout, lineterminator='\r\n')
+				writer.writerow(CSV_FIELDNAMES)
+				writer.writerows(rows)
+		else:
+			# same values as copy_csv_to_sqlite() from the CSV shard
+			values = []
+			for column, cells in izip(CSV_FIELDNAMES, izip(*rows)):
+				memo = _ConvertedValues(_CSV_CONVERTERS[CSV_COLUMN_TYPES.get(column, 'text')])
+				values.append(map(memo.__getitem__, cells))
+			_pair_coordinates(values[CSV_FIELDNAMES.index('latitude')], values[CSV_FIELDNAMES.index('longitude')])
+			conn = _create_sqlite_database(filename)
+			_load_powerplants_table(conn, [izip(*values)])
+			conn.close()
+		entry['files'][shard_format] = {
+			'filename': os.path.basename(filename),
+			'bytes': os.path.getsize(filename),
+			'sha256': file_sha256(filename),
+		}
+	return iso_code, entry
+
+def _write_country_shard_star(arguments):
+	"""Call `_write_country_shard()` with a tuple of arguments (for Pool.imap_unordered)."""
+	return _write_country_shard(*arguments)
+
+class ShardSink(object):
+	"""
+	Export sink writing one shard file per country and their manifest (see `write_country_shards()`).
+
+	Attributes
+	----------
+	manifest : dict
+		The manifest written, after closing.
+	"""
+	def __init__(self, directory, formats=('csv',), processes=None):
+		unknown = set(formats) - set(SHARD_FORMATS)
+		if unknown:
+			raise ValueError('unknown shard format(s): {0}'.format(', '.join(sorted(unknown))))
+		self.directory = directory
+		self.formats = formats
+		self.processes = processes
+		self.manifest = None
+
+	def open(self, fieldnames):
+		if not os.path.isdir(self.directory):
+			os.makedirs(self.directory)
+		self._pool = None if self.processes == 1 else multiprocessing.Pool(self.processes)
+		self._entries = []
+		self._rows = []
+
+	def _write_shard(self):
+		# plants are sorted by country, so each country's rows are consecutive
+		arguments = (self.directory, self._rows[-1][CSV_FIELDNAMES.index('country')], self._rows, self.formats)
+		if self._pool is None:
+			self._entries.append(_write_country_shard_star(arguments))
+		else:
+			self._entries.append(self._pool.apply_async(_write_country_shard_star, (arguments,)))
+		self._rows = []
+
+	def write(self, batch):
+		country = CSV_FIELDNAMES.index('country')
+		for row in izip(*[batch.column(field) for field in CSV_FIELDNAMES]):
+			row = [_csv_cell_text(value) for value in row]
+			if self._rows and row[country] != self._rows[-1][country]:
+				self._write_shard()
+			self._rows.append(row)
+
+	def close(self):
+		if self._rows:
+			self._write_shard()
+		entries = self._entries
+		if self._pool is not None:
+			try:
+				entries = [result.get() for result in entries]
+			finally:
+				self._pool.close()
+				self._pool.join()
+		self.manifest = {
+			'version': SHARD_MANIFEST_VERSION,
+			'fieldnames': list(CSV_FIELDNAMES),
+			'countries': dict(entries),
+		}
+		with open(os.path.join(self.directory, SHARD_MANIFEST_FILENAME), 'wb') as fout:
+			json.dump(self.manifest, fout, indent=1, sort_keys=True)
+
+def write_country_shards(plants_dictionary, directory, formats=('csv',), processes=None, errors=None):
+	"""
+	Write one shard file per country (by ISO3 code) and a manifest of the shards.
+
+	Plants are formatted in one pass in output CSV order (see ShardSink);
+	each country's rows are handed to a pool of worker processes as soon as
+	they are complete, so shards are written in parallel. Shards have the same
+	columns and values as the output CSV (or, for SQLite, as
+	`copy_csv_to_sqlite()` makes from it).
+
+	The manifest (SHARD_MANIFEST_FILENAME, JSON) holds 'version', 'fieldnames'
+	and 'countries', a dict of {iso_code: {'country_long', 'rows',
+	'capacity_mw' (total), 'files': {format: {'filename', 'bytes', 'sha256'}}}}.
+
+	Parameters
+	----------
+	plants_dictionary : dict or PlantTable
+		Dict of {'gppd_idnr': PowerPlant}, or a PlantTable, to save.
+	directory : str
+		Output directory; created if needed.
+	formats : sequence of str, default ('csv',)
+		Shard formats, from SHARD_FORMATS.
+	processes : int, optional
+		Number of worker processes (default the number of CPUs); 1 writes
+		shards in this process.
+	errors : list, optional
+		If given, `(idnr, exception)` is appended for each plant that can't be
+		written; otherwise these plants are reported on stdout.
+
+	Returns
+	-------
+	manifest : dict
+		The manifest written.
+
+	Raises
+	------
+	ValueError
+		If a format is not in SHARD_FORMATS.
+	"""
+	sink = ShardSink(directory, formats, processes)
+	export_database(plants_dictionary, [sink], errors=errors)
+	return sink.manifest
+
+def read_shard_manifest(directory):
+	"""Read the manifest of country shards written by `write_country_shards()`."""
+	with open(os.path.join(directory, SHARD_MANIFEST_FILENAME), 'rb') as fin:
+		return json.load(fin)
+
+def read_country_shards(directory, countries, columns=None, verify=False):
+	"""
+	Read the CSV shards of some countries into one dict, as `read_csv_file()` does for the output CSV.
+
+	Parameters
+	----------
+	directory : str
+		Directory written by `write_country_shards()` with CSV shards.
+	countries : sequence of str
+		ISO3 codes of the countries to read.
+	columns : list of str, optional
+		Columns to read (default all); 'gppd_idnr' is always read.
+	verify : bool, default False
+		Whether to check each shard against its SHA-256 in the manifest.
+
+	Returns
+	-------
+	pdb : dict
+		Dict of {gppd_idnr: {column: value}}.
+
+	Raises
+	------
+	ValueError
+		If a country has no CSV shard, or a shard doesn't match the manifest.
+	"""
+	manifest = read_shard_manifest(directory)
+	missing = [iso_code for iso_code in countries
+		if 'csv' not in manifest['countries'].get(iso_code, {}).get('files', {})]
+	if missing:
+		raise ValueError('{0} has no CSV shard for {1}'.format(directory, ', '.join(missing)))
+	pdb = {}
+	for iso_code in countries:
+		shard = manifest['countries'][iso_code]['files']['csv']
+		filename = os.path.join(directory, shard['filename'])
+		if verify and file_sha256(filename) != shard['sha256']:
+			raise ValueError('{0} does not match the shard manifest'.format(filename))
+		pdb.update(read_csv_file(filename, columns))
+	return pdb
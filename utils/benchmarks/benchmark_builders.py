@@ -0,0 +1,104 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_builders.py
+Time the source database builders' build() functions, run one after another
+in a single process. Each builder is run once with its own BuildResources and
+once sharing one BuildResources with the others, so the second run shows the
+cost of the builder itself without loading the thesauri again.
+Builders whose raw files or dependencies are missing are reported and skipped.
+Nothing is written to source_databases.
+"""
+
+import argparse
+import cProfile
+import glob
+import importlib
+import pstats
+import sys
+import os
+import time
+
+BUILD_DIRECTORY = os.path.abspath(os.path.join(os.pardir, os.pardir, 'build_databases'))
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+sys.path.insert(0, BUILD_DIRECTORY)
+import powerplant_database as pw
+
+
+class Discard(object):
+	"""File-like object ignoring everything written to it (unicode or not)."""
+	def write(self, text):
+		pass
+
+	def flush(self):
+		pass
+
+
+def import_builder(code):
+	"""Import build_database_<code>.py as a module; the builders find files relative to their directory."""
+	cwd = os.getcwd()
+	os.chdir(BUILD_DIRECTORY)
+	try:
+		return importlib.import_module('build_database_{0}'.format(code))
+	finally:
+		os.chdir(cwd)
+
+
+def timed_build(builder, resources, options, profile=None):
+	"""Run `builder.build()`, returning (number of plants, elapsed seconds); (None, error) on failure."""
+	cwd = os.getcwd()
+	os.chdir(BUILD_DIRECTORY)
+	start = time.time()
+	try:
+		if profile:
+			plants = profile.runcall(builder.build, resources, options)
+		else:
+			plants = builder.build(resources, options)
+	except Exception as e:
+		return None, e
+	finally:
+		os.chdir(cwd)
+	return len(plants), time.time() - start
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark the source database builders in one process.")
+	argparser.add_argument('builders', nargs='*', metavar='BUILDER',
+		help="builders to run (default: all, e.g. AUS CHL)")
+	argparser.add_argument('-p', '--profile', type=int, default=0,
+		help="print the N functions with the most cumulative time per builder")
+	args = argparser.parse_args()
+
+	codes = args.builders or sorted(os.path.basename(f)[len('build_database_'):-len('.py')]
+		for f in glob.glob(os.path.join(BUILD_DIRECTORY, 'build_database_*.py')))
+	codes = [code for code in codes if code != 'template']
+	options = pw.make_build_options(download=False)
+	shared_resources = pw.BuildResources()
+
+	# keep the builders' progress messages out of the report
+	stdout = sys.stdout
+	results = []
+	for code in codes:
+		sys.stdout = Discard()
+		try:
+			builder = import_builder(code)
+			cold = timed_build(builder, pw.BuildResources(), options)
+			profile = cProfile.Profile() if args.profile else None
+			warm = timed_build(builder, shared_resources, options, profile)
+		except Exception as e:
+			cold = warm = (None, e)
+			profile = None
+		finally:
+			sys.stdout = stdout
+		results.append((code, cold, warm, profile))
+
+	print(u"{0:>8} {1:>8} {2:>14} {3:>14}".format('builder', 'plants', 'own resources', 'shared'))
+	for code, cold, warm, profile in results:
+		if cold[0] is None or warm[0] is None:
+			error = cold[1] if cold[0] is None else warm[1]
+			print(u"{0:>8}  skipped: {1}".format(code, error))
+			continue
+		print(u"{0:>8} {1:8d} {2:12.2f} s {3:12.2f} s".format(code, cold[0], cold[1], warm[1]))
+		if profile:
+			pstats.Stats(profile, stream=sys.stdout).sort_stats('cumulative').print_stats(args.profile)
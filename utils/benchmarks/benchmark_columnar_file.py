@@ -0,0 +1,80 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_columnar_file.py
+Compare loading the output database from CSV (pw.read_csv_file, columnar
+result) with loading it from a typed columnar file (pw.read_columnar_file),
+for all columns and for a projection of a few columns.
+A synthetic global_power_plant_database.csv of 1M rows (by default) is written
+to a temporary directory by repeating the rows of an output CSV under new ids,
+and copied to a columnar file; both loads must give the same columns.
+"""
+
+import argparse
+import gc
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+from benchmark_helpers import timed_rows
+from benchmark_read_csv import write_synthetic_csv
+
+PROJECTION = ['country', 'primary_fuel', 'capacity_mw', 'commissioning_year', 'generation_gwh_2016']
+
+
+def same_columns(from_csv, from_columnar):
+	"""Compare CSV and columnar loads column by column (generation is text in the CSV load)."""
+	if sorted(from_csv) != sorted(from_columnar):
+		return False
+	for name, expected in from_csv.iteritems():
+		actual = from_columnar[name]
+		if pw.COLUMNAR_COLUMN_TYPES.get(name, '').startswith('float'):
+			expected = np.array([np.nan if v is None else float(v) for v in expected])
+			actual = actual.astype(float)
+			if not np.array_equal(np.isnan(expected), np.isnan(actual)):
+				return False
+			expected, actual = expected[~np.isnan(expected)], actual[~np.isnan(actual)]
+		if not np.array_equal(expected, actual):
+			return False
+	return True
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark loading the columnar file against the CSV.")
+	argparser.add_argument('-i', '--input', type=str,
+		default=os.path.join(pw.OUTPUT_DIR, 'global_power_plant_database.csv'),
+		help="output CSV whose rows are repeated")
+	argparser.add_argument('-n', '--number', type=int, default=1000000, help="number of rows in the synthetic CSV")
+	args = argparser.parse_args()
+
+	tmpdir = tempfile.mkdtemp()
+	synthetic_csv = os.path.join(tmpdir, 'global_power_plant_database.csv')
+	synthetic_columnar = os.path.join(tmpdir, 'global_power_plant_database.npz')
+	write_synthetic_csv(args.input, synthetic_csv, args.number)
+	pw.copy_csv_to_columnar(synthetic_csv, synthetic_columnar)
+	gc.collect()
+	print(u"Reading {0:,d} rows: CSV {1:,d} bytes; columnar file {2:,d} bytes.".format(args.number,
+		os.path.getsize(synthetic_csv), os.path.getsize(synthetic_columnar)))
+
+	results = {}
+	for label, columns in [('all columns', None), ('{0} columns'.format(len(PROJECTION)), PROJECTION)]:
+		from_csv = timed_rows('CSV, ' + label, args.number, pw.read_csv_file, synthetic_csv, columns, columnar=True)
+		gc.collect()
+		from_columnar = timed_rows('columnar, ' + label, args.number, pw.read_columnar_file, synthetic_columnar, columns)
+		gc.collect()
+		timed_rows('columnar, {0}, encoded'.format(label), args.number,
+			pw.read_columnar_file, synthetic_columnar, columns, encoded=True)
+		results[label] = same_columns(from_csv, from_columnar)
+		del from_csv, from_columnar
+		gc.collect()
+	for label, same in sorted(results.iteritems()):
+		print(u"...results identical, {0}: {1}".format(label, same))
+
+	os.remove(synthetic_csv)
+	os.remove(synthetic_columnar)
+	os.rmdir(tmpdir)
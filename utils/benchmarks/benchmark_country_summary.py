@@ -0,0 +1,64 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_country_summary.py
+Compare the per-country summary queries of database_country_summary.py
+(country_summary, about 40 statements per country) with the single GROUP BY
+pass of pw.summarize_countries, on the same in-memory SQLite database.
+The rows of an output CSV are repeated (10x by default, under new ids) to
+scale the input; both ways must write the same summary CSV.
+"""
+
+import argparse
+import csv
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+sys.path.insert(0, os.pardir)
+import powerplant_database as pw
+import database_country_summary as summary
+from benchmark_read_csv import write_synthetic_csv
+from benchmark_helpers import timed
+
+
+def summarize_each(db_conn, countries):
+	return {iso_code: summary.country_summary(db_conn, country, iso_code)
+		for iso_code, country in countries.iteritems()}
+
+
+def write_summary(country_summaries, filename):
+	with open(filename, 'wb') as fout:
+		writer = csv.DictWriter(fout, fieldnames=pw.SUMMARY_FIELDNAMES, lineterminator='\r\n')
+		writer.writeheader()
+		for iso_code in sorted(country_summaries):
+			writer.writerow(country_summaries[iso_code])
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark the single-pass country summary.")
+	argparser.add_argument('-i', '--input', type=str, default=summary.DEFAULT_DATABASE_FILE,
+		help="output CSV whose rows are repeated")
+	argparser.add_argument('-f', '--factor', type=int, default=10, help="replication factor for the rows")
+	args = argparser.parse_args()
+
+	with open(args.input, 'rbU') as fin:
+		number = sum(1 for row in csv.reader(fin)) - 1
+	tmpdir = tempfile.mkdtemp()
+	synthetic_csv = os.path.join(tmpdir, 'plants.csv')
+	write_synthetic_csv(args.input, synthetic_csv, number * args.factor)
+	db_conn = pw.copy_csv_to_sqlite(synthetic_csv, ':memory:', return_connection=True)
+	countries = {v.iso_code: k for k, v in pw.make_country_dictionary().iteritems()}
+	print(u"Summarizing {0} countries, {1} plants.".format(len(countries), number * args.factor))
+
+	outputs = [os.path.join(tmpdir, name) for name in ['each.csv', 'single_pass.csv']]
+	write_summary(timed('per-country queries', summarize_each, db_conn, countries), outputs[0])
+	write_summary(timed('single GROUP BY pass', pw.summarize_countries, db_conn, countries), outputs[1])
+	with open(outputs[0], 'rb') as f1, open(outputs[1], 'rb') as f2:
+		print(u"...summary CSVs identical: {0}".format(f1.read() == f2.read()))
+
+	for filename in outputs + [synthetic_csv]:
+		os.remove(filename)
+	os.rmdir(tmpdir)
@@ -0,0 +1,100 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_database_file.py
+Compare reading the source databases saved as a single pickle (the former
+*-Database.bin format) with the framed format: loading everything, looking up
+single plants by ID, reading one country partition and streaming all plants.
+Every *-Database.bin in the source_databases directory is merged and saved in
+both formats to a temporary directory.
+"""
+
+import argparse
+import glob
+import pickle
+import random
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+from benchmark_helpers import timed
+
+
+def lookup_legacy(filename, ids):
+	plants = pw.load_database(filename)
+	return [plants[idnr] for idnr in ids]
+
+
+def lookup_framed(filename, ids):
+	with pw.open_database(filename) as database:
+		return [database[idnr] for idnr in ids]
+
+
+def country_legacy(filename, country):
+	plants = pw.load_database(filename)
+	return {k: p for k, p in plants.iteritems() if p.country == country}
+
+
+def country_framed(filename, country):
+	with pw.open_database(filename) as database:
+		return database.country(country)
+
+
+def stream_framed(filename):
+	with pw.open_database(filename) as database:
+		return sum(1 for _ in database.iteritems())
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark the framed *-Database.bin format.")
+	argparser.add_argument('-d', '--directory', type=str, default=pw.SOURCE_DB_BIN_DIR,
+		help="directory holding the *-Database.bin files")
+	argparser.add_argument('-n', '--number', type=int, default=100, help="number of plants looked up by ID")
+	args = argparser.parse_args()
+
+	filenames = sorted(glob.glob(os.path.join(args.directory, '*-Database.bin')))
+	if not filenames:
+		raise ValueError('no database files found in <{0}>'.format(args.directory))
+	plants = {}
+	for filename in filenames:
+		plants.update(pw.load_database(filename))
+
+	tmpdir = tempfile.mkdtemp()
+	legacy_file = os.path.join(tmpdir, 'legacy.bin')
+	framed_file = os.path.join(tmpdir, 'ALL-Database.bin')
+	with open(legacy_file, 'wb') as f:
+		timed('save: single pickle', pickle.dump, plants, f)
+	timed('save: framed', pw.save_database, plants, 'ALL', savedir=tmpdir)
+	print(u"...{0} plants; single pickle {1:,d} bytes, framed {2:,d} bytes.".format(
+		len(plants), os.path.getsize(legacy_file), os.path.getsize(framed_file)))
+
+	ids = random.Random(0).sample(sorted(plants), min(args.number, len(plants)))
+	countries = {}
+	for plant in plants.itervalues():
+		countries[plant.country] = countries.get(plant.country, 0) + 1
+	country = max(countries, key=countries.get)
+	del plants
+
+	print(u"Load all")
+	legacy = timed('single pickle', pw.load_database, legacy_file)
+	framed = timed('framed', pw.load_database, framed_file)
+	print(u"...same plant IDs and dict order: {0}".format(legacy.keys() == framed.keys()))
+	del legacy, framed
+
+	print(u"Look up {0} plants by ID".format(len(ids)))
+	timed('single pickle', lookup_legacy, legacy_file, ids)
+	timed('framed', lookup_framed, framed_file, ids)
+
+	print(u"Read one country ({0}, {1} plants)".format(country, countries[country]))
+	timed('single pickle', country_legacy, legacy_file, country)
+	timed('framed', country_framed, framed_file, country)
+
+	print(u"Stream all plants")
+	timed('framed', stream_framed, framed_file)
+
+	os.remove(legacy_file)
+	os.remove(framed_file)
+	os.rmdir(tmpdir)
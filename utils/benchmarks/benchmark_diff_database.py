@@ -0,0 +1,87 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_diff_database.py
+Time pw.diff_databases on two synthetic builds of the output CSV. The old build
+repeats the rows of an output CSV under new ids (300k rows by default); the new
+build drops, adds and edits (capacity, coordinates, fuel, generation) a known
+number of plants, which the diff must report.
+"""
+
+import argparse
+import csv
+import random
+import sys
+import os
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+from benchmark_read_csv import write_synthetic_csv
+
+EDITED_FIELDS = ['capacity_mw', 'latitude', 'primary_fuel', 'generation_gwh_2016']
+
+
+def write_new_build(old_csv, new_csv, fraction, seed=0):
+	"""
+	Write a modified copy of `old_csv`.
+
+	Returns
+	-------
+	expected : dict
+		Numbers of added, removed and changed plants.
+	"""
+	rng = random.Random(seed)
+	expected = {'added': 0, 'removed': 0, 'changed': 0}
+	with open(old_csv, 'rbU') as fin, open(new_csv, 'wb') as fout:
+		reader = csv.reader(fin)
+		writer = csv.writer(fout, lineterminator='\r\n')
+		header = next(reader)
+		writer.writerow(header)
+		positions = [header.index(field) for field in EDITED_FIELDS]
+		id_column = header.index('gppd_idnr')
+		for row in reader:
+			draw = rng.random()
+			if draw < fraction:
+				expected['removed'] += 1
+				continue
+			if draw < 2 * fraction:
+				expected['changed'] += 1
+				position = rng.choice(positions)
+				row[position] = '1.2345' if row[position] != '1.2345' else '2.3456'
+			elif draw < 3 * fraction:
+				expected['added'] += 1
+				added = list(row)
+				added[id_column] = 'NEW' + row[id_column]
+				writer.writerow(added)
+			writer.writerow(row)
+	return expected
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark the build-to-build database diff.")
+	argparser.add_argument('-i', '--input', type=str,
+		default=os.path.join(pw.OUTPUT_DIR, 'global_power_plant_database.csv'),
+		help="output CSV whose rows are repeated")
+	argparser.add_argument('-n', '--number', type=int, default=300000, help="number of plants in the old build")
+	argparser.add_argument('--fraction', type=float, default=0.01,
+		help="fraction of plants removed, changed and added (each)")
+	args = argparser.parse_args()
+
+	tmpdir = tempfile.mkdtemp()
+	old_csv = os.path.join(tmpdir, 'old.csv')
+	new_csv = os.path.join(tmpdir, 'new.csv')
+	write_synthetic_csv(args.input, old_csv, args.number)
+	expected = write_new_build(old_csv, new_csv, args.fraction)
+
+	start = time.time()
+	diff = pw.diff_databases(old_csv, new_csv)
+	print(u"Diffed {0:,d} plants in {1:.2f} s.".format(args.number, time.time() - start))
+	for change in ['added', 'removed', 'changed']:
+		print(u"{0:>8}: {1:7d} (expected {2})".format(change, len(diff[change]), expected[change]))
+
+	os.remove(old_csv)
+	os.remove(new_csv)
+	os.rmdir(tmpdir)
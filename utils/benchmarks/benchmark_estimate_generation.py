@@ -0,0 +1,107 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_estimate_generation.py
+Compare plant-by-plant generation estimation (the former implementation of
+pw.estimate_generation) with the vectorized pw.estimate_generation_by_year.
+The current-schema plants of every *-Database.bin in the source_databases
+directory are replicated (10x by default) to scale the input, and the 2014
+national totals are reused for each year of a multi-year run.
+"""
+
+import argparse
+import glob
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+from benchmark_helpers import replicate, timed
+
+
+def estimate_generation_loop(powerplant_dictionary, totals, year):
+	"""
+	Plant-by-plant estimate for one year, as pw.estimate_generation did before vectorization.
+
+	Returns
+	-------
+	estimates : dict
+		Dict of {idnr: estimated gwh} for estimated plants.
+	"""
+	generation_totals = {}
+	for (country, fuel), gwh in totals.iteritems():
+		generation_totals.setdefault(country, {})[fuel] = gwh
+
+	capacity_totals = {}
+	for plantid, plant in powerplant_dictionary.iteritems():
+		country = plant.country
+		capacity = plant.capacity
+		if capacity == None:
+			continue
+		fuel = plant.primary_fuel
+		if plant.generation is not None:
+			generation = pw.annual_generation(plant.generation, year)
+			if generation is not None:
+				try:
+					generation_totals[country][fuel] -= generation
+				except:
+					pass
+				continue
+		if country not in capacity_totals:
+			capacity_totals[country] = {}
+		capacity_totals[country][fuel] = capacity_totals[country].get(fuel, 0) + capacity
+
+	estimates = {}
+	for plantid, plant in powerplant_dictionary.iteritems():
+		if pw.annual_generation(plant.generation, year) is not None:
+			continue
+		capacity = plant.capacity
+		if capacity == None:
+			continue
+		try:
+			estimated_generation = capacity / float(capacity_totals[plant.country][plant.primary_fuel]) * \
+				generation_totals[plant.country][plant.primary_fuel]
+			estimates[plantid] = max(estimated_generation, 0)
+		except:
+			continue
+	return estimates
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark vectorized generation estimation.")
+	argparser.add_argument('-d', '--directory', type=str, default=pw.SOURCE_DB_BIN_DIR,
+		help="directory holding the *-Database.bin files")
+	argparser.add_argument('-f', '--factor', type=int, default=10, help="replication factor for the plants")
+	argparser.add_argument('-y', '--years', type=int, default=7, help="number of years in the multi-year run")
+	args = argparser.parse_args()
+
+	filenames = sorted(glob.glob(os.path.join(args.directory, '*-Database.bin')))
+	if not filenames:
+		raise ValueError('no database files found in <{0}>'.format(args.directory))
+	plants = {}
+	for filename in filenames:
+		plants.update(pw.load_database(filename))
+	# skip plants pickled with an older PowerPlant schema
+	plants = {k: p for k, p in plants.iteritems() if all(hasattr(p, a) for a in pw.PLANT_ATTRIBUTES)}
+	plants = replicate(plants, args.factor)
+	print(u"Estimating generation for {0} plants ({1}x replicated).".format(len(plants), args.factor))
+
+	totals_2014 = pw.read_generation_totals()[2014]
+	years = range(2014, 2014 + args.years)
+	multi_year_totals = {year: totals_2014 for year in years}
+
+	print(u"One year (2014)")
+	loop = timed('plant by plant', estimate_generation_loop, plants, totals_2014, 2014)
+	keys, _, estimates = timed('vectorized', pw.estimate_generation_by_year, plants, {2014: totals_2014})
+	table = pw.PlantTable.from_plants(plants)
+	timed('vectorized (PlantTable)', pw.estimate_generation_by_year, table, {2014: totals_2014})
+	vectorized = {k: v for k, v in zip(keys, estimates[0].tolist()) if not np.isnan(v)}
+	print(u"...{0} plants estimated; results identical: {1}".format(len(vectorized), vectorized == loop))
+
+	print(u"{0} years ({1}-{2})".format(len(years), years[0], years[-1]))
+	timed('plant by plant, year by year', lambda: [estimate_generation_loop(plants, totals_2014, y) for y in years])
+	timed('vectorized, all years at once', pw.estimate_generation_by_year, plants, multi_year_totals)
+	timed('vectorized (PlantTable)', pw.estimate_generation_by_year, table, multi_year_totals)
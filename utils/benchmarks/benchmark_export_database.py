@@ -0,0 +1,79 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_export_database.py
+Compare the former release export (write the CSV, copy it into SQLite, then
+summarize countries from an SQLite copy of the CSV) with pw.export_database,
+which formats each plant once and writes the CSV, the SQLite database and the
+country summary in one pass.
+The current-schema plants of every *-Database.bin in the source_databases
+directory are replicated (10x by default) to scale the input; both ways must
+write the same CSV, SQLite rows and summary.
+"""
+
+import argparse
+import glob
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+sys.path.insert(0, os.pardir)
+import powerplant_database as pw
+from benchmark_helpers import replicate, timed_rows
+from benchmark_write_sqlite import table_rows
+
+
+def export_separately(plants, csv_filename, sqlite_filename, summary_filename):
+	"""Export as the release process did: each output re-reads the CSV."""
+	pw.write_csv_file(plants, csv_filename)
+	pw.copy_csv_to_sqlite(csv_filename, sqlite_filename)
+	countries = {v.iso_code: k for k, v in pw.make_country_dictionary().iteritems()}
+	db_conn = pw.copy_csv_to_sqlite(csv_filename, ':memory:', return_connection=True)
+	country_summaries = pw.summarize_countries(db_conn, countries)
+	pw.write_country_summary(country_summaries, summary_filename, sorted(countries, key=countries.get))
+
+
+def export_once(plants, csv_filename, sqlite_filename, summary_filename):
+	sqlite_sink = pw.SQLiteSink(sqlite_filename, keep_connection=True)
+	pw.export_database(plants, [pw.CSVSink(csv_filename), sqlite_sink,
+		pw.CountrySummarySink(summary_filename, database=sqlite_sink)])
+	sqlite_sink.conn.close()
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark the one-pass multi-sink export.")
+	argparser.add_argument('-d', '--directory', type=str, default=pw.SOURCE_DB_BIN_DIR,
+		help="directory holding the *-Database.bin files")
+	argparser.add_argument('-f', '--factor', type=int, default=10, help="replication factor for the plants")
+	args = argparser.parse_args()
+
+	filenames = sorted(glob.glob(os.path.join(args.directory, '*-Database.bin')))
+	if not filenames:
+		raise ValueError('no database files found in <{0}>'.format(args.directory))
+	plants = {}
+	for filename in filenames:
+		plants.update(pw.load_database(filename))
+	# skip plants pickled with an older PowerPlant schema
+	plants = {k: p for k, p in plants.iteritems() if all(hasattr(p, a) for a in pw.PLANT_ATTRIBUTES)}
+	plants = replicate(plants, args.factor)
+	print(u"Exporting {0} plants ({1}x replicated).".format(len(plants), args.factor))
+
+	tmpdir = tempfile.mkdtemp()
+	outputs = {}
+	for label in ['separate', 'once']:
+		outputs[label] = [os.path.join(tmpdir, '{0}.{1}'.format(label, extension))
+			for extension in ['csv', 'sqlite', 'summary.csv']]
+	timed_rows('CSV, copy to SQLite, summarize', len(plants), export_separately, plants, *outputs['separate'])
+	timed_rows('export_database, 3 sinks', len(plants), export_once, plants, *outputs['once'])
+
+	with open(outputs['separate'][0], 'rb') as f1, open(outputs['once'][0], 'rb') as f2:
+		print(u"...CSV outputs identical: {0}".format(f1.read() == f2.read()))
+	print(u"...same SQLite rows: {0}".format(table_rows(outputs['separate'][1]) == table_rows(outputs['once'][1])))
+	with open(outputs['separate'][2], 'rb') as f1, open(outputs['once'][2], 'rb') as f2:
+		print(u"...summaries identical: {0}".format(f1.read() == f2.read()))
+
+	for filename in outputs['separate'] + outputs['once']:
+		os.remove(filename)
+	os.rmdir(tmpdir)
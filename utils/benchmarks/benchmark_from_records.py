@@ -0,0 +1,104 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_from_records.py
+Compare building plants one at a time with the PowerPlant constructor against
+the bulk PowerPlant.from_records() factory, on synthetic typed records.
+Records are generated in batches so that only one batch of plants is held in
+memory at a time; the first batch is checked field for field.
+"""
+
+import argparse
+import random
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+
+COUNTRIES = [u'Brazil', u'Canada', u'China', u'Côte d\'Ivoire', u'India', u'United States of America']
+FUELS = [u'Coal', u'Gas', u'Hydro', u'Nuclear', u'Oil', u'Solar', u'Wind']
+SOURCES = ['Agência Nacional de Energia Elétrica (Brazil)', 'WRI', 'U.S. Energy Information Administration']
+
+
+def synthetic_records(start, count, seed):
+	"""Return `count` typed records as accepted by `PowerPlant.from_records()`."""
+	rng = random.Random(seed)
+	records = []
+	for n in xrange(start, start + count):
+		primary_fuel = rng.choice(FUELS)
+		record = {
+			'idnr': u'SYN{0:07d}'.format(n),
+			'name': u'Synthetic plant {0}'.format(n),
+			'country': rng.choice(COUNTRIES),
+			'owner': u'Owner {0}'.format(n % 997),
+			'capacity': round(rng.uniform(1, 3000), 1),
+			'primary_fuel': primary_fuel,
+			'other_fuel': set([rng.choice(FUELS)]),
+			'source': rng.choice(SOURCES),
+			'source_url': u'http://example.org/plants',
+			'location': pw.LocationObject(u'', rng.uniform(-60, 70), rng.uniform(-180, 180)),
+			'coord_source': u'Synthetic',
+			'commissioning_year': rng.randint(1950, 2017),
+		}
+		if n % 4 == 0:
+			record['generation'] = pw.PlantGenerationObject.create(rng.uniform(0, 5000), 2014, source=u'Synthetic')
+			record['cap_year'] = 2017
+		records.append(record)
+	return records
+
+
+def construct_each(records):
+	"""Build plants with one constructor call per record."""
+	return [pw.PowerPlant(**{'plant_' + key: value for key, value in record.iteritems()})
+		for record in records]
+
+
+def same_plant(a, b):
+	"""Compare two plants field for field (location and generation by value)."""
+	if sorted(a.__dict__) != sorted(b.__dict__):
+		return False
+	for attribute, value in a.__dict__.iteritems():
+		other = getattr(b, attribute)
+		if attribute == 'location':
+			value, other = value.__dict__, other.__dict__
+		elif attribute == 'generation' and value:
+			value, other = [g.__dict__ for g in value], [g.__dict__ for g in other]
+		if value != other:
+			return False
+	return True
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark bulk plant construction.")
+	argparser.add_argument('-n', '--number', type=int, default=1000000, help="number of plants to build")
+	argparser.add_argument('-b', '--batch', type=int, default=100000, help="plants built per batch")
+	args = argparser.parse_args()
+
+	times = {'constructor': 0.0, 'from_records': 0.0}
+	total_errors = 0
+	for start in xrange(0, args.number, args.batch):
+		count = min(args.batch, args.number - start)
+
+		records = synthetic_records(start, count, seed=start)
+		t0 = time.time()
+		each = construct_each(records)
+		times['constructor'] += time.time() - t0
+
+		records = synthetic_records(start, count, seed=start)
+		t0 = time.time()
+		bulk, errors = pw.PowerPlant.from_records(records)
+		times['from_records'] += time.time() - t0
+		total_errors += len(errors)
+
+		if start == 0:
+			mismatches = sum(1 for a, b in zip(each, bulk) if not same_plant(a, b))
+			print(u"First batch: {0} plants, {1} field mismatches.".format(len(bulk), mismatches))
+		del records, each, bulk
+
+	print(u"Built {0} plants ({1} errors reported).".format(args.number, total_errors))
+	for label in ['constructor', 'from_records']:
+		print(u"{0:>14}: {1:8.2f} s; {2:10,.0f} plants/s".format(label, times[label], args.number / times[label]))
+	print(u"{0:>14}: {1:8.2f}x".format('speedup', times['constructor'] / times['from_records']))
@@ -0,0 +1,41 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_helpers.py
+Helpers shared by the benchmarks in this directory: timing a function call
+and replicating plants to scale the input. Not a benchmark itself.
+"""
+
+import copy
+import time
+
+# Width of the labels of timed calls.
+LABEL_WIDTH = 36
+
+
+def replicate(plants, factor):
+	"""Return a plant dictionary with `factor` copies of each plant under new ids."""
+	replicated = {}
+	for n in range(factor):
+		for idnr, plant in plants.iteritems():
+			new_plant = copy.copy(plant)
+			new_plant.idnr = u'{0}_{1}'.format(idnr, n)
+			replicated[new_plant.idnr] = new_plant
+	return replicated
+
+
+def timed(label, func, *args, **kwargs):
+	"""Run `func`, print the elapsed time and return its result."""
+	start = time.time()
+	result = func(*args, **kwargs)
+	print(u"{0:>{width}}: {1:8.3f} s".format(label, time.time() - start, width=LABEL_WIDTH))
+	return result
+
+
+def timed_rows(label, rows, func, *args, **kwargs):
+	"""Run `func` on `rows` rows, print the elapsed time and throughput, and return its result."""
+	start = time.time()
+	result = func(*args, **kwargs)
+	elapsed = time.time() - start
+	print(u"{0:>{width}}: {1:8.3f} s; {2:10,.0f} rows/s".format(label, elapsed, rows / elapsed, width=LABEL_WIDTH))
+	return result
@@ -0,0 +1,85 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_memory.py
+Compare the in-memory size of the source databases loaded as PowerPlant objects
+and as CompactPowerPlant objects.
+Loads every *-Database.bin in the source_databases directory (the full datadump
+input set) and reports the total and per-plant size of each representation.
+"""
+
+import argparse
+import glob
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+
+
+def deep_size(obj, seen=None):
+	"""
+	Estimate the memory footprint of an object and everything it references.
+
+	Objects referenced more than once (e.g. shared strings) are counted once.
+
+	Parameters
+	----------
+	obj : object
+		Object to measure.
+	seen : set, optional
+		Ids of objects already counted.
+
+	Returns
+	-------
+	size : int
+		Size in bytes.
+	"""
+	if seen is None:
+		seen = set()
+	if id(obj) in seen:
+		return 0
+	seen.add(id(obj))
+	size = sys.getsizeof(obj)
+	if isinstance(obj, dict):
+		for k, v in obj.iteritems():
+			size += deep_size(k, seen) + deep_size(v, seen)
+	elif isinstance(obj, (list, tuple, set, frozenset)):
+		for item in obj:
+			size += deep_size(item, seen)
+	if hasattr(obj, '__dict__'):
+		size += deep_size(obj.__dict__, seen)
+	for attribute in getattr(type(obj), '__slots__', ()):
+		if hasattr(obj, attribute):
+			size += deep_size(getattr(obj, attribute), seen)
+	return size
+
+
+def load_all(filenames, compact):
+	"""Load all databases into a single dict, returning it with the elapsed time."""
+	start = time.time()
+	plants = {}
+	for filename in filenames:
+		plants.update(pw.load_database(filename, compact=compact))
+	return plants, time.time() - start
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Measure memory used by regular and compact plant objects.")
+	argparser.add_argument('-d', '--directory', type=str, default=pw.SOURCE_DB_BIN_DIR,
+		help="directory holding the *-Database.bin files")
+	args = argparser.parse_args()
+
+	filenames = sorted(glob.glob(os.path.join(args.directory, '*-Database.bin')))
+	if not filenames:
+		raise ValueError('no database files found in <{0}>'.format(args.directory))
+	print(u"Loading {0} database files from {1}.".format(len(filenames), args.directory))
+
+	for label, compact in [('PowerPlant', False), ('CompactPowerPlant', True)]:
+		plants, elapsed = load_all(filenames, compact)
+		total_bytes = deep_size(plants)
+		print(u"{0:>18}: {1:7d} plants; {2:12,d} bytes; {3:8,.1f} bytes/plant; loaded in {4:.2f} s".format(
+			label, len(plants), total_bytes, float(total_bytes) / len(plants), elapsed))
+		del plants
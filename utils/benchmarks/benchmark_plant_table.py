@@ -0,0 +1,100 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_plant_table.py
+Compare the dict-of-PowerPlant path and the columnar PlantTable path for
+building, generation estimation and CSV export.
+Loads every *-Database.bin in the source_databases directory (the full datadump
+input set). Both export paths write the same CSV.
+"""
+
+import argparse
+import glob
+import sys
+import os
+import tempfile
+import csv
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+from benchmark_helpers import timed
+
+
+def estimate_generation_table(table, total_generation_file=pw.GENERATION_FILE):
+	"""
+	Column-wise equivalent of `pw.estimate_generation()` for a PlantTable.
+
+	Returns
+	-------
+	estimates : numpy.ndarray
+		Estimated 2014 generation (GWh) per row; NaN where not estimated.
+	"""
+	national = {}
+	with open(total_generation_file, 'rU') as f:
+		for row in csv.DictReader(f):
+			national[(row['country'], row['fuel'])] = float(row['generation_gwh_2014'])
+
+	capacity = table.numeric['capacity']
+	has_capacity = ~np.isnan(capacity)
+	generation_2014 = table.annual_generation(2014)
+	reported = ~np.isnan(generation_2014)
+	groups, capacity_totals, group_keys = table.group_sum(capacity, ['country', 'primary_fuel'],
+		where=has_capacity & ~reported)
+	_, reported_totals, _ = table.group_sum(generation_2014, ['country', 'primary_fuel'],
+		where=has_capacity & reported)
+	national_totals = np.array([national.get(k, np.nan) for k in group_keys])
+	remaining = national_totals - reported_totals
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		estimates = capacity / capacity_totals[groups] * remaining[groups]
+	estimates[reported | ~np.isfinite(estimates)] = np.nan
+	return np.maximum(estimates, 0)
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark the PlantTable columnar store against the plant dictionary.")
+	argparser.add_argument('-d', '--directory', type=str, default=pw.SOURCE_DB_BIN_DIR,
+		help="directory holding the *-Database.bin files")
+	args = argparser.parse_args()
+
+	filenames = sorted(glob.glob(os.path.join(args.directory, '*-Database.bin')))
+	if not filenames:
+		raise ValueError('no database files found in <{0}>'.format(args.directory))
+
+	def _load_all():
+		plants = {}
+		for filename in filenames:
+			plants.update(pw.load_database(filename))
+		return plants
+
+	def _current_schema(plants):
+		# skip plants pickled with an older PowerPlant schema; the dict path can't process them
+		return {k: p for k, p in plants.iteritems() if all(hasattr(p, a) for a in pw.PLANT_ATTRIBUTES)}
+
+	print(u"Build")
+	plants = timed('dict: load *.bin', _load_all)
+	n_loaded = len(plants)
+	plants = _current_schema(plants)
+	table = timed('table: from plant dict', pw.PlantTable.from_plants, plants)
+	timed('table: back to plant dict', table.to_plants)
+	print(u"...{0} plants ({1} skipped with an older schema).".format(len(plants), n_loaded - len(plants)))
+
+	print(u"Estimation")
+	timed('dict: estimate_generation', pw.estimate_generation, plants)
+	timed('table: column-wise estimate', estimate_generation_table, table)
+
+	print(u"Export")
+	tmpdir = tempfile.mkdtemp()
+	dict_csv = os.path.join(tmpdir, 'dict.csv')
+	table_csv = os.path.join(tmpdir, 'table.csv')
+	timed('dict: write_csv_file', pw.write_csv_file, plants, dict_csv)
+	table = pw.PlantTable.from_plants(plants)
+	timed('table: write_csv_file', pw.write_csv_file, table, table_csv)
+	with open(dict_csv, 'rb') as f1, open(table_csv, 'rb') as f2:
+		print(u"...CSV outputs identical: {0}".format(f1.read() == f2.read()))
+	os.remove(dict_csv)
+	os.remove(table_csv)
+	os.rmdir(tmpdir)
@@ -0,0 +1,106 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_read_csv.py
+Compare the former row-by-row pw.read_csv_file_to_dict (format_string on every
+cell, per-row conversions) with the schema-driven pw.read_csv_file, reading all
+columns, a projection of a few columns, and a columnar result.
+A synthetic global_power_plant_database.csv of 1M rows (by default) is written
+to a temporary directory by repeating the rows of an output CSV under new ids.
+"""
+
+import argparse
+import csv
+import gc
+import itertools
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+from benchmark_helpers import timed_rows
+
+CHECK_ROWS = 100000
+PROJECTION = ['country', 'primary_fuel', 'capacity_mw', 'commissioning_year', 'generation_gwh_2016']
+
+
+def read_csv_file_to_dict_rowwise(filename):
+	"""Read the CSV as pw.read_csv_file_to_dict did before the schema-driven loader."""
+	with open(filename, 'rbU') as fin:
+		pdb = {}
+		for row in csv.DictReader(fin):
+			row = {k: pw.format_string(v) for k, v in row.items()}
+			for field in ['capacity_mw', 'commissioning_year']:
+				try:
+					row[field] = float(row[field])
+				except:
+					row[field] = None
+			try:
+				row['latitude'] = float(row['latitude'])
+				row['longitude'] = float(row['longitude'])
+			except:
+				row['latitude'] = None
+				row['longitude'] = None
+			try:
+				row['year_of_capacity_data'] = int(row['year_of_capacity_data'])
+			except:
+				row['year_of_capacity_data'] = None
+			for field, kind in pw.CSV_COLUMN_TYPES.iteritems():
+				if kind == 'text_or_none' and not row[field]:
+					row[field] = None
+			pdb[row['gppd_idnr']] = row
+		return pdb
+
+
+def write_synthetic_csv(source_csv, filename, number):
+	"""Write `number` rows repeating the rows of `source_csv` with new gppd_idnr values."""
+	with open(source_csv, 'rbU') as fin:
+		reader = csv.reader(fin)
+		header = next(reader)
+		rows = list(reader)
+	id_column = header.index('gppd_idnr')
+	with open(filename, 'wb') as fout:
+		writer = csv.writer(fout, lineterminator='\r\n')
+		writer.writerow(header)
+		for n, row in enumerate(itertools.islice(itertools.cycle(rows), number)):
+			row = list(row)
+			row[id_column] = 'SYN{0:07d}'.format(n)
+			writer.writerow(row)
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark the schema-driven CSV loader.")
+	argparser.add_argument('-i', '--input', type=str,
+		default=os.path.join(pw.OUTPUT_DIR, 'global_power_plant_database.csv'),
+		help="output CSV whose rows are repeated")
+	argparser.add_argument('-n', '--number', type=int, default=1000000, help="number of rows in the synthetic CSV")
+	args = argparser.parse_args()
+
+	tmpdir = tempfile.mkdtemp()
+	synthetic_csv = os.path.join(tmpdir, 'global_power_plant_database.csv')
+	write_synthetic_csv(args.input, synthetic_csv, args.number)
+	print(u"Reading {0:,d} rows ({1:,d} bytes).".format(args.number, os.path.getsize(synthetic_csv)))
+
+	# one full result at a time fits in memory; results are compared on a smaller file below
+	timed_rows('row by row, all columns', args.number, read_csv_file_to_dict_rowwise, synthetic_csv)
+	gc.collect()
+	timed_rows('typed, all columns', args.number, pw.read_csv_file_to_dict, synthetic_csv)
+	gc.collect()
+
+	timed_rows('typed, {0} columns'.format(len(PROJECTION)), args.number, pw.read_csv_file, synthetic_csv, PROJECTION)
+	gc.collect()
+	timed_rows('typed, {0} columns, columnar'.format(len(PROJECTION)), args.number,
+		pw.read_csv_file, synthetic_csv, PROJECTION, columnar=True)
+
+	gc.collect()
+
+	check_csv = os.path.join(tmpdir, 'check.csv')
+	write_synthetic_csv(args.input, check_csv, min(args.number, CHECK_ROWS))
+	print(u"...results identical on {0:,d} rows: {1}".format(min(args.number, CHECK_ROWS),
+		read_csv_file_to_dict_rowwise(check_csv) == pw.read_csv_file_to_dict(check_csv)))
+
+	os.remove(synthetic_csv)
+	os.remove(check_csv)
+	os.rmdir(tmpdir)
@@ -0,0 +1,102 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_spatial_query.py
+Compare bounding-box, radius and nearest-plant queries using the SQLite R*Tree
+spatial index with the same queries answered by a full table scan.
+A powerplants table of 1M synthetic plants (by default), spread uniformly over
+the globe, is written to a temporary SQLite file; both ways must give the same
+results.
+"""
+
+import argparse
+import math
+import random
+import sys
+import os
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+
+COLUMNS = ['gppd_idnr', 'name', 'latitude', 'longitude']
+
+
+def write_synthetic_database(filename, number, seed=0):
+	"""Write `number` plants with random coordinates (2% without coordinates)."""
+	rng = random.Random(seed)
+	conn = pw._create_sqlite_database(filename)
+	empty = [None] * len(pw.CSV_FIELDNAMES)
+	positions = [pw.CSV_FIELDNAMES.index(column) for column in COLUMNS]
+
+	def _rows(start, count):
+		for n in xrange(start, start + count):
+			row = list(empty)
+			latitude, longitude = None, None
+			if n % 50:
+				latitude = math.degrees(math.asin(rng.uniform(-1, 1)))
+				longitude = rng.uniform(-180, 180)
+			for position, value in zip(positions, [u'SYN{0:08d}'.format(n), u'Plant {0}'.format(n), latitude, longitude]):
+				row[position] = value
+			yield row
+
+	batches = (_rows(start, min(pw.SQLITE_BATCH_SIZE, number - start))
+		for start in xrange(0, number, pw.SQLITE_BATCH_SIZE))
+	pw._load_powerplants_table(conn, batches)
+	return conn
+
+
+def random_points(count, seed):
+	rng = random.Random(seed)
+	return [(math.degrees(math.asin(rng.uniform(-1, 1))), rng.uniform(-180, 180)) for _ in range(count)]
+
+
+def run(label, queries, func, conn, extra, **kwargs):
+	"""Run `func` for each query point, print the time per query, and return the results."""
+	start = time.time()
+	results = [func(conn, latitude, longitude, *extra, **kwargs) for latitude, longitude in queries]
+	elapsed = time.time() - start
+	print(u"{0:>40}: {1:10.3f} ms/query ({2} queries)".format(label, 1000 * elapsed / len(queries), len(queries)))
+	return results
+
+
+def bbox(conn, latitude, longitude, half_size, **kwargs):
+	return sorted(pw.query_bbox(conn, latitude - half_size, longitude - half_size,
+		latitude + half_size, longitude + half_size, **kwargs))
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark spatial queries with the SQLite R*Tree index.")
+	argparser.add_argument('-n', '--number', type=int, default=1000000, help="number of synthetic plants")
+	argparser.add_argument('-q', '--queries', type=int, default=200, help="number of indexed queries of each kind")
+	argparser.add_argument('-s', '--scan-queries', type=int, default=5, help="number of full-scan queries of each kind")
+	argparser.add_argument('-r', '--radius', type=float, default=100.0, help="radius (km) of radius queries")
+	argparser.add_argument('-k', type=int, default=10, help="number of plants in nearest-plant queries")
+	args = argparser.parse_args()
+
+	tmpdir = tempfile.mkdtemp()
+	filename = os.path.join(tmpdir, 'powerplants.sqlite')
+	start = time.time()
+	conn = write_synthetic_database(filename, args.number)
+	print(u"Wrote {0:,d} plants in {1:.2f} s.".format(args.number, time.time() - start))
+	start = time.time()
+	pw.create_spatial_index(conn)
+	print(u"Built the R*Tree index in {0:.2f} s.".format(time.time() - start))
+
+	queries = random_points(args.queries, seed=1)
+	checked = queries[:args.scan_queries]
+	for label, func, extra in [
+			('bounding box (1 degree)', bbox, (0.5,)),
+			('radius ({0:g} km)'.format(args.radius), pw.query_radius, (args.radius,)),
+			('nearest {0}'.format(args.k), pw.query_nearest, (args.k,))]:
+		print(label)
+		indexed = run('R*Tree', queries, func, conn, extra, columns=COLUMNS)
+		scanned = run('full scan', checked, func, conn, extra, columns=COLUMNS, use_index=False)
+		print(u"...same results: {0}; {1:.1f} plants per query".format(indexed[:len(checked)] == scanned,
+			sum(len(r) for r in indexed) / float(len(indexed))))
+
+	conn.close()
+	os.remove(filename)
+	os.rmdir(tmpdir)
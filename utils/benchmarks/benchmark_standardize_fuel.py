@@ -0,0 +1,94 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_standardize_fuel.py
+Compare pw.standardize_fuel (compiled alias index with memo) against the
+former thesaurus-scanning implementation, on the raw fuel strings of the
+WRI country files (the 'Fuel' and 'Secondary Fuel' columns).
+"""
+
+import argparse
+import csv
+import glob
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+
+FUEL_COLUMNS = ['Fuel', 'Secondary Fuel']
+
+
+def standardize_fuel_scan(fuel_instance, fuel_thesaurus, as_set=False):
+	"""Former pw.standardize_fuel: split, then scan every fuel's alias list per name."""
+	if not fuel_instance:
+		if as_set:
+			return pw.NO_DATA_SET.copy()
+		else:
+			return pw.NO_DATA_UNICODE
+	fuel_instance_list = pw.re.split('/| y |,| and ', fuel_instance)
+	fuel_set = pw.NO_DATA_SET.copy()
+	for fuel in [f.strip() for f in fuel_instance_list]:
+		identified = False
+		for fuel_standard_name, fuel_synonyms in fuel_thesaurus.iteritems():
+			if fuel in fuel_synonyms:
+				fuel_set.add(fuel_standard_name)
+				identified = True
+				break
+		if not identified:
+			print(u"-Error: Couldn't identify fuel type {0}".format(fuel_instance.decode(pw.UNICODE_ENCODING)))
+	if as_set:
+		return fuel_set
+	else:
+		assert len(fuel_set) == 1
+		return fuel_set.pop()
+
+
+def read_fuel_strings(directory):
+	"""Read every non-blank fuel string from the fuel columns of the WRI raw files."""
+	fuel_strings = []
+	for filename in sorted(glob.glob(os.path.join(directory, '*.csv'))):
+		with open(filename, 'rbU') as f:
+			for row in csv.DictReader(f):
+				for column in FUEL_COLUMNS:
+					if row.get(column):
+						fuel_strings.append(row[column])
+	return fuel_strings
+
+
+def run(func, fuel_strings, fuel_thesaurus):
+	"""Standardize every string as a set of fuels; return results and elapsed time."""
+	start = time.time()
+	results = [func(s, fuel_thesaurus, as_set=True) for s in fuel_strings]
+	return results, time.time() - start
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark fuel name standardization.")
+	argparser.add_argument('-d', '--directory', type=str, default=os.path.join(pw.RAW_DIR, 'WRI'),
+		help="directory holding the WRI raw CSV files")
+	argparser.add_argument('-r', '--repeat', type=int, default=5, help="passes over the fuel strings")
+	args = argparser.parse_args()
+
+	fuel_strings = read_fuel_strings(args.directory) * args.repeat
+	print(u"Standardizing {0} fuel strings ({1} distinct).".format(len(fuel_strings), len(set(fuel_strings))))
+
+	# the scanning version prints every unidentified name; don't time the terminal
+	stdout = sys.stdout
+	sys.stdout = open(os.devnull, 'w')
+	try:
+		scanned, scan_time = run(standardize_fuel_scan, fuel_strings, pw.make_fuel_thesaurus())
+	finally:
+		sys.stdout.close()
+		sys.stdout = stdout
+	fuel_thesaurus = pw.make_fuel_thesaurus()
+	indexed, index_time = run(pw.standardize_fuel, fuel_strings, fuel_thesaurus)
+
+	print(u"{0:>18}: {1:8.3f} s".format('thesaurus scan', scan_time))
+	print(u"{0:>18}: {1:8.3f} s".format('compiled index', index_time))
+	print(u"{0:>18}: {1:8.1f}x".format('speedup', scan_time / index_time))
+	print(u"...results identical: {0}".format(scanned == indexed))
+	print(u"...unidentified names: {0} ({1} occurrences)".format(
+		len(fuel_thesaurus.unidentified), sum(fuel_thesaurus.unidentified.values())))
@@ -0,0 +1,70 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_write_csv.py
+Compare the former row-by-row pw.write_csv_file (DictWriter, per-comparison
+sort key lookups, one try/except per row) with the streaming exporter, in rows
+per second. The current-schema plants of every *-Database.bin in the
+source_databases directory are replicated (10x by default) to scale the input.
+"""
+
+import argparse
+import csv
+import glob
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+from benchmark_helpers import replicate, timed_rows
+
+
+def write_csv_file_rowwise(plants_dictionary, csv_filename):
+	"""Write the output CSV as pw.write_csv_file did before the streaming exporter."""
+	country_dictionary = pw.make_country_dictionary()
+	with open(csv_filename, 'wb') as fout:
+		writer = csv.DictWriter(fout, fieldnames=pw.CSV_FIELDNAMES, lineterminator='\r\n')
+		writer.writeheader()
+		sort_key = lambda x: (plants_dictionary[x].country, plants_dictionary[x].name)
+		for k in sorted(plants_dictionary.keys(), key=sort_key):
+			try:
+				writer.writerow(pw._plant_csv_row(plants_dictionary[k], country_dictionary))
+			except:
+				print(u"Unicode error with plant {0}".format(plants_dictionary[k].idnr))
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark the streaming CSV exporter.")
+	argparser.add_argument('-d', '--directory', type=str, default=pw.SOURCE_DB_BIN_DIR,
+		help="directory holding the *-Database.bin files")
+	argparser.add_argument('-f', '--factor', type=int, default=10, help="replication factor for the plants")
+	args = argparser.parse_args()
+
+	filenames = sorted(glob.glob(os.path.join(args.directory, '*-Database.bin')))
+	if not filenames:
+		raise ValueError('no database files found in <{0}>'.format(args.directory))
+	plants = {}
+	for filename in filenames:
+		plants.update(pw.load_database(filename))
+	# skip plants pickled with an older PowerPlant schema
+	plants = {k: p for k, p in plants.iteritems() if all(hasattr(p, a) for a in pw.PLANT_ATTRIBUTES)}
+	plants = replicate(plants, args.factor)
+	print(u"Writing {0} plants ({1}x replicated).".format(len(plants), args.factor))
+
+	tmpdir = tempfile.mkdtemp()
+	rowwise_csv = os.path.join(tmpdir, 'rowwise.csv')
+	streaming_csv = os.path.join(tmpdir, 'streaming.csv')
+	gzip_csv = os.path.join(tmpdir, 'streaming.csv.gz')
+	errors = []
+	timed_rows('row by row', len(plants), write_csv_file_rowwise, plants, rowwise_csv)
+	timed_rows('streaming', len(plants), pw.write_csv_file, plants, streaming_csv, errors=errors)
+	timed_rows('streaming, gzip', len(plants), pw.write_csv_file, plants, gzip_csv, compress=True, errors=[])
+	with open(rowwise_csv, 'rb') as f1, open(streaming_csv, 'rb') as f2:
+		print(u"...CSV outputs identical: {0}; {1} rows reported as errors".format(f1.read() == f2.read(), len(errors)))
+	print(u"...gzip output: {0:,d} bytes (uncompressed {1:,d} bytes)".format(
+		os.path.getsize(gzip_csv), os.path.getsize(streaming_csv)))
+	for filename in [rowwise_csv, streaming_csv, gzip_csv]:
+		os.remove(filename)
+	os.rmdir(tmpdir)
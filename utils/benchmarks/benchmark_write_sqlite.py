@@ -0,0 +1,88 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+benchmark_write_sqlite.py
+Compare the former SQLite export (write the CSV, read it back and insert one
+row per execute() with default pragmas) with pw.copy_csv_to_sqlite and with the
+bulk pw.write_sqlite_database, which goes straight from the plant objects.
+The current-schema plants of every *-Database.bin in the source_databases
+directory are replicated (10x by default) to scale the input; all exports are
+written to files in a temporary directory and checked to hold the same rows.
+"""
+
+import argparse
+import copy
+import glob
+import sqlite3
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+from benchmark_helpers import replicate, timed_rows
+
+
+def write_sqlite_file_rowwise(plants_dict, filename):
+	"""Write the nested dict as pw.write_sqlite_file did before bulk loading."""
+	conn = pw._create_sqlite_database(filename)
+	c = conn.cursor()
+	c.execute('begin')
+	for k, p in plants_dict.iteritems():
+		stmt = u'''INSERT INTO powerplants VALUES (
+					?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+		c.execute(stmt, tuple(p[field] for field in pw.CSV_FIELDNAMES))
+	c.execute('commit')
+	c.execute('''CREATE INDEX idx_country ON powerplants (country)''')
+	conn.close()
+
+
+def export_rowwise(plants, csv_filename, sqlite_filename):
+	pw.write_csv_file(plants, csv_filename)
+	write_sqlite_file_rowwise(pw.read_csv_file_to_dict(csv_filename), sqlite_filename)
+
+
+def export_copy(plants, csv_filename, sqlite_filename):
+	pw.write_csv_file(plants, csv_filename)
+	pw.copy_csv_to_sqlite(csv_filename, sqlite_filename)
+
+
+def table_rows(filename):
+	"""All rows of the powerplants table, ordered by gppd_idnr."""
+	conn = sqlite3.connect(filename)
+	rows = conn.execute('SELECT * FROM powerplants ORDER BY gppd_idnr').fetchall()
+	conn.close()
+	return rows
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Benchmark the bulk SQLite writer.")
+	argparser.add_argument('-d', '--directory', type=str, default=pw.SOURCE_DB_BIN_DIR,
+		help="directory holding the *-Database.bin files")
+	argparser.add_argument('-f', '--factor', type=int, default=10, help="replication factor for the plants")
+	args = argparser.parse_args()
+
+	filenames = sorted(glob.glob(os.path.join(args.directory, '*-Database.bin')))
+	if not filenames:
+		raise ValueError('no database files found in <{0}>'.format(args.directory))
+	plants = {}
+	for filename in filenames:
+		plants.update(pw.load_database(filename))
+	# skip plants pickled with an older PowerPlant schema
+	plants = {k: p for k, p in plants.iteritems() if all(hasattr(p, a) for a in pw.PLANT_ATTRIBUTES)}
+	plants = replicate(plants, args.factor)
+	print(u"Writing {0} plants ({1}x replicated).".format(len(plants), args.factor))
+
+	tmpdir = tempfile.mkdtemp()
+	csv_filename = os.path.join(tmpdir, 'plants.csv')
+	outputs = [os.path.join(tmpdir, name) for name in ['rowwise.sqlite', 'copy.sqlite', 'bulk.sqlite']]
+	timed_rows('CSV, then row by row', len(plants), export_rowwise, plants, csv_filename, outputs[0])
+	timed_rows('CSV, then copy_csv_to_sqlite', len(plants), export_copy, plants, csv_filename, outputs[1])
+	timed_rows('write_sqlite_database', len(plants), pw.write_sqlite_database, plants, outputs[2])
+	reference = table_rows(outputs[0])
+	print(u"...same rows in all outputs: {0}".format(all(table_rows(f) == reference for f in outputs[1:])))
+
+	for filename in outputs + [csv_filename]:
+		os.remove(filename)
+	os.rmdir(tmpdir)
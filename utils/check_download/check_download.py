@@ -0,0 +1,324 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+check_download.py
+Check pw.download_file() against local stand-in servers: a threaded HTTP
+server and a minimal FTP server, both on 127.0.0.1, which can cut a transfer
+short, ignore ranges or change a file between attempts.
+Covers resuming (HTTP with If-Range, FTP with REST), servers ignoring Range,
+files changed between attempts (with and without a validator), conditional
+requests answered with 304 and stale partial files of an earlier run.
+Exits with status 1 if any check fails.
+"""
+
+import BaseHTTPServer
+import SocketServer
+import argparse
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+
+# Size of the files served, and bytes sent before a transfer is cut short.
+FILE_SIZE = 300000
+CUT_SIZE = 100000
+# Bytes written at a time by download_file(), small enough to keep part of a cut transfer.
+CHUNK_SIZE = 1 << 12
+
+
+class StandInFile(object):
+	"""
+	A file served by the stand-in servers.
+
+	Attributes
+	----------
+	data : str
+		Contents.
+	etag : str or None
+		ETag sent with HTTP responses (None for none).
+	ranges : bool
+		Whether the HTTP server answers Range requests.
+	cuts : int
+		Number of transfers still to be cut short after CUT_SIZE bytes.
+	changed : str or None
+		Contents after the first transfer that is cut short (None to keep `data`).
+	"""
+	def __init__(self, data, etag=None, ranges=True, cuts=0, changed=None):
+		self.data = data
+		self.etag = etag
+		self.ranges = ranges
+		self.cuts = cuts
+		self.changed = changed
+
+	def cut(self):
+		"""Whether to cut this transfer short; switches to the changed contents after the first cut."""
+		if not self.cuts:
+			return False
+		self.cuts -= 1
+		if self.changed is not None:
+			self.data, self.changed = self.changed, None
+			if self.etag:
+				self.etag = self.etag[:-1] + '-changed"'
+		return True
+
+
+class StandInHTTPHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+	"""GET handler serving `server.files`, recording (path, Range, If-Range) in `server.requests`."""
+	protocol_version = 'HTTP/1.1'
+
+	def log_message(self, format, *args):
+		pass
+
+	def do_GET(self):
+		served = self.server.files.get(self.path)
+		if served is None:
+			self.send_error(404)
+			return
+		range_header = self.headers.get('Range')
+		if_range = self.headers.get('If-Range')
+		self.server.requests.append((self.path, range_header, if_range))
+		if served.etag and self.headers.get('If-None-Match') == served.etag:
+			self.send_response(304)
+			self.send_header('ETag', served.etag)
+			self.end_headers()
+			return
+		# a cut transfer is of the file as it was before any change
+		data, etag = served.data, served.etag
+		cut = served.cut()
+		start = 0
+		if range_header and served.ranges and (if_range is None or if_range == etag):
+			start = int(range_header.split('=')[1].rstrip('-'))
+			if start >= len(data):
+				self.send_response(416)
+				self.send_header('Content-Range', 'bytes */{0}'.format(len(data)))
+				self.send_header('Content-Length', '0')
+				self.end_headers()
+				return
+			self.send_response(206)
+			self.send_header('Content-Range', 'bytes {0}-{1}/{2}'.format(start, len(data) - 1, len(data)))
+		else:
+			self.send_response(200)
+		if etag:
+			self.send_header('ETag', etag)
+		body = data[start:]
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		if cut:
+			self.wfile.write(body[:CUT_SIZE])
+			self.wfile.flush()
+			self.connection.shutdown(socket.SHUT_RDWR)
+			self.close_connection = 1
+			return
+		self.wfile.write(body)
+
+
+class StandInHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+	daemon_threads = True
+
+	def __init__(self, files):
+		BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), StandInHTTPHandler)
+		self.files = files
+		self.requests = []
+
+
+class StandInFTPHandler(SocketServer.StreamRequestHandler):
+	"""
+	Minimal FTP control connection: anonymous login, TYPE, PASV, REST and RETR
+	of `server.files`, recording (path, REST offset) in `server.requests`.
+	"""
+	def reply(self, line):
+		self.wfile.write(line + '\r\n')
+		self.wfile.flush()
+
+	def handle(self):
+		self.reply('220 stand-in FTP server ready')
+		passive = None
+		rest = 0
+		try:
+			for line in iter(self.rfile.readline, ''):
+				command, _, argument = line.strip().partition(' ')
+				command = command.upper()
+				if command == 'USER':
+					self.reply('331 any password will do')
+				elif command == 'PASS':
+					self.reply('230 logged in')
+				elif command == 'TYPE':
+					self.reply('200 type set')
+				elif command == 'PASV':
+					passive = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+					passive.bind(('127.0.0.1', 0))
+					passive.listen(1)
+					port = passive.getsockname()[1]
+					self.reply('227 Entering Passive Mode (127,0,0,1,{0},{1})'.format(port >> 8, port & 0xff))
+				elif command == 'REST':
+					rest = int(argument)
+					self.reply('350 restarting at {0}'.format(rest))
+				elif command == 'RETR':
+					served = self.server.files.get(argument)
+					self.server.requests.append((argument, rest))
+					if served is None or passive is None:
+						self.reply('550 no such file')
+						continue
+					self.reply('150 opening data connection')
+					data_connection, _ = passive.accept()
+					passive.close()
+					passive = None
+					body = served.data[rest:]
+					rest = 0
+					if served.cut():
+						data_connection.sendall(body[:CUT_SIZE])
+						data_connection.close()
+						self.reply('426 transfer aborted')
+						return
+					data_connection.sendall(body)
+					data_connection.close()
+					self.reply('226 transfer complete')
+				elif command == 'QUIT':
+					self.reply('221 bye')
+					return
+				else:
+					self.reply('502 not implemented')
+		finally:
+			if passive is not None:
+				passive.close()
+
+
+class StandInFTPServer(SocketServer.ThreadingTCPServer):
+	daemon_threads = True
+	allow_reuse_address = True
+
+	def __init__(self, files):
+		SocketServer.ThreadingTCPServer.__init__(self, ('127.0.0.1', 0), StandInFTPHandler)
+		self.files = files
+		self.requests = []
+
+
+def start(server):
+	"""Serve in a daemon thread and return the base URL of `server`."""
+	thread = threading.Thread(target=server.serve_forever)
+	thread.daemon = True
+	thread.start()
+	scheme = 'ftp' if isinstance(server, StandInFTPServer) else 'http'
+	return '{0}://127.0.0.1:{1}'.format(scheme, server.server_address[1])
+
+
+def check(name, passed, details=''):
+	"""Print the outcome of a check and return whether it passed."""
+	print(u"{0:>44}: {1}{2}".format(name, 'ok' if passed else 'FAILED', '' if passed else ' ' + details))
+	return passed
+
+
+def download(url, filename, headers=None):
+	"""Download with `pw.download_file()`, returning its result or the exception raised."""
+	try:
+		return pw.download_file(url, filename, chunk_size=CHUNK_SIZE, headers=headers)
+	except Exception as e:
+		return e
+
+
+def contents(filename):
+	"""Contents of a file, or None if it doesn't exist."""
+	if not os.path.exists(filename):
+		return None
+	with open(filename, 'rb') as fin:
+		return fin.read()
+
+
+def run_checks(directory):
+	"""Run every check with files saved in `directory`; returns whether all passed."""
+	data = os.urandom(FILE_SIZE)
+	new_data = os.urandom(FILE_SIZE)
+	http_files = {
+		'/resume': StandInFile(data, etag='"v1"', cuts=1),
+		'/no_ranges': StandInFile(data, etag='"v1"', ranges=False, cuts=1),
+		'/changed': StandInFile(data, etag='"v1"', cuts=1, changed=new_data),
+		'/changed_no_validator': StandInFile(data, cuts=1, changed=new_data),
+		'/not_modified': StandInFile(data, etag='"v1"'),
+		'/stale_part': StandInFile(data, etag='"v1"'),
+	}
+	ftp_files = {
+		'/resume': StandInFile(data, cuts=1),
+	}
+	http_server = StandInHTTPServer(http_files)
+	ftp_server = StandInFTPServer(ftp_files)
+	http_url = start(http_server)
+	ftp_url = start(ftp_server)
+	path = lambda name: os.path.join(directory, name)
+
+	def http_requests(name):
+		return [request[1:] for request in http_server.requests if request[0] == name]
+
+	results = []
+	try:
+		# cut short, then resumed with a range validated by If-Range
+		download(http_url + '/resume', path('resume'))
+		requests = http_requests('/resume')
+		results.append(check('HTTP resume', contents(path('resume')) == data and len(requests) == 2
+			and requests[1][0] is not None and requests[1][0] != 'bytes=0-' and requests[1][1] == '"v1"',
+			str(requests)))
+
+		# the server sends the whole file again instead of the range
+		download(http_url + '/no_ranges', path('no_ranges'))
+		results.append(check('HTTP server ignoring Range', contents(path('no_ranges')) == data,
+			str(http_requests('/no_ranges'))))
+
+		# the file changes between attempts; If-Range no longer matches, so all of it is sent
+		download(http_url + '/changed', path('changed'))
+		results.append(check('HTTP file changed, with ETag', contents(path('changed')) == new_data,
+			str(http_requests('/changed'))))
+
+		# no validator to resume with: the retry starts over instead of splicing two versions
+		download(http_url + '/changed_no_validator', path('changed_no_validator'))
+		requests = http_requests('/changed_no_validator')
+		results.append(check('HTTP file changed, no validator',
+			contents(path('changed_no_validator')) == new_data and all(r[0] is None for r in requests),
+			str(requests)))
+
+		# a conditional request for an unchanged file leaves the saved file alone
+		with open(path('not_modified'), 'wb') as fout:
+			fout.write('saved')
+		result = download(http_url + '/not_modified', path('not_modified'), {'If-None-Match': '"v1"'})
+		results.append(check('HTTP 304 (Not Modified)', result is None and contents(path('not_modified')) == 'saved'
+			and not os.path.exists(path('not_modified') + pw.DOWNLOAD_PART_SUFFIX), repr(result)))
+
+		# a partial file of an earlier run without a validator is not resumed
+		with open(path('stale_part') + pw.DOWNLOAD_PART_SUFFIX, 'wb') as fout:
+			fout.write(new_data[:CUT_SIZE])
+		download(http_url + '/stale_part', path('stale_part'))
+		requests = http_requests('/stale_part')
+		results.append(check('HTTP stale partial file', contents(path('stale_part')) == data
+			and requests == [(None, None)], str(requests)))
+
+		# cut short, then resumed with REST
+		download(ftp_url + '/resume', path('ftp_resume'))
+		requests = [request[1] for request in ftp_server.requests if request[0] == '/resume']
+		results.append(check('FTP resume', contents(path('ftp_resume')) == data and len(requests) == 2
+			and requests[0] == 0 and 0 < requests[1] <= CUT_SIZE, str(requests)))
+	finally:
+		http_server.shutdown()
+		ftp_server.shutdown()
+		http_server.server_close()
+		ftp_server.server_close()
+	return all(results)
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Check pw.download_file() against local stand-in HTTP and FTP servers.")
+	argparser.add_argument('-k', '--keep', action='store_true', help="keep the downloaded files")
+	args = argparser.parse_args()
+
+	directory = tempfile.mkdtemp()
+	try:
+		passed = run_checks(directory)
+	finally:
+		if args.keep:
+			print(u"Files kept in {0}.".format(directory))
+		else:
+			shutil.rmtree(directory, ignore_errors=True)
+	sys.exit(0 if passed else 1)
@@ -7,7 +7,6 @@ Create summary of the global power plant database at the country level.
 
 import sys
 import os
-import csv
 import argparse
 
 sys.path.insert(0, os.pardir)
@@ -16,70 +15,8 @@ import powerplant_database as pw
 DEFAULT_DATABASE_FILE = os.path.join(pw.OUTPUT_DIR, "global_power_plant_database.csv")
 DEFAULT_SUMMARY_FILE = os.path.join(pw.OUTPUT_DIR, "global_power_plant_database_country_summary.csv")
 
-#Ordered list of output CSV fields; equivalently the header.
-SUMMARY_FIELDNAMES = (
-			'iso_code',
-			'country',
-			'count',
-			'total_capacity_gw',
-			'max_capacity_mw',
-			'count_distinct_fuel',
-			'count_distinct_name',
-			'count_distinct_owner',
-			'count_distinct_source',
-			'count_fuel_coal',
-			'capacity_gw_fuel_coal',
-			'count_fuel_gas',
-			'capacity_gw_fuel_gas',
-			'count_fuel_oil',
-			'capacity_gw_fuel_oil',
-			'count_fuel_petcoke',
-			'capacity_gw_fuel_petcoke',
-			'count_fuel_hydro',
-			'capacity_gw_fuel_hydro',
-			'count_fuel_nuclear',
-			'capacity_gw_fuel_nuclear',
-			'count_fuel_wind',
-			'capacity_gw_fuel_wind',
-			'count_fuel_solar',
-			'capacity_gw_fuel_solar',
-			'count_fuel_geothermal',
-			'capacity_gw_fuel_geothermal',
-			'count_fuel_biomass',
-			'capacity_gw_fuel_biomass',
-			'count_fuel_cogeneration',
-			'capacity_gw_fuel_cogeneration',
-			'count_fuel_waste',
-			'capacity_gw_fuel_waste',
-			'count_fuel_wave_and_tidal',
-			'capacity_gw_fuel_wave_and_tidal',
-			'count_fuel_storage',
-			'capacity_gw_fuel_storage',
-			'count_fuel_other',
-			'capacity_gw_fuel_other',
-			'count_null_name',
-			'count_null_gppd_idnr',
-			'count_null_capacity_mw',
-			'count_null_year_of_capacity_data',
-			'count_null_owner',
-			'count_null_source',
-			'count_null_url',
-			'count_null_latitude',
-			'count_null_longitude',
-			'count_null_fuel',
-			'count_wepp_id',
-			'capacity_gw_wepp_id',
-			'count_null_generation_gwh_all',
-			'count_generation_gwh_2013',
-			'count_generation_gwh_2014',
-			'count_generation_gwh_2015',
-			'count_generation_gwh_2016',
-			'count_generation_gwh_2017',
-			'count_generation_gwh_2018',
-			'count_generation_gwh_2019',
-			'count_generation_data_source',
-			'count_estimated_generation_gwh',
-			)
+# Ordered list of output CSV fields; also produced in one pass by the global build (pw.CountrySummarySink).
+SUMMARY_FIELDNAMES = pw.SUMMARY_FIELDNAMES
 
 def country_summary(db_conn, country, iso_code):
 	"""
@@ -280,17 +217,11 @@ if __name__ == '__main__':
 	# make sqlite database
 	db_conn = pw.copy_csv_to_sqlite(args.input, ':memory:', return_connection=True)
 
-	# summarize country-level data
-	country_summaries = {}
-	for iso_code in args.country:
-		country_summaries[iso_code] = country_summary(db_conn, countries[iso_code], iso_code)
+	# summarize country-level data, as the global build does (pw.CountrySummarySink)
+	country_summaries = pw.summarize_countries(db_conn, {iso_code: countries[iso_code] for iso_code in args.country})
 
 	# write summary output
-	with open(args.output, 'wb') as fout:
-		writer = csv.DictWriter(fout, fieldnames=SUMMARY_FIELDNAMES, lineterminator='\r\n')
-		writer.writeheader()
-		for iso_code in args.country:
-			writer.writerow(country_summaries[iso_code])
+	pw.write_country_summary(country_summaries, args.output, args.country)
 
 	# report
 	print(u"Wrote summary to {0}.".format(args.output))
@@ -0,0 +1,81 @@
+# This Python file uses the following encoding: utf-8
+"""
+Global Power Plant Database
+diff_database.py
+Compare two builds of the global power plant database (output CSV files) and
+report added, removed and changed plants, with the old and new values of
+each changed field.
+"""
+
+import sys
+import os
+import csv
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.pardir, os.pardir))
+import powerplant_database as pw
+
+# Header of the changes file; one row per added or removed plant, and per changed field.
+CHANGES_FIELDNAMES = ('gppd_idnr', 'change', 'field', 'old_value', 'new_value')
+
+
+def write_changes(diff, filename):
+	"""
+	Write the changes between two builds to a CSV file.
+
+	Parameters
+	----------
+	diff : dict
+		Result of `pw.diff_databases()`.
+	filename : str
+		Filepath for the output CSV.
+	"""
+	def _encode(value):
+		if isinstance(value, unicode):
+			return value.encode(pw.UNICODE_ENCODING)
+		return value
+
+	with open(filename, 'wb') as fout:
+		writer = csv.writer(fout, lineterminator='\r\n')
+		writer.writerow(CHANGES_FIELDNAMES)
+		for idnr in diff['added']:
+			writer.writerow([idnr, 'added', '', '', ''])
+		for idnr in diff['removed']:
+			writer.writerow([idnr, 'removed', '', '', ''])
+		for idnr in sorted(diff['changed']):
+			for field in diff['fields']:
+				if field in diff['changed'][idnr]:
+					old_value, new_value = diff['changed'][idnr][field]
+					writer.writerow([idnr, 'changed', field, _encode(old_value), _encode(new_value)])
+
+
+### MAIN ###
+if __name__ == '__main__':
+	argparser = argparse.ArgumentParser(description="Compare two builds of the Global Power Plant Database.")
+	argparser.add_argument('old', type=str, help="output CSV of the older build")
+	argparser.add_argument('new', type=str, help="output CSV of the newer build")
+	argparser.add_argument('-o', '--output', type=str, help="CSV file to write the changes to")
+	args = argparser.parse_args()
+
+	start = time.time()
+	diff = pw.diff_databases(args.old, args.new)
+	elapsed = time.time() - start
+
+	print(u"Compared {0} and {1} in {2:.2f} s.".format(args.old, args.new, elapsed))
+	print(u"Added: {0}; removed: {1}; changed: {2}; unchanged: {3}.".format(
+		len(diff['added']), len(diff['removed']), len(diff['changed']), diff['unchanged']))
+	field_counts = {}
+	for deltas in diff['changed'].itervalues():
+		for field in deltas:
+			field_counts[field] = field_counts.get(field, 0) + 1
+	for field in diff['fields']:
+		if field in field_counts:
+			print(u" - {0}: {1} plants changed".format(field, field_counts[field]))
+	capacity_change = sum((new or 0) - (old or 0)
+		for old, new in (deltas['capacity_mw'] for deltas in diff['changed'].itervalues() if 'capacity_mw' in deltas))
+	print(u"Capacity change of changed plants: {0:.1f} MW.".format(capacity_change))
+
+	if args.output:
+		write_changes(diff, args.output)
+		print(u"Wrote changes to {0}.".format(args.output))
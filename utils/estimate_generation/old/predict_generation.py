@@ -66,7 +66,8 @@ print("Fuel types: {0}".format(fuel_types))
 
 # load powerplant database
 if args.powerplant_database.endswith('.csv'):
-	plants = pw.read_csv_file_to_dict(args.powerplant_database)
+	plants = pw.read_csv_file_to_dict(args.powerplant_database,
+		columns=['country_long', 'primary_fuel', 'capacity_mw', 'commissioning_year'])
 else:
 	plants = pw.load_database(args.powerplant_database)
 